@@ -2,9 +2,14 @@
 
 import os
 import logging
-from pathlib import Path
 from typing import Optional, List, Dict
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from indexing.search import select_relevant
+from model.packer import pack_files
+
 class BackendAgent:
     def __init__(self, model):
         if not model:
@@ -71,33 +76,14 @@ class BackendAgent:
             # Create analysis overview
             overview = self.create_backend_overview(backend_files)
             
-            # Read relevant files
-            content = self.read_backend_files(backend_files)
+            # Read the most relevant files that fit in the prompt
+            relevant_files = select_relevant(project_path, backend_files, user_request)
+            content = self.read_backend_files(
+                relevant_files, self._create_analysis_prompt(user_request, overview, '')
+            )
             
             # Create analysis prompt
-            prompt = f"""
-            Analise os aspectos relacionados ao backend deste projeto com base na solicitação: {user_request}
-
-            Visão Geral do Backend:
-            {overview}
-
-            Conteúdo dos Arquivos:
-            {content}
-
-            Por favor, forneça:
-            1. Análise da arquitetura do backend
-            2. Avaliação da estrutura de rotas e controllers
-            3. Análise dos serviços e middlewares
-            4. Identificação de padrões de projeto utilizados
-            5. Avaliação da segurança e autenticação
-            6. Análise de performance e escalabilidade
-            7. Identificação de possíveis problemas
-            8. Sugestões de melhorias e otimizações
-            9. Recomendações de boas práticas
-            10. Sugestões de modernização do código
-
-            Formate a resposta de forma clara e organizada, usando markdown.
-            """
+            prompt = self._create_analysis_prompt(user_request, overview, content)
             
             self.logger.info("Gerando análise do backend")
             return self.model.generate(prompt)
@@ -106,49 +92,67 @@ class BackendAgent:
             self.logger.error(f"Erro ao analisar backend: {str(e)}")
             raise Exception(f"Erro ao analisar backend: {str(e)}")
     
+    def _create_analysis_prompt(self, user_request: str, overview: str, content: str) -> str:
+        """Create the backend analysis prompt"""
+        return f"""
+        Analise os aspectos relacionados ao backend deste projeto com base na solicitação: {user_request}
+
+        Visão Geral do Backend:
+        {overview}
+
+        Conteúdo dos Arquivos:
+        {content}
+
+        Por favor, forneça:
+        1. Análise da arquitetura do backend
+        2. Avaliação da estrutura de rotas e controllers
+        3. Análise dos serviços e middlewares
+        4. Identificação de padrões de projeto utilizados
+        5. Avaliação da segurança e autenticação
+        6. Análise de performance e escalabilidade
+        7. Identificação de possíveis problemas
+        8. Sugestões de melhorias e otimizações
+        9. Recomendações de boas práticas
+        10. Sugestões de modernização do código
+
+        Formate a resposta de forma clara e organizada, usando markdown.
+        """
+    
     def get_backend_files(self, project_path: str) -> List[Dict]:
         """Get backend-related files from the project"""
         try:
-            files = []
-            path = Path(project_path)
-            
-            for item in path.rglob('*'):
-                # Skip node_modules, venv, etc.
-                if any(part.startswith('.') or part in {'node_modules', 'venv', 'env', '__pycache__'} 
-                      for part in item.parts):
-                    continue
-                
-                # Check if file is in a backend-related directory
-                if any(pattern in str(item) for pattern in self.backend_patterns):
-                    if item.is_file() and item.suffix in self.backend_extensions:
-                        files.append({
-                            'path': str(item),
-                            'name': item.name,
-                            'extension': item.suffix,
-                            'language': self.backend_extensions[item.suffix],
-                            'relative_path': str(item.relative_to(path))
-                        })
-                        continue
-                
-                # Check file name patterns
-                if item.is_file() and item.suffix in self.backend_extensions:
-                    stem = item.stem.lower()
-                    if any(pattern in stem for pattern in self.backend_file_patterns):
-                        files.append({
-                            'path': str(item),
-                            'name': item.name,
-                            'extension': item.suffix,
-                            'language': self.backend_extensions[item.suffix],
-                            'relative_path': str(item.relative_to(path))
-                        })
+            files = scan_project(project_path).view('backend', self._classify_backend_files)
             
             self.logger.info(f"Found {len(files)} backend-related files")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Error getting backend files: {str(e)}")
             raise Exception(f"Error getting backend files: {str(e)}")
     
+    def _classify_backend_files(self, table: FileTable) -> List[Dict]:
+        """Select backend-related files from the project scan"""
+        # Skip node_modules, venv, etc.
+        def visible(part: str) -> bool:
+            return not (part.startswith('.') or part in {'node_modules', 'venv', 'env', '__pycache__'})
+        
+        selected = table.extension_mask(self.backend_extensions) & table.directory_mask(
+            lambda directory: all(visible(part) for part in directory.split(os.sep)[:-1])
+        )
+        selected &= table.file_mask(lambda file: visible(file.name), selected)
+        
+        # Check if file is in a backend-related directory or matches a name pattern
+        in_backend_dir = table.directory_mask(
+            lambda directory: any(pattern in os.path.join(table.root, directory)
+                                  for pattern in self.backend_patterns)
+        )
+        selected &= in_backend_dir | table.file_mask(
+            lambda file: any(pattern in os.path.splitext(file.name)[0].lower()
+                             for pattern in self.backend_file_patterns),
+            selected & ~in_backend_dir
+        )
+        return table.rows(selected, 'language', self.backend_extensions)
+    
     def create_backend_overview(self, backend_files: List[Dict]) -> str:
         """Create an overview of backend-related files"""
         try:
@@ -175,27 +179,28 @@ class BackendAgent:
             self.logger.error(f"Error creating backend overview: {str(e)}")
             return "Error creating backend overview"
     
-    def read_backend_files(self, backend_files: List[Dict]) -> str:
-        """Read and format backend-related files"""
+    def read_backend_files(self, backend_files: List[Dict], template: Optional[str] = None) -> str:
+        """Read and format backend-related files that fit in the prompt ``template``"""
         try:
-            content = []
+            readable = []
             
-            for file_info in backend_files:
-                try:
-                    with open(file_info['path'], 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        if file_content.strip():  # Only include non-empty files
-                            content.append(
-                                f"Arquivo: {file_info['relative_path']}\n"
-                                f"Linguagem: {file_info['language']}\n\n"
-                                f"```{file_info['language'].lower()}\n"
-                                f"{file_content}\n"
-                                f"```\n\n"
-                            )
-                except Exception as e:
-                    self.logger.warning(f"Could not read file {file_info['path']}: {str(e)}")
-            
-            return "".join(content)
+            for file_info, result in zip(backend_files, read_files([item['path'] for item in backend_files])):
+                if result.text is None:
+                    self.logger.warning(f"Could not read file {file_info['path']}: {result.skipped}")
+                    continue
+                if result.text.strip():  # Only include non-empty files
+                    readable.append((file_info, result))
+            
+            def block(file_info: Dict, file_content: str) -> str:
+                return (
+                    f"Arquivo: {file_info['relative_path']}\n"
+                    f"Linguagem: {file_info['language']}\n\n"
+                    f"```{file_info['language'].lower()}\n"
+                    f"{file_content}\n"
+                    f"```\n\n"
+                )
+            
+            return pack_files(readable, template, block)
             
         except Exception as e:
             self.logger.error(f"Error reading backend files: {str(e)}")
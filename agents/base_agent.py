@@ -1,10 +1,14 @@
 # agents/base_agent.py
 import os
 import logging
-from pathlib import Path
 from typing import Optional, List, Dict, Set
 from abc import ABC, abstractmethod
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from model.packer import pack_files
+
 class BaseAgent(ABC):
     """Classe base para todos os agentes de análise"""
     
@@ -25,34 +29,20 @@ class BaseAgent(ABC):
     def get_project_files(self, project_path: str, extensions: Dict[str, str] = None) -> List[Dict]:
         """Método comum para obter arquivos do projeto"""
         try:
-            files = []
-            path = Path(project_path)
-            
-            for item in path.rglob('*'):
+            def build(table: FileTable) -> List[Dict]:
                 # Ignorar diretórios específicos
-                if any(ignore_dir in item.parts for ignore_dir in self.ignore_dirs):
-                    continue
+                selected = table.excluding(self.ignore_dirs)
                 
                 # Incluir apenas arquivos com extensões relevantes se especificado
-                if extensions and item.is_file() and item.suffix in extensions:
-                    files.append({
-                        'path': str(item),
-                        'name': item.name,
-                        'extension': item.suffix,
-                        'language': extensions.get(item.suffix, 'Unknown'),
-                        'relative_path': str(item.relative_to(path))
-                    })
-                elif not extensions and item.is_file():
-                    files.append({
-                        'path': str(item),
-                        'name': item.name,
-                        'extension': item.suffix,
-                        'language': 'Unknown',
-                        'relative_path': str(item.relative_to(path))
-                    })
+                if extensions:
+                    selected &= table.extension_mask(extensions)
+                return table.rows(selected, 'language', extensions, 'Unknown')
+            
+            key = ('project_files', frozenset((extensions or {}).items()), frozenset(self.ignore_dirs))
+            files = scan_project(project_path).view(key, build)
             
             self.logger.info(f"Encontrados {len(files)} arquivos para análise")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Erro ao obter arquivos do projeto: {str(e)}")
@@ -84,28 +74,33 @@ class BaseAgent(ABC):
             self.logger.error(f"Erro ao criar visão geral: {str(e)}")
             return "Erro ao criar visão geral do projeto"
     
-    def read_files(self, files: List[Dict]) -> str:
-        """Lê e formata o conteúdo dos arquivos"""
+    def read_files(self, files: List[Dict], template: Optional[str] = None) -> str:
+        """Lê e formata o conteúdo dos arquivos
+
+        Com ``template`` (o prompt sem os arquivos), entram só os arquivos, e
+        na forma, que cabem no limite de entrada do modelo (ver model.packer).
+        """
         try:
-            content = []
+            readable = []
             
-            for file_info in files:
-                try:
-                    with open(file_info['path'], 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        if file_content.strip():  # Incluir apenas arquivos não vazios
-                            language = file_info.get('language', 'plaintext').lower()
-                            content.append(
-                                f"Arquivo: {file_info['relative_path']}\n"
-                                f"Linguagem: {file_info.get('language', 'Unknown')}\n\n"
-                                f"```{language}\n"
-                                f"{file_content}\n"
-                                f"```\n\n"
-                            )
-                except Exception as e:
-                    self.logger.warning(f"Não foi possível ler o arquivo {file_info['path']}: {str(e)}")
+            for file_info, result in zip(files, read_files([item['path'] for item in files])):
+                if result.text is None:
+                    self.logger.warning(f"Não foi possível ler o arquivo {file_info['path']}: {result.skipped}")
+                    continue
+                if result.text.strip():  # Incluir apenas arquivos não vazios
+                    readable.append((file_info, result))
+            
+            def block(file_info: Dict, file_content: str) -> str:
+                language = file_info.get('language', 'plaintext').lower()
+                return (
+                    f"Arquivo: {file_info['relative_path']}\n"
+                    f"Linguagem: {file_info.get('language', 'Unknown')}\n\n"
+                    f"```{language}\n"
+                    f"{file_content}\n"
+                    f"```\n\n"
+                )
             
-            return "".join(content)
+            return pack_files(readable, template, block)
             
         except Exception as e:
             self.logger.error(f"Erro ao ler arquivos: {str(e)}")
@@ -1,5 +1,6 @@
 # agents/code_analysis_agent.py
 from agents.base_agent import BaseAgent
+from indexing.search import select_relevant
 
 class CodeAnalysisAgent(BaseAgent):
     def __init__(self, model):
@@ -32,8 +33,9 @@ class CodeAnalysisAgent(BaseAgent):
             # Criar visão geral do projeto
             overview = self.create_overview(project_files)
             
-            # Ler conteúdo dos arquivos
-            content = self.read_files(project_files)
+            # Ler conteúdo dos arquivos mais relevantes que cabem no prompt
+            relevant_files = select_relevant(project_path, project_files, user_request)
+            content = self.read_files(relevant_files, self._create_analysis_prompt(user_request, overview, ''))
             
             # Criar prompt de análise
             prompt = self._create_analysis_prompt(user_request, overview, content)
@@ -2,9 +2,14 @@
 
 import os
 import logging
-from pathlib import Path
 from typing import Optional, List, Dict
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from indexing.search import select_relevant
+from model.packer import pack_files
+
 class DatabaseAgent:
     def __init__(self, model):
         if not model:
@@ -51,31 +56,14 @@ class DatabaseAgent:
             # Create analysis overview
             overview = self.create_db_overview(db_files)
             
-            # Read relevant files
-            content = self.read_db_files(db_files)
+            # Read the most relevant files that fit in the prompt
+            relevant_files = select_relevant(project_path, db_files, user_request)
+            content = self.read_db_files(
+                relevant_files, self._create_analysis_prompt(user_request, overview, '')
+            )
             
             # Create analysis prompt
-            prompt = f"""
-            Analise os aspectos relacionados a banco de dados deste projeto com base na solicitação: {user_request}
-
-            Visão Geral do Banco de Dados:
-            {overview}
-
-            Conteúdo dos Arquivos:
-            {content}
-
-            Por favor, forneça:
-            1. Análise da estrutura do banco de dados
-            2. Avaliação dos modelos e schemas
-            3. Análise das migrações (se houver)
-            4. Identificação de possíveis problemas
-            5. Sugestões de otimização
-            6. Boas práticas de banco de dados
-            7. Recomendações de segurança
-            8. Sugestões de melhorias na modelagem
-
-            Formate a resposta de forma clara e organizada, usando markdown.
-            """
+            prompt = self._create_analysis_prompt(user_request, overview, content)
             
             self.logger.info("Gerando análise de banco de dados")
             return self.model.generate(prompt)
@@ -84,42 +72,50 @@ class DatabaseAgent:
             self.logger.error(f"Erro ao analisar banco de dados: {str(e)}")
             raise Exception(f"Erro ao analisar banco de dados: {str(e)}")
     
+    def _create_analysis_prompt(self, user_request: str, overview: str, content: str) -> str:
+        """Create the database analysis prompt"""
+        return f"""
+        Analise os aspectos relacionados a banco de dados deste projeto com base na solicitação: {user_request}
+
+        Visão Geral do Banco de Dados:
+        {overview}
+
+        Conteúdo dos Arquivos:
+        {content}
+
+        Por favor, forneça:
+        1. Análise da estrutura do banco de dados
+        2. Avaliação dos modelos e schemas
+        3. Análise das migrações (se houver)
+        4. Identificação de possíveis problemas
+        5. Sugestões de otimização
+        6. Boas práticas de banco de dados
+        7. Recomendações de segurança
+        8. Sugestões de melhorias na modelagem
+
+        Formate a resposta de forma clara e organizada, usando markdown.
+        """
+    
     def get_database_files(self, project_path: str) -> List[Dict]:
         """Get database-related files from the project"""
         try:
-            files = []
-            path = Path(project_path)
-            
-            for item in path.rglob('*'):
-                # Check if file is in a database-related directory
-                if any(pattern in str(item) for pattern in self.db_patterns):
-                    if item.is_file():
-                        files.append({
-                            'path': str(item),
-                            'name': item.name,
-                            'extension': item.suffix,
-                            'type': self.db_extensions.get(item.suffix, 'Other'),
-                            'relative_path': str(item.relative_to(path))
-                        })
-                        continue
-                
-                # Check file extensions
-                if item.is_file() and item.suffix in self.db_extensions:
-                    files.append({
-                        'path': str(item),
-                        'name': item.name,
-                        'extension': item.suffix,
-                        'type': self.db_extensions[item.suffix],
-                        'relative_path': str(item.relative_to(path))
-                    })
+            files = scan_project(project_path).view('database', self._classify_database_files)
             
             self.logger.info(f"Found {len(files)} database-related files")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Error getting database files: {str(e)}")
             raise Exception(f"Error getting database files: {str(e)}")
     
+    def _classify_database_files(self, table: FileTable) -> List[Dict]:
+        """Select database-related files from the project scan"""
+        # Files in a database-related directory or with a database extension
+        selected = table.directory_mask(
+            lambda directory: any(pattern in os.path.join(table.root, directory) for pattern in self.db_patterns)
+        ) | table.extension_mask(self.db_extensions)
+        return table.rows(selected, 'type', self.db_extensions, 'Other')
+    
     def create_db_overview(self, db_files: List[Dict]) -> str:
         """Create an overview of database-related files"""
         try:
@@ -146,27 +142,28 @@ class DatabaseAgent:
             self.logger.error(f"Error creating database overview: {str(e)}")
             return "Error creating database overview"
     
-    def read_db_files(self, db_files: List[Dict]) -> str:
-        """Read and format database-related files"""
+    def read_db_files(self, db_files: List[Dict], template: Optional[str] = None) -> str:
+        """Read and format database-related files that fit in the prompt ``template``"""
         try:
-            content = []
-            
-            for file_info in db_files:
-                try:
-                    with open(file_info['path'], 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        if file_content.strip():  # Only include non-empty files
-                            content.append(
-                                f"Arquivo: {file_info['relative_path']}\n"
-                                f"Tipo: {file_info['type']}\n\n"
-                                f"```{file_info['type'].lower()}\n"
-                                f"{file_content}\n"
-                                f"```\n\n"
-                            )
-                except Exception as e:
-                    self.logger.warning(f"Could not read file {file_info['path']}: {str(e)}")
-            
-            return "".join(content)
+            readable = []
+            
+            for file_info, result in zip(db_files, read_files([item['path'] for item in db_files])):
+                if result.text is None:
+                    self.logger.warning(f"Could not read file {file_info['path']}: {result.skipped}")
+                    continue
+                if result.text.strip():  # Only include non-empty files
+                    readable.append((file_info, result))
+            
+            def block(file_info: Dict, file_content: str) -> str:
+                return (
+                    f"Arquivo: {file_info['relative_path']}\n"
+                    f"Tipo: {file_info['type']}\n\n"
+                    f"```{file_info['type'].lower()}\n"
+                    f"{file_content}\n"
+                    f"```\n\n"
+                )
+            
+            return pack_files(readable, template, block)
             
         except Exception as e:
             self.logger.error(f"Error reading database files: {str(e)}")
@@ -5,6 +5,12 @@ import logging
 from pathlib import Path
 from typing import Optional, List, Dict
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from indexing.search import select_relevant
+from model.packer import pack_files
+
 class DevOpsAgent:
     def __init__(self, model):
         if not model:
@@ -87,35 +93,14 @@ class DevOpsAgent:
             # Create analysis overview
             overview = self.create_devops_overview(devops_files)
             
-            # Read relevant files
-            content = self.read_devops_files(devops_files)
+            # Read the most relevant files that fit in the prompt
+            relevant_files = select_relevant(project_path, devops_files, user_request)
+            content = self.read_devops_files(
+                relevant_files, self._create_analysis_prompt(user_request, overview, '')
+            )
             
             # Create analysis prompt
-            prompt = f"""
-            Analise os aspectos relacionados a DevOps deste projeto com base na solicitação: {user_request}
-
-            Visão Geral de DevOps:
-            {overview}
-
-            Conteúdo dos Arquivos:
-            {content}
-
-            Por favor, forneça:
-            1. Análise da infraestrutura e configuração
-            2. Avaliação dos pipelines de CI/CD
-            3. Análise da containerização (Docker, Kubernetes, etc.)
-            4. Avaliação das práticas de deployment
-            5. Análise de segurança e compliance
-            6. Avaliação de monitoramento e logging
-            7. Análise de escalabilidade
-            8. Identificação de possíveis problemas
-            9. Sugestões de melhorias e otimizações
-            10. Recomendações de boas práticas
-            11. Sugestões de modernização da infraestrutura
-            12. Análise de custos e eficiência
-
-            Formate a resposta de forma clara e organizada, usando markdown.
-            """
+            prompt = self._create_analysis_prompt(user_request, overview, content)
             
             self.logger.info("Gerando análise de DevOps")
             return self.model.generate(prompt)
@@ -124,49 +109,75 @@ class DevOpsAgent:
             self.logger.error(f"Erro ao analisar DevOps: {str(e)}")
             raise Exception(f"Erro ao analisar DevOps: {str(e)}")
     
+    def _create_analysis_prompt(self, user_request: str, overview: str, content: str) -> str:
+        """Create the DevOps analysis prompt"""
+        return f"""
+        Analise os aspectos relacionados a DevOps deste projeto com base na solicitação: {user_request}
+
+        Visão Geral de DevOps:
+        {overview}
+
+        Conteúdo dos Arquivos:
+        {content}
+
+        Por favor, forneça:
+        1. Análise da infraestrutura e configuração
+        2. Avaliação dos pipelines de CI/CD
+        3. Análise da containerização (Docker, Kubernetes, etc.)
+        4. Avaliação das práticas de deployment
+        5. Análise de segurança e compliance
+        6. Avaliação de monitoramento e logging
+        7. Análise de escalabilidade
+        8. Identificação de possíveis problemas
+        9. Sugestões de melhorias e otimizações
+        10. Recomendações de boas práticas
+        11. Sugestões de modernização da infraestrutura
+        12. Análise de custos e eficiência
+
+        Formate a resposta de forma clara e organizada, usando markdown.
+        """
+    
     def get_devops_files(self, project_path: str) -> List[Dict]:
         """Get DevOps-related files from the project"""
         try:
-            files = []
-            path = Path(project_path)
-            
-            for item in path.rglob('*'):
-                # Skip hidden directories and node_modules
-                if any(part.startswith('.') or part == 'node_modules' for part in item.parts):
-                    if not any(devops_dir in str(item) for devops_dir in ['.github', '.gitlab']):
-                        continue
-                
-                # Check if file is in a DevOps-related directory
-                if any(pattern in str(item) for pattern in self.devops_patterns):
-                    if item.is_file():
-                        files.append({
-                            'path': str(item),
-                            'name': item.name,
-                            'extension': item.suffix,
-                            'type': self.get_file_type(item),
-                            'relative_path': str(item.relative_to(path))
-                        })
-                        continue
-                
-                # Check for specific DevOps files
-                if item.is_file():
-                    file_type = self.get_file_type(item)
-                    if file_type:
-                        files.append({
-                            'path': str(item),
-                            'name': item.name,
-                            'extension': item.suffix,
-                            'type': file_type,
-                            'relative_path': str(item.relative_to(path))
-                        })
+            files = scan_project(project_path).view('devops', self._classify_devops_files)
             
             self.logger.info(f"Found {len(files)} DevOps-related files")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Error getting DevOps files: {str(e)}")
             raise Exception(f"Error getting DevOps files: {str(e)}")
     
+    def _classify_devops_files(self, table: FileTable) -> List[Dict]:
+        """Select DevOps-related files from the project scan"""
+        # Skip hidden directories and node_modules
+        def hidden(part: str) -> bool:
+            return part.startswith('.') or part == 'node_modules'
+        
+        skipped = table.directory_mask(lambda directory: any(hidden(part) for part in directory.split(os.sep)[:-1]))
+        skipped |= table.file_mask(lambda file: hidden(file.name), ~skipped)
+        skipped &= ~table.file_mask(
+            lambda file: any(devops_dir in file.path for devops_dir in ['.github', '.gitlab']), skipped
+        )
+        
+        # Check if file is in a DevOps-related directory
+        in_devops_dir = table.directory_mask(
+            lambda directory: any(pattern in os.path.join(table.root, directory) for pattern in self.devops_patterns)
+        )
+        
+        files = []
+        for index, item in enumerate(table):
+            if skipped[index]:
+                continue
+            
+            # Check for specific DevOps files
+            file_type = self.get_file_type(Path(item.path))
+            if file_type or in_devops_dir[index]:
+                files.append(table.row(index, type=file_type))
+        
+        return files
+    
     def get_file_type(self, file_path: Path) -> Optional[str]:
         """Determine the type of a DevOps-related file"""
         # Check exact file names first
@@ -210,27 +221,28 @@ class DevOpsAgent:
             self.logger.error(f"Error creating DevOps overview: {str(e)}")
             return "Error creating DevOps overview"
     
-    def read_devops_files(self, devops_files: List[Dict]) -> str:
-        """Read and format DevOps-related files"""
+    def read_devops_files(self, devops_files: List[Dict], template: Optional[str] = None) -> str:
+        """Read and format DevOps-related files that fit in the prompt ``template``"""
         try:
-            content = []
-            
-            for file_info in devops_files:
-                try:
-                    with open(file_info['path'], 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        if file_content.strip():  # Only include non-empty files
-                            content.append(
-                                f"Arquivo: {file_info['relative_path']}\n"
-                                f"Tipo: {file_info['type']}\n\n"
-                                f"```yaml\n"  # Most DevOps files are YAML or similar
-                                f"{file_content}\n"
-                                f"```\n\n"
-                            )
-                except Exception as e:
-                    self.logger.warning(f"Could not read file {file_info['path']}: {str(e)}")
-            
-            return "".join(content)
+            readable = []
+            
+            for file_info, result in zip(devops_files, read_files([item['path'] for item in devops_files])):
+                if result.text is None:
+                    self.logger.warning(f"Could not read file {file_info['path']}: {result.skipped}")
+                    continue
+                if result.text.strip():  # Only include non-empty files
+                    readable.append((file_info, result))
+            
+            def block(file_info: Dict, file_content: str) -> str:
+                return (
+                    f"Arquivo: {file_info['relative_path']}\n"
+                    f"Tipo: {file_info['type']}\n\n"
+                    f"```yaml\n"  # Most DevOps files are YAML or similar
+                    f"{file_content}\n"
+                    f"```\n\n"
+                )
+            
+            return pack_files(readable, template, block)
             
         except Exception as e:
             self.logger.error(f"Error reading DevOps files: {str(e)}")
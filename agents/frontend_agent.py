@@ -1,9 +1,16 @@
 # agents/frontend_agent.py
 
+import os
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from indexing.search import search_project
+from model.packer import PACKER, PackItem
+
 class FrontendAgent:
     def __init__(self, model):
         if not model:
@@ -35,7 +42,7 @@ class FrontendAgent:
                 return "Nenhum arquivo frontend encontrado no projeto."
             
             # Read file contents
-            file_contents = self._read_relevant_files(frontend_files, user_message)
+            file_contents = self._read_relevant_files(frontend_files, user_message, project_path)
             
             # Create analysis prompt
             prompt = self._create_analysis_prompt(user_message, file_contents)
@@ -51,62 +58,74 @@ class FrontendAgent:
     def _get_frontend_files(self, project_path: str) -> Dict[str, List[Path]]:
         """Get frontend-related files from the project"""
         try:
-            files: Dict[str, List[Path]] = {
-                'html': [],
-                'css': [],
-                'javascript': [],
-                'assets': [],
-                'config': []
-            }
-            
-            path = Path(project_path)
-            
-            # Directories to ignore
-            ignore_dirs = {'.git', '__pycache__', 'node_modules', 'venv', 'env', '.env'}
-            
-            for item in path.rglob('*'):
-                # Skip ignored directories
-                if any(ignore_dir in item.parts for ignore_dir in ignore_dirs):
-                    continue
-                
-                # Categorize files by type
-                if item.is_file():
-                    for file_type, extensions in self.frontend_patterns.items():
-                        if any(str(item).lower().endswith(ext) for ext in extensions):
-                            files[file_type].append(item)
-                            break
+            files = scan_project(project_path).view('frontend', self._classify_frontend_files)
             
             # Log found files
             total_files = sum(len(files_list) for files_list in files.values())
             self.logger.info(f"Found {total_files} frontend-related files")
             
-            return files
+            return {file_type: list(files_list) for file_type, files_list in files.items()}
             
         except Exception as e:
             self.logger.error(f"Error getting frontend files: {str(e)}")
             return {}
     
-    def _read_relevant_files(self, files: Dict[str, List[Path]], user_message: str) -> Dict[str, str]:
+    def _classify_frontend_files(self, table: FileTable) -> Dict[str, List[Path]]:
+        """Categorize frontend-related files from the project scan"""
+        files: Dict[str, List[Path]] = {file_type: [] for file_type in self.frontend_patterns}
+        
+        # Directories to ignore
+        ignore_dirs = {'.git', '__pycache__', 'node_modules', 'venv', 'env', '.env'}
+        
+        selected = table.excluding(ignore_dirs)
+        for index, item in enumerate(table):
+            # Skip ignored directories
+            if not selected[index]:
+                continue
+            
+            # Categorize files by type
+            path_lower = item.path.lower()
+            for file_type, extensions in self.frontend_patterns.items():
+                if any(path_lower.endswith(ext) for ext in extensions):
+                    files[file_type].append(Path(item.path))
+                    break
+        
+        return files
+    
+    def _read_relevant_files(self, files: Dict[str, List[Path]], user_message: str,
+                             project_path: str) -> Dict[str, str]:
         """Read and filter relevant files based on user request"""
         try:
             contents = {}
-            message_lower = user_message.lower()
-            
-            # Keywords to look for in filenames based on user message
-            keywords = set(message_lower.split())
             
+            selected = []
             for file_type, file_list in files.items():
                 # Sort files by relevance
-                sorted_files = self._sort_files_by_relevance(file_list, keywords)
+                sorted_files = self._sort_files_by_relevance(file_list, user_message, project_path)
                 
                 # Take only the most relevant files up to the limit
-                for file_path in sorted_files[:self.max_files_per_type]:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            relative_path = str(file_path.relative_to(Path.cwd()))
-                            contents[relative_path] = f.read()
-                    except Exception as e:
-                        self.logger.warning(f"Could not read file {file_path}: {str(e)}")
+                selected.extend(sorted_files[:self.max_files_per_type])
+            
+            readable = []
+            for file_path, result in zip(selected, read_files([str(path) for path in selected])):
+                if result.text is None:
+                    self.logger.warning(f"Could not read file {file_path}: {result.skipped}")
+                    continue
+                try:
+                    readable.append((str(file_path.relative_to(Path.cwd())), result))
+                except Exception as e:
+                    self.logger.warning(f"Could not read file {file_path}: {str(e)}")
+            
+            # Keep only what fits in the model's input limit (see model.packer)
+            items = [
+                PackItem(result.path, result.text, overhead=PACKER.counter.count(self._file_block(relative_path, '')),
+                         outlined=result.outlined)
+                for relative_path, result in readable
+            ]
+            budget = PACKER.budget(self._create_analysis_prompt(user_message, {}))
+            for (relative_path, _), packed in zip(readable, PACKER.pack(items, budget)):
+                if packed.text is not None:
+                    contents[relative_path] = packed.text
             
             return contents
             
@@ -114,17 +133,12 @@ class FrontendAgent:
             self.logger.error(f"Error reading files: {str(e)}")
             return {}
     
-    def _sort_files_by_relevance(self, files: List[Path], keywords: set) -> List[Path]:
-        """Sort files by relevance to user request"""
+    def _sort_files_by_relevance(self, files: List[Path], user_message: str, project_path: str) -> List[Path]:
+        """Sort files by BM25 relevance to user request, then by the path heuristics"""
         def calculate_relevance(file_path: Path) -> int:
             score = 0
             path_str = str(file_path).lower()
             
-            # Check for keywords in path
-            for keyword in keywords:
-                if keyword in path_str:
-                    score += 1
-            
             # Prioritize main/index files
             if 'main' in path_str or 'index' in path_str:
                 score += 2
@@ -135,7 +149,12 @@ class FrontendAgent:
             
             return score
         
-        return sorted(files, key=calculate_relevance, reverse=True)
+        root = os.path.abspath(project_path)
+        by_path = {os.path.relpath(str(file_path), root): file_path for file_path in files}
+        ranked = [by_path[path] for path, _ in search_project(project_path, user_message, by_path)]
+        chosen = set(ranked)
+        rest = [file_path for file_path in files if file_path not in chosen]
+        return ranked + sorted(rest, key=calculate_relevance, reverse=True)
     
     def _create_analysis_prompt(self, user_message: str, file_contents: Dict[str, str]) -> str:
         """Create a prompt for frontend analysis"""
@@ -182,6 +201,10 @@ class FrontendAgent:
         
         # Add file contents to prompt
         for file_path, content in file_contents.items():
-            prompt += f"\n[{file_path}]\n```\n{content}\n```\n"
+            prompt += self._file_block(file_path, content)
         
         return prompt
+    
+    @staticmethod
+    def _file_block(file_path: str, content: str) -> str:
+        return f"\n[{file_path}]\n```\n{content}\n```\n"
@@ -2,9 +2,14 @@
 
 import os
 import logging
-from pathlib import Path
 from typing import Optional, List, Dict
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from indexing.search import select_relevant
+from model.packer import pack_files
+
 class ProjectImprovementAgent:
     def __init__(self, model):
         if not model:
@@ -46,38 +51,14 @@ class ProjectImprovementAgent:
             # Create project overview
             overview = self.create_project_overview(project_files)
             
-            # Read relevant files
-            code_content = self.read_project_files(project_files)
+            # Read the most relevant files that fit in the prompt
+            relevant_files = select_relevant(project_path, project_files, user_request)
+            code_content = self.read_project_files(
+                relevant_files, self._create_analysis_prompt(user_request, overview, '')
+            )
             
             # Create improvement prompt based on user request
-            prompt = f"""
-            Analise o código a seguir e sugira melhorias com base nesta solicitação: {user_request}
-
-            Visão Geral do Projeto:
-            {overview}
-
-            Conteúdo do Código:
-            {code_content}
-
-            Por favor, forneça:
-            1. Melhorias específicas para cada arquivo relevante
-            2. Exemplos de código mostrando as mudanças sugeridas
-            3. Explicações claras de por que cada mudança é recomendada
-            4. Localização exata onde as mudanças devem ser feitas
-            5. Possíveis impactos ou considerações sobre as mudanças
-            6. Alternativas modernas ou melhores práticas a considerar
-            7. Guia passo a passo de implementação quando aplicável
-
-            Formate a resposta com:
-            - Seções claras com títulos
-            - Marcadores para listar itens
-            - Blocos de código usando ``` mostrando exemplos antes/depois
-            - Destaque para nomes de arquivos
-            - Explicações claras e objetivas
-            - Priorização das melhorias mais importantes
-
-            Use Português do Brasil e mantenha um tom profissional mas amigável.
-            """
+            prompt = self._create_analysis_prompt(user_request, overview, code_content)
             
             self.logger.info("Gerando sugestões de melhorias")
             return self.model.generate(prompt)
@@ -86,34 +67,55 @@ class ProjectImprovementAgent:
             self.logger.error(f"Erro ao sugerir melhorias: {str(e)}")
             raise Exception(f"Erro ao sugerir melhorias: {str(e)}")
     
+    def _create_analysis_prompt(self, user_request: str, overview: str, content: str) -> str:
+        """Cria o prompt de sugestões de melhorias"""
+        return f"""
+        Analise o código a seguir e sugira melhorias com base nesta solicitação: {user_request}
+
+        Visão Geral do Projeto:
+        {overview}
+
+        Conteúdo do Código:
+        {content}
+
+        Por favor, forneça:
+        1. Melhorias específicas para cada arquivo relevante
+        2. Exemplos de código mostrando as mudanças sugeridas
+        3. Explicações claras de por que cada mudança é recomendada
+        4. Localização exata onde as mudanças devem ser feitas
+        5. Possíveis impactos ou considerações sobre as mudanças
+        6. Alternativas modernas ou melhores práticas a considerar
+        7. Guia passo a passo de implementação quando aplicável
+
+        Formate a resposta com:
+        - Seções claras com títulos
+        - Marcadores para listar itens
+        - Blocos de código usando ``` mostrando exemplos antes/depois
+        - Destaque para nomes de arquivos
+        - Explicações claras e objetivas
+        - Priorização das melhorias mais importantes
+
+        Use Português do Brasil e mantenha um tom profissional mas amigável.
+        """
+    
     def get_project_files(self, project_path: str) -> List[Dict]:
         """Get list of relevant files in the project"""
         try:
-            files = []
-            path = Path(project_path)
-            
-            for item in path.rglob('*'):
-                # Skip ignored directories
-                if any(ignore_dir in item.parts for ignore_dir in self.ignore_dirs):
-                    continue
-                
-                # Include only files with relevant extensions
-                if item.is_file() and item.suffix in self.code_extensions:
-                    files.append({
-                        'path': str(item),
-                        'name': item.name,
-                        'extension': item.suffix,
-                        'language': self.code_extensions[item.suffix],
-                        'relative_path': str(item.relative_to(path))
-                    })
+            files = scan_project(project_path).view('project_improvement', self._classify_project_files)
             
             self.logger.info(f"Encontrados {len(files)} arquivos para análise")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Erro ao obter arquivos do projeto: {str(e)}")
             raise Exception(f"Erro ao obter arquivos do projeto: {str(e)}")
     
+    def _classify_project_files(self, table: FileTable) -> List[Dict]:
+        """Select files with relevant extensions from the project scan"""
+        # Skip ignored directories and keep only files with relevant extensions
+        selected = table.excluding(self.ignore_dirs) & table.extension_mask(self.code_extensions)
+        return table.rows(selected, 'language', self.code_extensions)
+    
     def create_project_overview(self, project_files: List[Dict]) -> str:
         """Create an overview of the project structure"""
         try:
@@ -140,27 +142,28 @@ class ProjectImprovementAgent:
             self.logger.error(f"Erro ao criar visão geral do projeto: {str(e)}")
             return "Erro ao criar visão geral do projeto"
     
-    def read_project_files(self, project_files: List[Dict]) -> str:
-        """Read and format the content of project files"""
+    def read_project_files(self, project_files: List[Dict], template: Optional[str] = None) -> str:
+        """Read and format the content of project files that fit in the prompt ``template``"""
         try:
-            code_content = []
+            readable = []
             
-            for file_info in project_files:
-                try:
-                    with open(file_info['path'], 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if content.strip():  # Only include non-empty files
-                            code_content.append(
-                                f"Arquivo: {file_info['relative_path']}\n"
-                                f"Linguagem: {file_info['language']}\n\n"
-                                f"```{file_info['language'].lower()}\n"
-                                f"{content}\n"
-                                f"```\n\n"
-                            )
-                except Exception as e:
-                    self.logger.warning(f"Não foi possível ler o arquivo {file_info['path']}: {str(e)}")
-            
-            return "".join(code_content)
+            for file_info, result in zip(project_files, read_files([item['path'] for item in project_files])):
+                if result.text is None:
+                    self.logger.warning(f"Não foi possível ler o arquivo {file_info['path']}: {result.skipped}")
+                    continue
+                if result.text.strip():  # Only include non-empty files
+                    readable.append((file_info, result))
+            
+            def block(file_info: Dict, content: str) -> str:
+                return (
+                    f"Arquivo: {file_info['relative_path']}\n"
+                    f"Linguagem: {file_info['language']}\n\n"
+                    f"```{file_info['language'].lower()}\n"
+                    f"{content}\n"
+                    f"```\n\n"
+                )
+            
+            return pack_files(readable, template, block)
             
         except Exception as e:
             self.logger.error(f"Erro ao ler arquivos do projeto: {str(e)}")
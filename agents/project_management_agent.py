@@ -2,9 +2,14 @@
 
 import os
 import logging
-from pathlib import Path
 from typing import Optional, List, Dict
 
+from indexing.reader import read_files
+from indexing.file_table import FileTable
+from indexing.scanner import scan_project
+from indexing.search import select_relevant
+from model.packer import pack_files
+
 class ProjectManagementAgent:
     def __init__(self, model):
         if not model:
@@ -84,36 +89,14 @@ class ProjectManagementAgent:
             # Create analysis overview
             overview = self.create_pm_overview(pm_files)
             
-            # Read relevant files
-            content = self.read_pm_files(pm_files)
+            # Read the most relevant files that fit in the prompt
+            relevant_files = select_relevant(project_path, pm_files, user_request)
+            content = self.read_pm_files(
+                relevant_files, self._create_analysis_prompt(user_request, overview, '')
+            )
             
             # Create analysis prompt
-            prompt = f"""
-            Analise os aspectos relacionados ao gerenciamento do projeto com base na solicitação: {user_request}
-
-            Visão Geral do Projeto:
-            {overview}
-
-            Conteúdo dos Arquivos:
-            {content}
-
-            Por favor, forneça:
-            1. Análise da estrutura e organização do projeto
-            2. Avaliação da documentação
-            3. Análise do controle de versão
-            4. Avaliação do processo de build e deployment
-            5. Análise da gestão de dependências
-            6. Avaliação dos testes e qualidade
-            7. Análise do processo de desenvolvimento
-            8. Identificação de boas práticas
-            9. Identificação de possíveis problemas
-            10. Sugestões de melhorias na organização
-            11. Recomendações para documentação
-            12. Sugestões para otimização do workflow
-
-            Formate a resposta de forma clara e organizada, usando markdown.
-            Destaque os pontos mais importantes e urgentes.
-            """
+            prompt = self._create_analysis_prompt(user_request, overview, content)
             
             self.logger.info("Gerando análise do gerenciamento do projeto")
             return self.model.generate(prompt)
@@ -122,49 +105,66 @@ class ProjectManagementAgent:
             self.logger.error(f"Erro ao analisar gerenciamento do projeto: {str(e)}")
             raise Exception(f"Erro ao analisar gerenciamento do projeto: {str(e)}")
     
+    def _create_analysis_prompt(self, user_request: str, overview: str, content: str) -> str:
+        """Create the project management analysis prompt"""
+        return f"""
+        Analise os aspectos relacionados ao gerenciamento do projeto com base na solicitação: {user_request}
+
+        Visão Geral do Projeto:
+        {overview}
+
+        Conteúdo dos Arquivos:
+        {content}
+
+        Por favor, forneça:
+        1. Análise da estrutura e organização do projeto
+        2. Avaliação da documentação
+        3. Análise do controle de versão
+        4. Avaliação do processo de build e deployment
+        5. Análise da gestão de dependências
+        6. Avaliação dos testes e qualidade
+        7. Análise do processo de desenvolvimento
+        8. Identificação de boas práticas
+        9. Identificação de possíveis problemas
+        10. Sugestões de melhorias na organização
+        11. Recomendações para documentação
+        12. Sugestões para otimização do workflow
+
+        Formate a resposta de forma clara e organizada, usando markdown.
+        Destaque os pontos mais importantes e urgentes.
+        """
+    
     def get_pm_files(self, project_path: str) -> List[Dict]:
         """Get project management related files"""
         try:
-            files = []
-            path = Path(project_path)
-            
-            for item in path.rglob('*'):
-                # Skip certain directories
-                if any(part in ['node_modules', 'venv', '__pycache__'] for part in item.parts):
-                    continue
-                
-                # Check if file/directory matches known patterns
-                for pattern, file_type in self.pm_files.items():
-                    if pattern.endswith('/'):
-                        # Directory pattern
-                        if pattern[:-1] in str(item):
-                            if item.is_file():
-                                files.append({
-                                    'path': str(item),
-                                    'name': item.name,
-                                    'extension': item.suffix,
-                                    'type': file_type,
-                                    'relative_path': str(item.relative_to(path))
-                                })
-                    else:
-                        # File pattern
-                        if item.name == pattern or item.suffix == pattern:
-                            if item.is_file():
-                                files.append({
-                                    'path': str(item),
-                                    'name': item.name,
-                                    'extension': item.suffix,
-                                    'type': file_type,
-                                    'relative_path': str(item.relative_to(path))
-                                })
+            files = scan_project(project_path).view('project_management', self._classify_pm_files)
             
             self.logger.info(f"Found {len(files)} project management related files")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Error getting project management files: {str(e)}")
             raise Exception(f"Error getting project management files: {str(e)}")
     
+    def _classify_pm_files(self, table: FileTable) -> List[Dict]:
+        """Select project management related files from the project scan"""
+        # Skip certain directories
+        selected = table.excluding(['node_modules', 'venv', '__pycache__'])
+        
+        # Check if file matches known patterns
+        matches = []
+        for pattern, file_type in self.pm_files.items():
+            if pattern.endswith('/'):
+                # Directory pattern (the name can contain it too)
+                in_dir = table.directory_mask(lambda directory: pattern[:-1] in os.path.join(table.root, directory))
+                found = in_dir | table.file_mask(lambda file: pattern[:-1] in file.name, selected & ~in_dir)
+            else:
+                # File pattern
+                found = table.named([pattern]) | table.extension_mask([pattern])
+            matches.append((found & selected, file_type))
+        
+        return table.tagged('type', matches)
+    
     def create_pm_overview(self, pm_files: List[Dict]) -> str:
         """Create an overview of project management files"""
         try:
@@ -213,10 +213,10 @@ class ProjectManagementAgent:
             self.logger.error(f"Error creating project management overview: {str(e)}")
             return "Error creating project management overview"
     
-    def read_pm_files(self, pm_files: List[Dict]) -> str:
-        """Read and format project management files"""
+    def read_pm_files(self, pm_files: List[Dict], template: Optional[str] = None) -> str:
+        """Read and format project management files that fit in the prompt ``template``"""
         try:
-            content = []
+            readable = []
             
             # Priority files to read first
             priority_files = ['README.md', 'CONTRIBUTING.md', 'CHANGELOG.md']
@@ -227,34 +227,35 @@ class ProjectManagementAgent:
                 key=lambda x: (x['name'] not in priority_files, x['name'])
             )
             
-            for file_info in sorted_files:
-                try:
-                    with open(file_info['path'], 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        if file_content.strip():  # Only include non-empty files
-                            # Determine language for code block
-                            if file_info['extension'] in ['.md', '.txt']:
-                                lang = 'markdown'
-                            elif file_info['extension'] in ['.json', '.js']:
-                                lang = 'javascript'
-                            elif file_info['extension'] in ['.yml', '.yaml']:
-                                lang = 'yaml'
-                            elif file_info['extension'] == '.py':
-                                lang = 'python'
-                            else:
-                                lang = 'plaintext'
-                            
-                            content.append(
-                                f"Arquivo: {file_info['relative_path']}\n"
-                                f"Tipo: {file_info['type']}\n\n"
-                                f"```{lang}\n"
-                                f"{file_content}\n"
-                                f"```\n\n"
-                            )
-                except Exception as e:
-                    self.logger.warning(f"Could not read file {file_info['path']}: {str(e)}")
+            for file_info, result in zip(sorted_files, read_files([item['path'] for item in sorted_files])):
+                if result.text is None:
+                    self.logger.warning(f"Could not read file {file_info['path']}: {result.skipped}")
+                    continue
+                if result.text.strip():  # Only include non-empty files
+                    readable.append((file_info, result))
+            
+            def block(file_info: Dict, file_content: str) -> str:
+                # Determine language for code block
+                if file_info['extension'] in ['.md', '.txt']:
+                    lang = 'markdown'
+                elif file_info['extension'] in ['.json', '.js']:
+                    lang = 'javascript'
+                elif file_info['extension'] in ['.yml', '.yaml']:
+                    lang = 'yaml'
+                elif file_info['extension'] == '.py':
+                    lang = 'python'
+                else:
+                    lang = 'plaintext'
+                
+                return (
+                    f"Arquivo: {file_info['relative_path']}\n"
+                    f"Tipo: {file_info['type']}\n\n"
+                    f"```{lang}\n"
+                    f"{file_content}\n"
+                    f"```\n\n"
+                )
             
-            return "".join(content)
+            return pack_files(readable, template, block)
             
         except Exception as e:
             self.logger.error(f"Error reading project management files: {str(e)}")
@@ -67,6 +67,10 @@ class ResponseOptimizerAgent:
             self.logger.error(f"Error optimizing responses: {str(e)}")
             raise Exception(f"Erro ao otimizar respostas: {str(e)}")
     
+    def optimize_response(self, combined_response: str, user_message: str) -> str:
+        """Optimize an already combined response from several agents"""
+        return self.optimize_responses({'Agentes': combined_response}, user_message, {})
+    
     def _format_response(self, response: str) -> str:
         """Format response ensuring all file contents are in code blocks"""
         try:
@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+
+"""
+Benchmarks package for the Project Analyzer.
+This package contains a local stand-in for the model API and load benchmarks.
+"""
+
+from .stub_server import StubServer, StubConfig
+
+__all__ = ['StubServer', 'StubConfig']
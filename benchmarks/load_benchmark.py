@@ -0,0 +1,224 @@
+# benchmarks/load_benchmark.py
+"""
+Benchmark de carga de ponta a ponta para /api/projects/<id>/analyze.
+
+Sobe a aplicação Flask no próprio processo com um banco SQLite e um cache
+temporários, aponta o TransformerModel para o servidor simulado e dispara
+requisições em malha aberta na taxa alvo. A latência de cada requisição é
+medida a partir do instante agendado, de modo que filas acumuladas aparecem
+nos percentis em vez de reduzirem a carga.
+
+Uso:
+    python -m benchmarks.load_benchmark --rps 5 --duration 30 --project .
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import concurrent.futures
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.stub_server import StubServer, add_stub_arguments, config_from_args
+
+logger = logging.getLogger(__name__)
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil pelo método do posto mais próximo"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class LoadBenchmark:
+    """Gera carga na rota de análise e coleta latências"""
+
+    def __init__(self, app, project_id: int, username: str, password: str,
+                 message: str, unique_messages: bool = True):
+        self.app = app
+        self.project_id = project_id
+        self.username = username
+        self.password = password
+        self.message = message
+        self.unique_messages = unique_messages
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.service_times: List[float] = []
+        self.statuses: Dict[int, int] = {}
+
+    def _client(self):
+        """Cliente de teste autenticado, um por thread"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.app.test_client()
+            client.post('/login', data={'username': self.username, 'password': self.password})
+            self._local.client = client
+        return client
+
+    def _request(self, index: int, scheduled_at: float) -> None:
+        message = f"{self.message} (requisição {index})" if self.unique_messages else self.message
+        started_at = time.perf_counter()
+        try:
+            response = self._client().post(
+                f'/api/projects/{self.project_id}/analyze',
+                json={'type': 'benchmark', 'message': message}
+            )
+            status = response.status_code
+        except Exception as e:
+            logger.error(f"Erro na requisição {index}: {str(e)}")
+            status = 0
+        finished_at = time.perf_counter()
+
+        with self._lock:
+            self.latencies.append(finished_at - scheduled_at)
+            self.service_times.append(finished_at - started_at)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def run(self, rps: float, duration: float, concurrency: int) -> Dict:
+        """Dispara requisições na taxa alvo durante o tempo indicado"""
+        total = max(1, int(rps * duration))
+        interval = 1.0 / rps
+        started_at = time.perf_counter()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for index in range(total):
+                scheduled_at = started_at + index * interval
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._request, index, scheduled_at)
+
+        elapsed = time.perf_counter() - started_at
+        completed = len(self.latencies)
+        succeeded = sum(count for status, count in self.statuses.items() if 200 <= status < 300)
+
+        return {
+            'target_rps': rps,
+            'requests': completed,
+            'succeeded': succeeded,
+            'failed': completed - succeeded,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'elapsed_seconds': elapsed,
+            'throughput_rps': completed / elapsed if elapsed else 0.0,
+            'latency_seconds': {
+                'p50': percentile(self.latencies, 50),
+                'p95': percentile(self.latencies, 95),
+                'p99': percentile(self.latencies, 99),
+                'max': max(self.latencies) if self.latencies else None
+            },
+            'service_time_seconds': {
+                'p50': percentile(self.service_times, 50),
+                'p95': percentile(self.service_times, 95),
+                'p99': percentile(self.service_times, 99)
+            }
+        }
+
+def prepare_app(project_path: str, workdir: str):
+    """Cria a aplicação com banco e cache temporários, além de usuário e projeto"""
+    os.environ['DATABASE_URI'] = f"sqlite:///{Path(workdir) / 'benchmark.db'}"
+    os.environ['CACHE_DIR'] = str(Path(workdir) / 'cache')
+
+    from main import create_app
+    from database import db
+    from models.user import User
+    from models.project import Project
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    username, password = 'benchmark', 'benchmark'
+    with app.app_context():
+        user = User(username=username, email='benchmark@example.com')
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+        project = Project(
+            name='benchmark',
+            path=str(Path(project_path).resolve()),
+            description='Projeto usado no benchmark de carga',
+            user_id=user.id
+        )
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+
+    return app, project_id, username, password
+
+def format_report(report: Dict) -> str:
+    """Formata o relatório para leitura no terminal"""
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.1f} ms"
+
+    latency = report['latency_seconds']
+    service = report['service_time_seconds']
+    lines = [
+        f"Requisições:       {report['requests']} ({report['succeeded']} ok, {report['failed']} falhas)",
+        f"Status:            {report['statuses']}",
+        f"Taxa alvo:         {report['target_rps']:.2f} req/s",
+        f"Vazão obtida:      {report['throughput_rps']:.2f} req/s",
+        f"Latência p50/p95/p99: {ms(latency['p50'])} / {ms(latency['p95'])} / {ms(latency['p99'])}",
+        f"Serviço  p50/p95/p99: {ms(service['p50'])} / {ms(service['p95'])} / {ms(service['p99'])}"
+    ]
+    if 'stub' in report:
+        lines.append(f"Servidor simulado: {report['stub']}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da rota de análise")
+    parser.add_argument('--project', default='.', help='Diretório do projeto a ser analisado')
+    parser.add_argument('--rps', type=float, default=2.0, help='Taxa alvo de requisições por segundo')
+    parser.add_argument('--duration', type=float, default=10.0, help='Duração da geração de carga em segundos')
+    parser.add_argument('--concurrency', type=int, default=32, help='Máximo de requisições simultâneas')
+    parser.add_argument('--message', default='Analise a qualidade do código deste projeto',
+                        help='Mensagem enviada em cada análise')
+    parser.add_argument('--repeat-message', action='store_true',
+                        help='Repetir a mesma mensagem (exercita o cache de respostas)')
+    parser.add_argument('--api-base', default=None,
+                        help='Usar um servidor já em execução em vez do servidor simulado interno')
+    parser.add_argument('--json', action='store_true', help='Imprimir o relatório em JSON')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    stub = None
+    if args.api_base:
+        api_base = args.api_base
+    else:
+        stub = StubServer(config_from_args(args)).start()
+        api_base = stub.api_base
+
+    os.environ['OPENAI_API_BASE'] = api_base
+    os.environ.setdefault('OPENAI_API_KEY', 'stub-key')
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            app, project_id, username, password = prepare_app(args.project, workdir)
+            benchmark = LoadBenchmark(
+                app, project_id, username, password,
+                message=args.message,
+                unique_messages=not args.repeat_message
+            )
+            report = benchmark.run(args.rps, args.duration, args.concurrency)
+            if stub:
+                report['stub'] = stub.stats.as_dict()
+    finally:
+        if stub:
+            stub.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+# benchmarks/stub_server.py
+"""
+Servidor local compatível com o endpoint ChatCompletion da OpenAI.
+
+Permite medir o desempenho da aplicação sem acessar a API paga. A latência
+até o primeiro token segue uma distribuição configurável, a geração respeita
+uma taxa de tokens por segundo e erros podem ser injetados com probabilidade
+configurável.
+
+Uso:
+    python -m benchmarks.stub_server --port 8765 --latency lognormal:-1.5,0.5
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1 python main.py
+"""
+
+import json
+import math
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "análise código projeto arquivo função módulo melhoria sugestão estrutura "
+    "desempenho segurança teste documentação rota modelo serviço"
+).split()
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Cria um gerador de latências (em segundos) a partir de uma especificação
+
+    Formatos aceitos:
+        constant:0.2
+        uniform:0.1,0.5
+        normal:0.3,0.05
+        lognormal:-1.5,0.5   (parâmetros mu e sigma do logaritmo)
+        exponential:0.3      (média)
+    """
+    name, _, raw_args = spec.partition(':')
+    args = [float(value) for value in raw_args.split(',') if value]
+
+    if name == 'constant':
+        return lambda: args[0] if args else 0.0
+    if name == 'uniform':
+        return lambda: rng.uniform(args[0], args[1])
+    if name == 'normal':
+        return lambda: max(0.0, rng.gauss(args[0], args[1]))
+    if name == 'lognormal':
+        return lambda: rng.lognormvariate(args[0], args[1])
+    if name == 'exponential':
+        return lambda: rng.expovariate(1.0 / args[0])
+    raise ValueError(f"Distribuição de latência desconhecida: {spec}")
+
+class StubConfig:
+    """Parâmetros de comportamento do servidor simulado"""
+
+    def __init__(self, latency: str = "constant:0.05", tokens_per_second: float = 200.0,
+                 completion_tokens: int = 200, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.latency_spec = latency
+        self.latency = parse_latency(latency, self.rng)
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+
+    def draw(self) -> Dict:
+        """Sorteia latência e falha de uma requisição"""
+        with self._lock:
+            roll = self.rng.random()
+            return {
+                'latency': self.latency(),
+                'rate_limited': roll < self.rate_limit_rate,
+                'error': self.rate_limit_rate <= roll < self.rate_limit_rate + self.error_rate
+            }
+
+class StubStats:
+    """Contadores de requisições atendidas pelo servidor"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.completion_tokens = 0
+
+    def record(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'rate_limited': self.rate_limited,
+                'completion_tokens': self.completion_tokens
+            }
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Atende POST /v1/chat/completions no formato da API"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON', 'type': 'invalid_request_error'}})
+            return
+
+        config: StubConfig = self.server.config
+        stats: StubStats = self.server.stats
+        draw = config.draw()
+        stats.record(requests=1)
+
+        if draw['rate_limited']:
+            stats.record(rate_limited=1)
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                            headers={'Retry-After': str(config.retry_after)})
+            return
+
+        time.sleep(draw['latency'])
+
+        if draw['error']:
+            stats.record(errors=1)
+            self._send_json(500, {'error': {'message': 'Injected server error', 'type': 'server_error'}})
+            return
+
+        prompt_tokens = sum(
+            math.ceil(len(message.get('content') or '') / 4) for message in payload.get('messages', [])
+        )
+        max_tokens = payload.get('max_tokens') or config.completion_tokens
+        completion_tokens = max(1, min(config.completion_tokens, max_tokens))
+        tokens = [config.rng.choice(WORDS) for _ in range(completion_tokens)]
+        stats.record(completion_tokens=completion_tokens)
+
+        if payload.get('stream'):
+            self._stream(payload, tokens, config)
+            return
+
+        # Tempo de geração proporcional ao número de tokens
+        if config.tokens_per_second > 0:
+            time.sleep(completion_tokens / config.tokens_per_second)
+
+        self._send_json(200, {
+            'id': f"chatcmpl-{uuid.uuid4().hex}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': " ".join(tokens)},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+    def _stream(self, payload: Dict, tokens, config: StubConfig) -> None:
+        """Envia a resposta como eventos SSE, um token por evento"""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        delay = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+        for i, token in enumerate(tokens):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': payload.get('model', 'stub'),
+                'choices': [{
+                    'index': 0,
+                    'delta': {'content': token if i == 0 else f" {token}"},
+                    'finish_reason': None
+                }]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            if delay:
+                time.sleep(delay)
+
+        final = {
+            'id': completion_id,
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': payload.get('model', 'stub'),
+            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP com fila de conexões adequada a testes de carga"""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+class StubServer:
+    """Servidor simulado executado em uma thread do próprio processo"""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self.httpd = StubHTTPServer((host, port), StubRequestHandler)
+        self.httpd.config = self.config
+        self.httpd.stats = self.stats
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_base(self) -> str:
+        """URL base a ser usada em OPENAI_API_BASE"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adiciona as opções de comportamento do servidor a um parser"""
+    parser.add_argument('--latency', default='constant:0.05',
+                        help='Distribuição da latência até o primeiro token (ex.: lognormal:-1.5,0.5)')
+    parser.add_argument('--tokens-per-second', type=float, default=200.0,
+                        help='Taxa de geração de tokens da resposta')
+    parser.add_argument('--completion-tokens', type=int, default=200,
+                        help='Número de tokens de cada resposta')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Probabilidade de responder com erro 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='Probabilidade de responder com erro 429')
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help='Valor do cabeçalho Retry-After nas respostas 429')
+    parser.add_argument('--seed', type=int, default=None, help='Semente do gerador aleatório')
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API ChatCompletion")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = StubServer(config_from_args(args), host=args.host, port=args.port)
+    logger.info(f"Servidor simulado em {server.api_base}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Servidor interrompido pelo usuário")
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# indexing/__init__.py
+
+"""
+Indexing package for the Project Analyzer.
+This package contains the project scanner shared by the agents and the
+persistent file index that keeps scans warm across restarts, the
+columnar file table the agents classify scans with, plus an
+inotify watcher used to keep file caches in sync with the disk, the
+content-addressed blob store shared by all projects, the symbol
+outlines agents can send instead of full files and the import graph used
+to focus prompts on the files a request is about.
+"""
+
+from .blob_store import BlobStore
+from .file_index import FileIndex
+from .file_table import FileRow, FileTable
+from .git_source import changed_files, head_commit, read_index
+from .import_graph import ImportGraph, focus_files, related_files
+from .outline import outline, render_mode
+from .reader import FileContent, FileReader, read_files
+from .scanner import ProjectScan, ProjectScanner, ScannedFile, scan_project, shared_scan
+from .search import SearchIndex, search_project, select_relevant
+from .watcher import InotifyWatcher
+
+__all__ = [
+    'BlobStore', 'FileContent', 'FileIndex', 'FileReader', 'FileRow', 'FileTable', 'ImportGraph', 'InotifyWatcher',
+    'ProjectScan', 'ProjectScanner', 'ScannedFile', 'SearchIndex', 'changed_files', 'focus_files', 'head_commit',
+    'outline', 'read_files', 'read_index', 'related_files', 'render_mode', 'scan_project', 'search_project',
+    'select_relevant', 'shared_scan'
+]
@@ -0,0 +1,209 @@
+# indexing/blob_store.py
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class BlobStore:
+    """Conteúdo de arquivos endereçado pelo hash, compartilhado entre projetos
+
+    Arquivos idênticos (forks e branches do mesmo repositório) são guardados
+    uma única vez. Cada ``put`` conta uma referência, desfeita por
+    ``release``; conteúdo sem referências é o primeiro a sair quando a
+    memória passa de ``memory_bytes``. Conteúdo ainda referenciado que não
+    cabe na memória vai para ``directory`` (se informado), limitado a
+    ``disk_bytes``; o que sai de vez faz ``get`` retornar None e o chamador
+    lê o arquivo de novo. Artefatos derivados do conteúdo (``derived``) são
+    calculados uma vez por hash e descartados junto com ele.
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_bytes: int = 64 * 1024 * 1024,
+                 disk_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.logger = logging.getLogger(__name__)
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._derived: Dict[str, Dict[Hashable, Any]] = {}
+        self._memory_used = 0
+        self._disk_used = 0
+        self._stats = {'puts': 0, 'deduplicated': 0, 'derived_hits': 0, 'derived_misses': 0}
+        self._lock = threading.Lock()
+        if directory:
+            self._load_disk()
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _load_disk(self) -> None:
+        """Registra os blobs já gravados, do mais antigo para o mais recente"""
+        found = []
+        try:
+            with os.scandir(self.directory) as shards:
+                for shard in shards:
+                    if not shard.is_dir():
+                        continue
+                    with os.scandir(shard.path) as entries:
+                        for entry in entries:
+                            if entry.name.endswith('.tmp'):
+                                continue
+                            stat = entry.stat()
+                            found.append((stat.st_mtime, entry.name, stat.st_size))
+        except FileNotFoundError:
+            return
+        for _, digest, size in sorted(found):
+            self._disk[digest] = size
+            self._disk_used += size
+
+    def put(self, text: str) -> str:
+        """Guarda o conteúdo (se ainda não existir) e conta uma referência"""
+        digest = self.digest(text)
+        with self._lock:
+            self._stats['puts'] += 1
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            if digest in self._memory:
+                self._stats['deduplicated'] += 1
+                self._memory.move_to_end(digest)
+                return digest
+            if digest in self._disk:
+                self._stats['deduplicated'] += 1
+            size = len(text.encode('utf-8', errors='surrogatepass'))
+            self._memory[digest] = text
+            self._sizes[digest] = size
+            self._memory_used += size
+            self._evict()
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """Conteúdo do hash; None se ele não está mais guardado"""
+        with self._lock:
+            text = self._memory.get(digest)
+            if text is not None:
+                self._memory.move_to_end(digest)
+                return text
+            if digest not in self._disk:
+                return None
+        try:
+            with open(self._path(digest), 'r', encoding='utf-8', errors='surrogatepass', newline='') as f:
+                text = f.read()
+        except OSError:
+            with self._lock:
+                self._forget_disk(digest)
+            return None
+        with self._lock:
+            if digest not in self._memory:
+                self._memory[digest] = text
+                self._sizes[digest] = len(text.encode('utf-8', errors='surrogatepass'))
+                self._memory_used += self._sizes[digest]
+                self._evict()
+        return text
+
+    def release(self, digest: str) -> None:
+        """Desfaz uma referência; o conteúdo fica disponível até ser despejado"""
+        with self._lock:
+            refs = self._refs.get(digest, 0) - 1
+            if refs > 0:
+                self._refs[digest] = refs
+            else:
+                self._refs.pop(digest, None)
+
+    def references(self, digest: str) -> int:
+        with self._lock:
+            return self._refs.get(digest, 0)
+
+    def derived(self, digest: str, kind: Hashable, build: Callable[[str], Any]) -> Any:
+        """Artefato ``kind`` do conteúdo, calculado na primeira consulta"""
+        with self._lock:
+            artefacts = self._derived.get(digest, {})
+            if kind in artefacts:
+                self._stats['derived_hits'] += 1
+                return artefacts[kind]
+            self._stats['derived_misses'] += 1
+        text = self.get(digest)
+        if text is None:
+            raise KeyError(digest)
+        result = build(text)
+        with self._lock:
+            if digest in self._memory or digest in self._disk:
+                return self._derived.setdefault(digest, {}).setdefault(kind, result)
+        return result
+
+    def _evict(self) -> None:
+        """Mantém a memória dentro do limite: primeiro o que não tem referências"""
+        if self._memory_used <= self.memory_bytes:
+            return
+        for referenced in (False, True):
+            for digest in list(self._memory):
+                if self._memory_used <= self.memory_bytes:
+                    return
+                if (digest in self._refs) != referenced:
+                    continue
+                text = self._memory.pop(digest)
+                size = self._sizes.pop(digest)
+                self._memory_used -= size
+                if referenced and self.directory and size <= self.disk_bytes:
+                    self._spill(digest, text, size)
+                elif digest not in self._disk:
+                    self._drop_derived(digest)
+
+    def _spill(self, digest: str, text: str, size: int) -> None:
+        if digest not in self._disk:
+            path = self._path(digest)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8', errors='surrogatepass', newline='') as f:
+                    f.write(text)
+                os.replace(temp_path, path)
+            except OSError as e:
+                self.logger.warning(f"Erro ao gravar blob {digest[:12]}: {str(e)}")
+                self._drop_derived(digest)
+                return
+            self._disk[digest] = size
+            self._disk_used += size
+        self._disk.move_to_end(digest)
+        while self._disk_used > self.disk_bytes and self._disk:
+            oldest = next(iter(self._disk))
+            self._forget_disk(oldest)
+            try:
+                os.remove(self._path(oldest))
+            except OSError:
+                pass
+
+    def _forget_disk(self, digest: str) -> None:
+        size = self._disk.pop(digest, None)
+        if size is not None:
+            self._disk_used -= size
+        if digest not in self._memory:
+            self._drop_derived(digest)
+
+    def _drop_derived(self, digest: str) -> None:
+        self._derived.pop(digest, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                self._stats,
+                blobs=len(self._memory),
+                memory_bytes=self._memory_used,
+                disk_blobs=len(self._disk),
+                disk_bytes=self._disk_used,
+                referenced=len(self._refs)
+            )
+
+# Armazenamento padrão, compartilhado por todos os projetos (BLOB_MEMORY_BYTES e
+# BLOB_DISK_BYTES definem os limites; BLOB_DIR ativa o transbordo para o disco)
+BLOBS = BlobStore(
+    directory=os.getenv("BLOB_DIR") or None,
+    memory_bytes=int(os.getenv("BLOB_MEMORY_BYTES", str(64 * 1024 * 1024))),
+    disk_bytes=int(os.getenv("BLOB_DISK_BYTES", str(512 * 1024 * 1024)))
+)
@@ -0,0 +1,121 @@
+# indexing/file_index.py
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+
+# Alterações feitas até este intervalo após a leitura podem ter o mesmo
+# mtime registrado (sistemas de arquivos com resolução grossa); registros
+# assim não são considerados confiáveis na próxima varredura
+RACY_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    inode INTEGER NOT NULL,
+    entries TEXT NOT NULL
+);
+"""
+
+@dataclass
+class DirectoryRecord:
+    """Listagem de um diretório e o estado dele quando foi listado"""
+    mtime: float
+    inode: int
+    entries: List[Tuple[str, str]]
+
+def index_path(index_dir: str, root: str) -> str:
+    """Arquivo do índice de um projeto, identificado pelo caminho absoluto"""
+    name = hashlib.sha256(os.path.abspath(root).encode('utf-8', errors='surrogateescape')).hexdigest()[:16]
+    return os.path.join(index_dir, f"{name}.sqlite3")
+
+class FileIndex:
+    """Índice persistente dos diretórios de um projeto (SQLite)
+
+    Guarda, por caminho relativo, a listagem de cada diretório com o seu
+    mtime e inode. A varredura seguinte reutiliza a listagem dos diretórios
+    que não mudaram e só lista novamente os demais. Em modo WAL, o mesmo
+    índice pode ser usado ao mesmo tempo pelo processo web e pelo worker.
+    """
+
+    def __init__(self, db_path: str, root: str):
+        self.db_path = db_path
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._check_schema()
+
+    def _check_schema(self) -> None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row and int(row[0]) == SCHEMA_VERSION:
+            return
+        # Versão diferente: o índice é apenas um cache e pode ser reconstruído
+        with self._transaction():
+            self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute("DROP TABLE directories")
+        self._conn.executescript(SCHEMA)
+        with self._transaction():
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (self.root,))
+
+    def _transaction(self):
+        conn = self._conn
+
+        class Transaction:
+            def __enter__(self):
+                conn.execute("BEGIN IMMEDIATE")
+
+            def __exit__(self, exc_type, *_):
+                conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+        return Transaction()
+
+    def snapshot(self) -> Dict[str, DirectoryRecord]:
+        """Listagem registrada de todos os diretórios"""
+        with self._lock:
+            return {
+                path: DirectoryRecord(mtime, inode, [tuple(entry) for entry in json.loads(entries)])
+                for path, mtime, inode, entries in self._conn.execute(
+                    "SELECT path, mtime, inode, entries FROM directories"
+                )
+            }
+
+    def update(self, directories: Iterable[Tuple[str, DirectoryRecord]], removed_directories: Iterable[str]) -> None:
+        """Grava as mudanças de uma varredura em uma única transação"""
+        directories, removed_directories = list(directories), list(removed_directories)
+        if not (directories or removed_directories):
+            return
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?)",
+                [(path, r.mtime, r.inode, json.dumps(r.entries)) for path, r in directories]
+            )
+            self._conn.executemany(
+                "DELETE FROM directories WHERE path = ?", [(path,) for path in removed_directories]
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            directories = self._conn.execute("SELECT COUNT(*) FROM directories").fetchone()[0]
+        return {'directories': directories}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
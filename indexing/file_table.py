@@ -0,0 +1,149 @@
+# indexing/file_table.py
+import os
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Callable, Collection, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .scanner import ScannedFile
+
+# Campos de FileRow lidos do próprio arquivo da varredura
+FILE_FIELDS = ('path', 'name', 'extension', 'relative_path')
+
+class FileRow(Mapping):
+    """Descrição de um arquivo no formato usado pelos agentes, sem copiar os campos
+
+    Funciona como o dicionário de ``ScannedFile.info`` ('path', 'name',
+    'extension', 'relative_path' e os campos extras, como 'language'), mas
+    guarda só o arquivo da varredura e uma tupla de campos extras, que é
+    compartilhada entre os arquivos com a mesma classificação.
+    """
+    __slots__ = ('file', 'fields')
+
+    def __init__(self, file: "ScannedFile", fields: Tuple[Tuple[str, Any], ...] = ()):
+        self.file = file
+        self.fields = fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key in FILE_FIELDS:
+            return getattr(self.file, key)
+        for name, value in self.fields:
+            if name == key:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from FILE_FIELDS
+        for name, _ in self.fields:
+            yield name
+
+    def __len__(self) -> int:
+        return len(FILE_FIELDS) + len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"FileRow({dict(self)!r})"
+
+class FileTable:
+    """Metadados dos arquivos de uma varredura em colunas, para filtros vetorizados
+
+    Extensões e diretórios (caminho relativo do diretório, com o separador no
+    final) são guardados uma vez cada e os arquivos têm só os códigos deles
+    em arrays do numpy. Um filtro por extensão ou por diretório avalia a regra
+    uma vez por valor distinto e seleciona os arquivos indexando o resultado
+    pelos códigos. As máscaras seguem a ordem de ``files``.
+    """
+
+    def __init__(self, root: str, files: Sequence["ScannedFile"]):
+        self.root = root
+        self.files = files
+        extension_codes: Dict[str, int] = {}
+        directory_codes: Dict[str, int] = {}
+        extensions, directories, sizes = [], [], []
+        for file in files:
+            extension = extension_codes.get(file.extension)
+            if extension is None:
+                extension = extension_codes[file.extension] = len(extension_codes)
+            directory_path = file.relative_path[:len(file.relative_path) - len(file.name)]
+            directory = directory_codes.get(directory_path)
+            if directory is None:
+                directory = directory_codes[directory_path] = len(directory_codes)
+            extensions.append(extension)
+            directories.append(directory)
+            sizes.append(file.size)
+        self.extension = np.array(extensions, dtype=np.int32)
+        self.directory = np.array(directories, dtype=np.int32)
+        self.size = np.array(sizes, dtype=np.int64)
+        self.extensions: List[str] = list(extension_codes)
+        self.directories: List[str] = list(directory_codes)
+
+    def extension_mask(self, accept: Union[Collection[str], Callable[[str], bool]]) -> np.ndarray:
+        """Arquivos cuja extensão está em ``accept`` (ou é aceita pela função)"""
+        return _lookup(self.extensions, accept)[self.extension]
+
+    def directory_mask(self, accept: Callable[[str], bool]) -> np.ndarray:
+        """Arquivos cujo diretório relativo ('' na raiz, 'api/' abaixo dela) é aceito"""
+        return _lookup(self.directories, accept)[self.directory]
+
+    def file_mask(self, accept: Callable[["ScannedFile"], bool], where: Optional[np.ndarray] = None) -> np.ndarray:
+        """Arquivos aceitos pela função, avaliada arquivo a arquivo só nos de ``where``"""
+        indices = np.arange(len(self.files)) if where is None else np.flatnonzero(where)
+        files = self.files
+        mask = np.zeros(len(files), dtype=bool)
+        mask[indices] = np.fromiter((bool(accept(files[index])) for index in indices.tolist()),
+                                    dtype=bool, count=len(indices))
+        return mask
+
+    def named(self, names: Collection[str]) -> np.ndarray:
+        """Arquivos cujo nome está em ``names``"""
+        names = frozenset(names)
+        # Só arquivos com a extensão de algum dos nomes podem ter esse nome
+        candidates = self.extension_mask(lambda extension: any(name.endswith(extension) for name in names))
+        return self.file_mask(lambda file: file.name in names, candidates)
+
+    def excluding(self, names: Collection[str]) -> np.ndarray:
+        """Arquivos sem nenhum componente do caminho em ``names`` (como em ``parts``)"""
+        names = frozenset(names)
+        return self.directory_mask(lambda directory: names.isdisjoint(directory.split(os.sep))) & ~self.named(names)
+
+    def rows(self, selected: np.ndarray, field: Optional[str] = None,
+             values: Optional[Dict[str, Any]] = None, default: Any = None) -> List[FileRow]:
+        """Descrições dos arquivos selecionados (máscara ou índices), em ordem
+
+        Com ``field``, cada descrição tem também esse campo, com o valor da
+        extensão do arquivo em ``values`` (ou ``default``).
+        """
+        indices = np.flatnonzero(selected) if selected.dtype == bool else np.asarray(selected)
+        files = self.files
+        if field is None:
+            return [FileRow(files[index]) for index in indices.tolist()]
+        values = values or {}
+        fields = [((field, values.get(extension, default)),) for extension in self.extensions]
+        return [FileRow(files[index], fields[code])
+                for index, code in zip(indices.tolist(), self.extension[indices].tolist())]
+
+    def tagged(self, field: str, masks: Sequence[Tuple[np.ndarray, Any]]) -> List[FileRow]:
+        """Uma descrição para cada par (arquivo, máscara que o seleciona), em ordem
+
+        O campo ``field`` recebe o valor associado à máscara; um arquivo
+        selecionado por várias máscaras aparece uma vez para cada uma.
+        """
+        if not masks:
+            return []
+        fields = [((field, value),) for _, value in masks]
+        rows, columns = np.nonzero(np.column_stack([mask for mask, _ in masks]))
+        return [FileRow(self.files[index], fields[column]) for index, column in zip(rows.tolist(), columns.tolist())]
+
+    def row(self, index: int, **fields) -> FileRow:
+        return FileRow(self.files[index], tuple(fields.items()))
+
+    def __iter__(self) -> Iterator["ScannedFile"]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+def _lookup(values: List[str], accept: Union[Collection[str], Callable[[str], bool]]) -> np.ndarray:
+    """Tabela do resultado da regra para cada valor distinto, indexada pelo código"""
+    test = accept if callable(accept) else accept.__contains__
+    return np.fromiter((bool(test(value)) for value in values), dtype=bool, count=len(values))
@@ -0,0 +1,223 @@
+# indexing/git_source.py
+import os
+import re
+import shutil
+import struct
+import logging
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+INDEX_SIGNATURE = b'DIRC'
+INDEX_HEADER = struct.Struct('>4sII')
+ENTRY_STAT = struct.Struct('>10I')
+
+# Bits das flags de cada entrada do índice
+FLAG_EXTENDED = 0x4000
+FLAG_NAME_MASK = 0x0FFF
+EXTENDED_SKIP_WORKTREE = 0x4000
+
+MODE_TYPE_MASK = 0o170000
+MODE_GITLINK = 0o160000
+MODE_DIRECTORY = 0o040000
+
+SHA_PATTERN = re.compile(r'^[0-9a-f]{40}([0-9a-f]{24})?$')
+
+# Tempo máximo de um comando git local
+GIT_TIMEOUT = float(os.getenv("GIT_TIMEOUT", "30"))
+
+@dataclass(frozen=True)
+class GitIndexEntry:
+    """Arquivo rastreado, como registrado no índice do Git"""
+    path: str
+    sha: str
+    mode: int
+    size: int
+    mtime: float
+
+def find_git_dir(root: str) -> Optional[str]:
+    """Diretório do repositório se ``root`` é a raiz de um checkout do Git
+
+    Aceita o arquivo ``.git`` de worktrees e submódulos (``gitdir: ...``).
+    """
+    dot_git = os.path.join(root, '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, 'r', encoding='utf-8') as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if not line.startswith('gitdir:'):
+        return None
+    git_dir = line[len('gitdir:'):].strip()
+    git_dir = os.path.normpath(os.path.join(root, git_dir))
+    return git_dir if os.path.isdir(git_dir) else None
+
+def _common_dir(git_dir: str) -> str:
+    """Diretório compartilhado por todas as worktrees (refs, config)"""
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+def _hash_size(git_dir: str) -> int:
+    """Tamanho dos hashes do repositório: 20 (SHA-1) ou 32 (SHA-256)"""
+    try:
+        with open(os.path.join(_common_dir(git_dir), 'config'), 'r', encoding='utf-8') as f:
+            config = f.read()
+    except OSError:
+        return 20
+    return 32 if re.search(r'^\s*objectformat\s*=\s*sha256\s*$', config, re.MULTILINE | re.IGNORECASE) else 20
+
+def _varint(data: bytes, offset: int):
+    """Inteiro de tamanho variável do índice versão 4"""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, offset
+
+def read_index(git_dir: str) -> Optional[List[GitIndexEntry]]:
+    """Arquivos rastreados no índice (versões 2 a 4)
+
+    Entradas fora da área de trabalho (sparse checkout) e submódulos são
+    omitidas; em conflitos, cada caminho aparece uma vez. Retorna None se o
+    índice não existe ou não pode ser interpretado (por exemplo, índice
+    esparso), caso em que o chamador deve percorrer o diretório.
+    """
+    try:
+        with open(os.path.join(git_dir, 'index'), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < INDEX_HEADER.size:
+        return None
+    signature, version, count = INDEX_HEADER.unpack_from(data, 0)
+    if signature != INDEX_SIGNATURE or version not in (2, 3, 4):
+        return None
+
+    hash_size = _hash_size(git_dir)
+    entries: List[GitIndexEntry] = []
+    seen: Set[str] = set()
+    offset = INDEX_HEADER.size
+    previous = b''
+    try:
+        for _ in range(count):
+            start = offset
+            stat = ENTRY_STAT.unpack_from(data, offset)
+            offset += ENTRY_STAT.size
+            sha = data[offset:offset + hash_size].hex()
+            offset += hash_size
+            flags, = struct.unpack_from('>H', data, offset)
+            offset += 2
+            extended = 0
+            if flags & FLAG_EXTENDED and version >= 3:
+                extended, = struct.unpack_from('>H', data, offset)
+                offset += 2
+
+            if version == 4:
+                strip, offset = _varint(data, offset)
+                end = data.index(b'\0', offset)
+                name = previous[:len(previous) - strip] + data[offset:end]
+                offset = end + 1
+            else:
+                length = flags & FLAG_NAME_MASK
+                end = offset + length if length < FLAG_NAME_MASK else data.index(b'\0', offset)
+                name = data[offset:end]
+                # Entradas ocupam múltiplos de 8 bytes, com 1 a 8 bytes nulos no fim
+                offset = start + ((end - start + 8) & ~7)
+            previous = name
+
+            mode = stat[6]
+            if mode & MODE_TYPE_MASK == MODE_DIRECTORY:
+                return None
+            if mode & MODE_TYPE_MASK == MODE_GITLINK or extended & EXTENDED_SKIP_WORKTREE:
+                continue
+            path = os.fsdecode(name)
+            if path in seen:
+                continue
+            seen.add(path)
+            entries.append(GitIndexEntry(path, sha, mode, stat[9], stat[2] + stat[3] / 1e9))
+    except (struct.error, ValueError, IndexError) as e:
+        logger.warning(f"Índice do Git inválido em {git_dir}: {str(e)}")
+        return None
+    return entries
+
+def _read_ref(common_dir: str, git_dir: str, ref: str) -> Optional[str]:
+    for directory in (git_dir, common_dir):
+        try:
+            with open(os.path.join(directory, *ref.split('/')), 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            continue
+    try:
+        with open(os.path.join(common_dir, 'packed-refs'), 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.strip().split(' ', 1)
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+def head_commit(root: str) -> Optional[str]:
+    """Commit do HEAD do checkout em ``root``; None fora de um repositório"""
+    git_dir = find_git_dir(root)
+    if git_dir is None:
+        return None
+    common_dir = _common_dir(git_dir)
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    # Referências simbólicas encadeadas são raras; segue algumas
+    for _ in range(5):
+        if not value.startswith('ref:'):
+            break
+        value = _read_ref(common_dir, git_dir, value[len('ref:'):].strip()) or ''
+    return value if SHA_PATTERN.match(value) else None
+
+def _git(root: str, *args: str) -> Optional[bytes]:
+    """Saída de um comando git local; None se ele falhar ou não existir"""
+    executable = shutil.which('git')
+    if executable is None:
+        return None
+    try:
+        completed = subprocess.run(
+            [executable, '-C', root, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            timeout=GIT_TIMEOUT, check=False,
+            env=dict(os.environ, GIT_TERMINAL_PROMPT='0', GIT_OPTIONAL_LOCKS='0')
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Erro ao executar git {args[0]}: {str(e)}")
+        return None
+    if completed.returncode != 0:
+        logger.info(f"git {args[0]} falhou em {root}: {completed.stderr.decode(errors='replace').strip()}")
+        return None
+    return completed.stdout
+
+def changed_files(root: str, since_commit: str) -> Optional[Set[str]]:
+    """Arquivos alterados na área de trabalho desde ``since_commit``
+
+    Inclui modificações ainda não commitadas e arquivos novos não ignorados.
+    Caminhos relativos com o separador do sistema; None se não for possível
+    calcular (fora de um repositório, commit desconhecido ou git ausente).
+    """
+    if find_git_dir(root) is None or not SHA_PATTERN.match(since_commit or ''):
+        return None
+    diff = _git(root, 'diff', '--name-only', '--no-renames', '-z', since_commit, '--')
+    if diff is None:
+        return None
+    untracked = _git(root, 'ls-files', '--others', '--exclude-standard', '-z')
+    if untracked is None:
+        return None
+    names = {os.fsdecode(name) for name in (diff + untracked).split(b'\0') if name}
+    return {name.replace('/', os.sep) for name in names}
@@ -0,0 +1,160 @@
+# indexing/ignore.py
+import os
+import re
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+# Arquivo de exclusões do próprio projeto, na mesma sintaxe do .gitignore
+DEFAULT_IGNORE_FILE = ".analyzerignore"
+
+def translate_glob(pattern: str) -> str:
+    """Converte um padrão glob do .gitignore em expressão regular
+
+    ``*`` e ``?`` não atravessam ``/``; ``**/`` casa com qualquer número de
+    diretórios e ``**`` no fim, com todo o conteúdo abaixo.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', '^', ']') else i + 1)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\').replace('/', '') + ']')
+                i = end
+        elif char == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 1
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+class IgnoreFile:
+    """Padrões de um arquivo de exclusão, válidos para o diretório onde ele está
+
+    Segue as regras do .gitignore: a última regra que casa decide, ``!``
+    reinclui, ``/`` no fim restringe a diretórios e padrões com ``/`` no
+    início ou no meio são relativos ao diretório do arquivo. Sem negações,
+    todos os padrões são combinados em uma única expressão.
+    """
+
+    def __init__(self, base: str, lines: Sequence[str]):
+        # Caminho relativo (com "/") do diretório do arquivo, vazio na raiz
+        self.base = base.strip('/')
+        self.rules: List[Tuple[Pattern, bool, bool]] = []
+        for line in lines:
+            rule = self._parse(line)
+            if rule:
+                self.rules.append(rule)
+
+        self._any: Optional[Pattern] = None
+        self._dirs: Optional[Pattern] = None
+        if self.rules and not any(negated for _, negated, _ in self.rules):
+            self._any = self._combine(rule for rule in self.rules if not rule[2])
+            self._dirs = self._combine(self.rules)
+
+    @classmethod
+    def load(cls, path: str, base: str) -> Optional["IgnoreFile"]:
+        """Lê um arquivo de exclusão; None se não existir ou não tiver regras"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                ignore_file = cls(base, f.read().splitlines())
+        except OSError:
+            return None
+        return ignore_file if ignore_file.rules else None
+
+    def _parse(self, line: str) -> Optional[Tuple[Pattern, bool, bool]]:
+        # Espaços no fim são ignorados, exceto se escapados
+        line = re.sub(r'(?<!\\)\s+$', '', line)
+        if not line or line.startswith('#'):
+            return None
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+
+        anchored = '/' in line
+        body = translate_glob(line.lstrip('/'))
+        prefix = re.escape(self.base + '/') if self.base else ''
+        if not anchored:
+            prefix += '(?:.*/)?'
+        return re.compile(f"{prefix}{body}", re.DOTALL), negated, directory_only
+
+    @staticmethod
+    def _combine(rules) -> Optional[Pattern]:
+        patterns = [pattern.pattern for pattern, _, _ in rules]
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.DOTALL)
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """True se excluído, False se reincluído, None se nenhuma regra casa"""
+        if self.base and not relative_path.startswith(self.base + '/'):
+            return None
+        if self._dirs is not None:
+            combined = self._dirs if is_dir else self._any
+            return True if combined is not None and combined.fullmatch(relative_path) else None
+        for pattern, negated, directory_only in reversed(self.rules):
+            if directory_only and not is_dir:
+                continue
+            if pattern.fullmatch(relative_path):
+                return not negated
+        return None
+
+class IgnoreRules:
+    """Exclusões em vigor em um diretório: as dos diretórios acima e as dele
+
+    Regras de arquivos mais profundos têm precedência, como no Git.
+    """
+
+    def __init__(self, files: Tuple[IgnoreFile, ...] = ()):
+        self.files = files
+
+    def child(self, ignore_file: Optional[IgnoreFile]) -> "IgnoreRules":
+        """Regras para um subdiretório com o seu próprio arquivo de exclusão"""
+        if ignore_file is None:
+            return self
+        return IgnoreRules(self.files + (ignore_file,))
+
+    def ignored(self, relative_path: str, is_dir: bool) -> bool:
+        for ignore_file in reversed(self.files):
+            result = ignore_file.match(relative_path, is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.files)
+
+def root_rules(root: str, ignore_file: Optional[str] = DEFAULT_IGNORE_FILE,
+               use_gitignore: bool = True) -> IgnoreRules:
+    """Regras da raiz do projeto: .git/info/exclude, .gitignore e o arquivo do projeto"""
+    rules = IgnoreRules()
+    if use_gitignore:
+        rules = rules.child(IgnoreFile.load(os.path.join(root, '.git', 'info', 'exclude'), ''))
+        rules = rules.child(IgnoreFile.load(os.path.join(root, '.gitignore'), ''))
+    if ignore_file:
+        rules = rules.child(IgnoreFile.load(os.path.join(root, ignore_file), ''))
+    return rules
@@ -0,0 +1,317 @@
+# indexing/import_graph.py
+import os
+import re
+import ast
+import sys
+import time
+import logging
+import posixpath
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .reader import FileReader
+from .scanner import ProjectScan, ScannedFile, scan_project
+
+logger = logging.getLogger(__name__)
+
+PYTHON_EXTENSIONS = frozenset({'.py', '.pyi'})
+SCRIPT_EXTENSIONS = frozenset({'.js', '.jsx', '.mjs', '.cjs', '.ts', '.tsx', '.mts', '.cts'})
+
+# Sufixos tentados ao resolver um import relativo de JS/TS ('./api' -> api.ts, api/index.js...)
+SCRIPT_SUFFIXES = ('', '.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.mts', '.cts',
+                   '/index.ts', '/index.tsx', '/index.js', '/index.jsx')
+
+# Diretórios usados como raiz dos pacotes Python além da raiz do projeto
+SOURCE_ROOTS = ('src', 'lib')
+
+SCRIPT_SPECIFIER = re.compile(r'''(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)(['"])([^'"\n]+)\1''')
+MENTION_PATTERN = re.compile(r'[\w./\\-]+')
+
+# Vizinhança usada para focar a análise nos arquivos citados na solicitação
+DEFAULT_HOPS = int(os.getenv("GRAPH_HOPS", "2"))
+DEFAULT_LIMIT = int(os.getenv("GRAPH_MAX_FILES", "40"))
+
+# Pedidos sobre o projeto todo não são focados, mesmo citando arquivos
+PROJECT_WIDE = re.compile(
+    r'\b(?:todo o projeto|projeto (?:inteiro|todo|completo)|como um todo|todos os arquivos|'
+    r'an[aá]lise (?:geral|completa)|vis[aã]o geral|'
+    r'(?:whole|entire|full) (?:project|codebase|repo(?:sitory)?)|all (?:the )?files|overall)\b',
+    re.IGNORECASE
+)
+
+# Import Python: (nível relativo, módulo, nomes importados)
+PythonImport = Tuple[int, str, Tuple[str, ...]]
+
+def python_imports(text: str) -> List[PythonImport]:
+    """Imports de um módulo Python, inclusive os feitos dentro de funções"""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        return []
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend((0, alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.level, node.module or '', tuple(alias.name for alias in node.names)))
+    return imports
+
+def script_imports(text: str) -> List[str]:
+    """Módulos citados por import, export ... from, import() e require() em JS/TS"""
+    return [match.group(2) for match in SCRIPT_SPECIFIER.finditer(text)]
+
+def _posix(relative_path: str) -> str:
+    return relative_path.replace(os.sep, '/')
+
+def _module_names(posix_path: str) -> List[str]:
+    """Nomes pelos quais um arquivo Python pode ser importado"""
+    stem, _ = posixpath.splitext(posix_path)
+    parts = stem.split('/')
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    if not parts:
+        return []
+    names = ['.'.join(parts)]
+    if len(parts) > 1 and parts[0] in SOURCE_ROOTS:
+        names.append('.'.join(parts[1:]))
+    return names
+
+class ImportGraph:
+    """Grafo de imports entre os arquivos Python e JS/TS de um projeto
+
+    ``update`` analisa apenas arquivos novos ou com tamanho/mtime/inode
+    diferentes; as arestas são resolvidas de novo a partir dos imports já
+    extraídos sempre que o conjunto de arquivos muda, de modo que um arquivo
+    novo passa a receber os imports que antes não tinham destino. Só imports
+    que apontam para arquivos do próprio projeto viram arestas.
+    """
+
+    def __init__(self, reader: Optional[FileReader] = None):
+        self.reader = reader or FileReader(
+            max_file_bytes=int(os.getenv("GRAPH_MAX_FILE_BYTES", str(1024 * 1024))),
+            max_total_bytes=sys.maxsize
+        )
+        # caminho -> (tamanho, mtime, inode) e imports extraídos
+        self.sources: Dict[str, Tuple[Tuple[int, float, int], list]] = {}
+        self.paths: Set[str] = set()
+        self.imports: Dict[str, Set[str]] = {}
+        self.importers: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+    @staticmethod
+    def _language(path: str) -> Optional[str]:
+        extension = os.path.splitext(path)[1].lower()
+        if extension in PYTHON_EXTENSIONS:
+            return 'python'
+        if extension in SCRIPT_EXTENSIONS:
+            return 'script'
+        return None
+
+    def update(self, files: Sequence[ScannedFile], complete: bool = True) -> int:
+        """Atualiza o grafo com os arquivos alterados; com ``complete``, remove os que sumiram"""
+        with self._update_lock:
+            with self._lock:
+                paths = {file.relative_path for file in files}
+                if not complete:
+                    paths |= self.paths
+                stale = [file for file in files if self._language(file.relative_path)
+                         and self.sources.get(file.relative_path, (None,))[0] != (file.size, file.mtime, file.inode)]
+                removed = [path for path in self.sources if path not in paths]
+                if not stale and not removed and paths == self.paths:
+                    return 0
+
+            parsed = []
+            for file, content in zip(stale, self.reader.read_many([file.path for file in stale])):
+                text = content.text if content.text is not None and not content.truncated else ''
+                if self._language(file.relative_path) == 'python':
+                    specs = python_imports(text)
+                else:
+                    specs = script_imports(text)
+                parsed.append((file.relative_path, (file.size, file.mtime, file.inode), specs))
+
+            with self._lock:
+                for path in removed:
+                    self.sources.pop(path, None)
+                for path, signature, specs in parsed:
+                    self.sources[path] = (signature, specs)
+                self.paths = paths
+                self._resolve()
+            return len(parsed) + len(removed)
+
+    def _resolve(self) -> None:
+        """Recalcula as arestas a partir dos imports extraídos de cada arquivo"""
+        posix_paths = {_posix(path): path for path in self.paths}
+        modules: Dict[str, str] = {}
+        for posix_path, path in posix_paths.items():
+            if posixpath.splitext(posix_path)[1] in PYTHON_EXTENSIONS:
+                for name in _module_names(posix_path):
+                    modules.setdefault(name, path)
+
+        imports: Dict[str, Set[str]] = {}
+        importers: Dict[str, Set[str]] = {}
+        for path, (_, specs) in self.sources.items():
+            if self._language(path) == 'python':
+                targets = self._python_targets(_posix(path), specs, modules)
+            else:
+                targets = self._script_targets(_posix(path), specs, posix_paths)
+            targets.discard(path)
+            imports[path] = targets
+            for target in targets:
+                importers.setdefault(target, set()).add(path)
+        self.imports = imports
+        self.importers = importers
+
+    @staticmethod
+    def _lookup(dotted: str, modules: Dict[str, str]) -> Optional[str]:
+        while dotted:
+            if dotted in modules:
+                return modules[dotted]
+            dotted = dotted.rpartition('.')[0]
+        return None
+
+    def _python_targets(self, posix_path: str, specs: List[PythonImport], modules: Dict[str, str]) -> Set[str]:
+        targets = set()
+        package = posix_path.split('/')[:-1]
+        for level, module, names in specs:
+            if level:
+                if level - 1 > len(package):
+                    continue
+                base = package[:len(package) - (level - 1)]
+                dotted = '.'.join(base + (module.split('.') if module else []))
+            else:
+                dotted = module
+            # "from pacote import modulo" aponta para o submódulo, se existir
+            submodules = [f"{dotted}.{name}" if dotted else name for name in names]
+            found = [modules[submodule] for submodule in submodules if submodule in modules]
+            if found:
+                targets.update(found)
+                continue
+            target = self._lookup(dotted, modules)
+            if target is not None:
+                targets.add(target)
+        return targets
+
+    @staticmethod
+    def _script_targets(posix_path: str, specs: List[str], posix_paths: Dict[str, str]) -> Set[str]:
+        targets = set()
+        directory = posixpath.dirname(posix_path)
+        for specifier in specs:
+            # Pacotes (sem ./ ou ../) ficam fora do projeto
+            if not specifier.startswith('.'):
+                continue
+            base = posixpath.normpath(posixpath.join(directory, specifier))
+            stem, extension = posixpath.splitext(base)
+            candidates = [base + suffix for suffix in SCRIPT_SUFFIXES]
+            if extension in ('.js', '.jsx', '.mjs', '.cjs'):
+                # Imports ESM de TypeScript citam o .js gerado
+                candidates += [stem + suffix for suffix in SCRIPT_SUFFIXES[1:]]
+            for candidate in candidates:
+                if candidate in posix_paths:
+                    targets.add(posix_paths[candidate])
+                    break
+        return targets
+
+    def neighbourhood(self, seeds: Iterable[str], hops: int = DEFAULT_HOPS,
+                      limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Arquivos a até ``hops`` imports dos arquivos iniciais, nos dois sentidos
+
+        Ordenados pela distância (os iniciais com distância 0) e, na mesma
+        distância, pelo caminho. ``__init__.py`` que não são iniciais entram,
+        mas a busca não continua por eles: pacotes que reexportam os seus
+        módulos ligariam quase todos os arquivos a dois passos.
+        """
+        with self._lock:
+            distances: Dict[str, int] = {}
+            queue = deque()
+            for seed in seeds:
+                if seed in self.paths and seed not in distances:
+                    distances[seed] = 0
+                    queue.append(seed)
+            while queue:
+                path = queue.popleft()
+                distance = distances[path]
+                if distance >= hops or (distance and posixpath.basename(_posix(path)) == '__init__.py'):
+                    continue
+                for neighbour in self.imports.get(path, set()) | self.importers.get(path, set()):
+                    if neighbour not in distances:
+                        distances[neighbour] = distance + 1
+                        queue.append(neighbour)
+        ranked = sorted(distances.items(), key=lambda item: (item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+def mentioned_files(relative_paths: Iterable[str], message: str) -> List[str]:
+    """Arquivos do projeto citados na mensagem
+
+    Reconhece caminhos relativos (com ou sem extensão), nomes de arquivo com
+    extensão e nomes de módulos Python com ponto (``indexing.scanner``).
+    Nomes de arquivo repetidos em muitos diretórios (``__init__.py``) são
+    ignorados.
+    """
+    words = {word.strip('.,:;!?()[]{}"\'`').replace('\\', '/') for word in MENTION_PATTERN.findall(message)}
+    words.discard('')
+    by_name: Dict[str, List[str]] = {}
+    found = []
+    for path in relative_paths:
+        posix_path = _posix(path)
+        stem, extension = posixpath.splitext(posix_path)
+        keys = set()
+        if extension in PYTHON_EXTENSIONS:
+            keys.update(name for name in _module_names(posix_path) if '.' in name)
+        if '/' in posix_path:
+            keys.update((posix_path, stem))
+        if keys & words:
+            found.append(path)
+        by_name.setdefault(posixpath.basename(posix_path), []).append(path)
+    for name, paths in by_name.items():
+        if name in words and '.' in name and len(paths) <= 3:
+            found.extend(path for path in paths if path not in found)
+    return found
+
+_graphs: Dict[str, ImportGraph] = {}
+_graphs_lock = threading.Lock()
+
+def import_graph(project_path: str) -> ImportGraph:
+    """Grafo de imports do projeto, mantido enquanto o processo estiver ativo"""
+    root = os.path.abspath(project_path)
+    with _graphs_lock:
+        if root not in _graphs:
+            _graphs[root] = ImportGraph()
+        return _graphs[root]
+
+def related_files(project_path: str, seeds: Iterable[str], hops: int = DEFAULT_HOPS,
+                  limit: Optional[int] = DEFAULT_LIMIT, scan: Optional[ProjectScan] = None) -> List[Tuple[str, int]]:
+    """Vizinhança dos arquivos ``seeds``, atualizando antes o grafo com a varredura"""
+    started_at = time.perf_counter()
+    scan = scan or scan_project(project_path)
+    graph = import_graph(project_path)
+    updated = graph.update(scan.files, complete=scan.complete)
+    results = graph.neighbourhood(seeds, hops, limit)
+    logger.info(
+        f"Grafo de imports de {scan.root}: {len(results)} arquivos relacionados em "
+        f"{(time.perf_counter() - started_at) * 1000:.1f}ms ({updated} arquivos analisados)"
+    )
+    return results
+
+def focus_files(project_path: str, message: str, scan: Optional[ProjectScan] = None) -> Optional[List[str]]:
+    """Arquivos citados na mensagem e a vizinhança deles
+
+    Retorna None (a análise usa a varredura inteira) quando nenhum arquivo é
+    citado, quando a mensagem pede uma análise do projeto todo ou quando
+    algum arquivo citado não importa nem é importado por outro arquivo do
+    projeto (como README.md ou package.json).
+    """
+    if PROJECT_WIDE.search(message):
+        return None
+    scan = scan or scan_project(project_path)
+    seeds = mentioned_files((file.relative_path for file in scan.files), message)
+    if not seeds:
+        return None
+    related = related_files(project_path, seeds, scan=scan)
+    graph = import_graph(project_path)
+    outside = [seed for seed in seeds if not graph.imports.get(seed) and not graph.importers.get(seed)]
+    if outside:
+        logger.info(f"Arquivos citados fora do grafo de imports, usando a varredura inteira: {outside}")
+        return None
+    return [path for path, _ in related]
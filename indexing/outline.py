@@ -0,0 +1,264 @@
+# indexing/outline.py
+import os
+import re
+import ast
+import contextlib
+import contextvars
+from typing import List, Optional, Tuple
+
+from .blob_store import BLOBS, BlobStore
+
+# Modos de renderização dos arquivos nos prompts: conteúdo completo ou
+# apenas a estrutura (imports, classes, assinaturas e docstrings)
+RENDER_MODES = ('full', 'outline')
+DEFAULT_RENDER_MODE = os.getenv("PROMPT_RENDER", "full")
+
+LANGUAGES = {
+    '.py': 'python', '.pyi': 'python',
+    '.js': 'script', '.jsx': 'script', '.mjs': 'script', '.cjs': 'script',
+    '.ts': 'script', '.tsx': 'script', '.mts': 'script', '.cts': 'script'
+}
+
+# Valores de constantes e atributos maiores que isso viram "..."
+MAX_VALUE_CHARS = 60
+# Limite de um cabeçalho JS/TS (assinaturas longas são cortadas)
+MAX_HEADER_CHARS = 240
+
+_render_mode: contextvars.ContextVar = contextvars.ContextVar('render_mode', default=None)
+
+def current_render_mode() -> str:
+    return _render_mode.get() or DEFAULT_RENDER_MODE
+
+@contextlib.contextmanager
+def render_mode(mode: Optional[str]):
+    """Define como os agentes chamados neste contexto renderizam os arquivos
+
+    None mantém o modo padrão (PROMPT_RENDER).
+    """
+    if mode is not None and mode not in RENDER_MODES:
+        raise ValueError(f"Modo de renderização inválido: {mode}")
+    token = _render_mode.set(mode)
+    try:
+        yield mode or DEFAULT_RENDER_MODE
+    finally:
+        _render_mode.reset(token)
+
+def outline_language(path: str) -> Optional[str]:
+    return LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+def _first_line(text: Optional[str]) -> Optional[str]:
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if line:
+            return line
+    return None
+
+def _short(node: ast.AST) -> str:
+    value = ast.unparse(node)
+    return value if len(value) <= MAX_VALUE_CHARS and '\n' not in value else '...'
+
+def _python_signature(node) -> str:
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ''
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}: ..."
+
+def _python_body(nodes: List[ast.stmt], depth: int, lines: List[str], module: bool) -> None:
+    indent = '    ' * depth
+    for node in nodes:
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and module:
+            lines.append(ast.unparse(node))
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                lines.append(f"{indent}@{ast.unparse(decorator)}")
+            if isinstance(node, ast.ClassDef):
+                bases = [ast.unparse(base) for base in node.bases + node.keywords]
+                header = f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+            else:
+                header = _python_signature(node)
+            lines.append(f"{indent}{header}  # L{node.lineno}")
+            docstring = _first_line(ast.get_docstring(node))
+            if docstring:
+                lines.append(f'{indent}    """{docstring}"""')
+            if isinstance(node, ast.ClassDef):
+                size = len(lines)
+                _python_body(node.body, depth + 1, lines, module=False)
+                if len(lines) == size and not docstring:
+                    lines.append(f"{indent}    ...")
+        elif isinstance(node, ast.Assign) and all(isinstance(target, ast.Name) for target in node.targets):
+            names = [target.id for target in node.targets]
+            # No módulo, só constantes e __all__; nas classes, todos os atributos
+            if module and not all(name.isupper() or name == '__all__' for name in names):
+                continue
+            lines.append(f"{indent}{' = '.join(names)} = {_short(node.value)}")
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            if module and not node.target.id.isupper():
+                continue
+            value = f" = {_short(node.value)}" if node.value is not None else ''
+            lines.append(f"{indent}{node.target.id}: {ast.unparse(node.annotation)}{value}")
+        elif isinstance(node, ast.If) and module:
+            _python_body(node.body + node.orelse, depth, lines, module)
+        elif isinstance(node, ast.Try) and module:
+            # Imports opcionais (try/except ImportError) continuam visíveis
+            handlers = [statement for handler in node.handlers for statement in handler.body]
+            _python_body(node.body + handlers + node.orelse + node.finalbody, depth, lines, module)
+
+def outline_python(text: str) -> Optional[str]:
+    """Estrutura de um módulo Python; None se ele não puder ser analisado"""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    lines = ["# Resumo do arquivo: assinaturas e docstrings, corpos omitidos"]
+    docstring = _first_line(ast.get_docstring(tree))
+    if docstring:
+        lines.append(f'"""{docstring}"""')
+    _python_body(tree.body, 0, lines, module=True)
+    return '\n'.join(lines) + '\n'
+
+# Comentários e strings são apagados (mantendo posições e quebras de linha)
+# antes de contar chaves e reconhecer declarações
+SCRIPT_NOISE = re.compile(
+    r'//[^\n]*|/\*[\s\S]*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`'
+)
+SCRIPT_IMPORT = re.compile(r'import\b[^;]*?[\'"][^\'"\n]+[\'"]|import\b[^;\n]*')
+SCRIPT_DECLARATIONS: List[Tuple[str, re.Pattern]] = [
+    ('import', re.compile(r'(?:import\b(?!\s*\()|export\s+(?:type\s+)?(?:\*|\{[^}]*\})\s*from\b)')),
+    ('require', re.compile(r'(?:const|let|var)\s+[\w${}\s,:]+=\s*require\s*\(')),
+    ('class', re.compile(r'(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?class\b')),
+    ('function', re.compile(r'(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:async\s+)?function\b')),
+    ('type', re.compile(r'(?:export\s+)?(?:declare\s+)?(?:interface|type|enum|const\s+enum)\s+[\w$]+')),
+    ('variable', re.compile(r'(?:export\s+)?(?:const|let|var)\s+[\w$]+\s*(?::[^=]+)?=')),
+]
+SCRIPT_METHOD = re.compile(
+    r'(?:(?:public|private|protected|static|readonly|async|get|set|override|abstract)\s+)*'
+    r'\*?\s*(#?[\w$]+)\s*(?:<[^>]*>)?\s*\('
+)
+SCRIPT_KEYWORDS = frozenset({'if', 'for', 'while', 'switch', 'catch', 'function', 'return', 'with', 'super'})
+
+def _blank(match: re.Match) -> str:
+    return re.sub(r'[^\n]', ' ', match.group(0))
+
+def _script_header(text: str, code: str, start: int) -> Tuple[str, bool]:
+    """Cabeçalho da declaração em ``start``, até ``{``, ``=>`` ou ``;``
+
+    Retorna o texto compactado e se a declaração é uma função (tem ``=>`` ou
+    ``function``), usado para distinguir funções atribuídas de variáveis.
+    """
+    parens = 0
+    end = len(code)
+    for index in range(start, min(len(code), start + 4 * MAX_HEADER_CHARS)):
+        char = code[index]
+        if char in '([<':
+            parens += 1
+        elif char in ')]>' and parens:
+            if not (char == '>' and code[index - 1] == '='):
+                parens -= 1
+        elif parens == 0 and (char in '{;' or (char == '\n' and code[start:index].rstrip().endswith(')'))):
+            end = index
+            break
+        elif parens == 0 and code.startswith('=>', index):
+            end = index + 2
+            break
+    header = ' '.join(text[start:end].split())
+    if len(header) > MAX_HEADER_CHARS:
+        header = header[:MAX_HEADER_CHARS] + ' ...'
+    return header, '=>' in code[start:end] or re.search(r'\bfunction\b', code[start:end]) is not None
+
+def _jsdoc(lines: List[str], index: int) -> Optional[str]:
+    """Primeira linha do comentário /** ... */ logo acima da linha ``index``"""
+    end = index - 1
+    if end < 0 or not lines[end].strip().endswith('*/'):
+        return None
+    start = end
+    while start > 0 and '/**' not in lines[start]:
+        start -= 1
+    if '/**' not in lines[start]:
+        return None
+    for line in lines[start:end + 1]:
+        line = line.strip().lstrip('/').lstrip('*').strip()
+        line = line[:-2].rstrip() if line.endswith('*/') else line
+        if line and not line.startswith('@'):
+            return line
+    return None
+
+def outline_script(text: str) -> Optional[str]:
+    """Estrutura de um arquivo JavaScript/TypeScript
+
+    Analisador leve por linhas: imports, classes e seus métodos, funções
+    (inclusive as atribuídas a constantes), interfaces, tipos e enums do
+    nível superior, com a primeira linha do JSDoc de cada declaração.
+    """
+    code = SCRIPT_NOISE.sub(_blank, text)
+    text_lines = text.split('\n')
+    code_lines = code.split('\n')
+    lines = ["// Resumo do arquivo: assinaturas e comentários, corpos omitidos"]
+    classes: List[int] = []
+    depth = 0
+    offset = 0
+    for number, line in enumerate(code_lines):
+        stripped = line.lstrip()
+        start = offset + len(line) - len(stripped)
+        while classes and depth <= classes[-1]:
+            classes.pop()
+        if stripped:
+            entry = None
+            if depth == 0:
+                for kind, pattern in SCRIPT_DECLARATIONS:
+                    if not pattern.match(stripped):
+                        continue
+                    if kind == 'import':
+                        match = SCRIPT_IMPORT.search(text, start)
+                        entry = ' '.join(match.group(0).split()) if match else None
+                    elif kind == 'require':
+                        entry = ' '.join(text_lines[number].split()).rstrip(';')
+                    else:
+                        header, function = _script_header(text, code, start)
+                        if kind == 'variable' and not function:
+                            break
+                        entry = f"{header}  // L{number + 1}"
+                        if kind == 'class':
+                            classes.append(depth)
+                    break
+            elif classes and depth == classes[-1] + 1:
+                match = SCRIPT_METHOD.match(stripped)
+                if match and match.group(1) not in SCRIPT_KEYWORDS:
+                    header, _ = _script_header(text, code, start)
+                    entry = f"{header}  // L{number + 1}"
+            if entry:
+                indent = '    ' * len(classes) if depth else ''
+                doc = _jsdoc(text_lines, number) if not entry.startswith(('import', 'export *', 'export {')) else None
+                if doc:
+                    lines.append(f"{indent}/** {doc} */")
+                lines.append(f"{indent}{entry}")
+        depth += line.count('{') - line.count('}')
+        depth = max(depth, 0)
+        offset += len(line) + 1
+    return '\n'.join(lines) + '\n'
+
+def outline(path: str, text: str) -> Optional[str]:
+    """Estrutura do arquivo conforme a extensão; None se não houver analisador"""
+    language = outline_language(path)
+    if language == 'python':
+        return outline_python(text)
+    if language == 'script':
+        return outline_script(text)
+    return None
+
+def cached_outline(path: str, text: str, store: Optional[BlobStore] = None) -> Optional[str]:
+    """Estrutura do arquivo, calculada uma vez por conteúdo
+
+    O resultado fica no armazenamento de blobs como artefato derivado do hash
+    do conteúdo: cópias idênticas (em outros projetos ou caminhos) e consultas
+    seguintes não repetem a análise.
+    """
+    language = outline_language(path)
+    if language is None:
+        return None
+    store = store or BLOBS
+    digest = store.put(text)
+    try:
+        return store.derived(digest, ('outline', language), lambda content: outline(path, content))
+    except KeyError:
+        return outline(path, text)
+    finally:
+        store.release(digest)
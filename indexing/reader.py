@@ -0,0 +1,223 @@
+# indexing/reader.py
+import os
+import sys
+import mmap
+import logging
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from .outline import cached_outline, current_render_mode, outline_language
+
+# Extensões que nunca são texto; não chegam a ser abertas
+BINARY_EXTENSIONS = frozenset({
+    '.db', '.sqlite', '.sqlite3', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp',
+    '.pdf', '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.jar', '.war', '.class',
+    '.pyc', '.pyo', '.so', '.dll', '.dylib', '.exe', '.bin', '.o', '.a', '.woff', '.woff2',
+    '.ttf', '.otf', '.eot', '.mp3', '.mp4', '.wav', '.avi', '.mov', '.pkl', '.npy', '.parquet'
+})
+
+# Bytes inspecionados para decidir se o conteúdo é binário
+SNIFF_BYTES = 8192
+
+# Parte do limite por arquivo usada pelo início; o restante fica para o fim
+HEAD_FRACTION = 0.75
+
+@dataclass(frozen=True)
+class FileContent:
+    """Conteúdo lido de um arquivo
+
+    ``text`` é None quando o arquivo foi ignorado; ``skipped`` diz o motivo
+    ('binary', 'budget' ou a mensagem de erro). ``truncated`` indica que só o
+    início e o fim do arquivo foram incluídos, e ``outlined`` que ``text`` é
+    o resumo da estrutura do arquivo em vez do conteúdo.
+    """
+    path: str
+    text: Optional[str]
+    size: int = 0
+    truncated: bool = False
+    skipped: Optional[str] = None
+    outlined: bool = False
+
+def is_binary(sample: bytes) -> bool:
+    """Heurística do Git/grep: byte nulo ou muitos caracteres de controle"""
+    if not sample:
+        return False
+    if b'\0' in sample:
+        return True
+    control = sum(1 for byte in sample if byte < 32 and byte not in (9, 10, 12, 13, 27))
+    return control / len(sample) > 0.3
+
+def sample_text(head: bytes, tail: bytes, omitted: int) -> str:
+    """Junta início e fim de um arquivo, cortando nas quebras de linha"""
+    cut = head.rfind(b'\n')
+    if cut > 0:
+        omitted += len(head) - cut - 1
+        head = head[:cut + 1]
+    cut = tail.find(b'\n')
+    if 0 <= cut < len(tail) - 1:
+        omitted += cut + 1
+        tail = tail[cut + 1:]
+    notice = f"\n[... {omitted} bytes omitidos ...]\n\n"
+    return head.decode('utf-8', errors='replace') + notice + tail.decode('utf-8', errors='replace')
+
+class FileReader:
+    """Lê arquivos do projeto em paralelo com limites de tamanho
+
+    Cada arquivo recebe no máximo ``max_file_bytes``; os maiores são
+    amostrados (início e fim). ``read_many`` reparte ``max_total_bytes``
+    entre os arquivos na ordem recebida, antes da leitura, de modo que o
+    resultado não depende da ordem em que as threads terminam. Conteúdo
+    binário é descartado pelas extensões conhecidas ou pelos primeiros bytes,
+    e arquivos a partir de ``mmap_threshold`` são mapeados em memória em vez
+    de lidos por inteiro.
+    """
+
+    def __init__(self, max_file_bytes: int = 256 * 1024, max_total_bytes: int = 8 * 1024 * 1024,
+                 workers: int = 8, mmap_threshold: int = 1024 * 1024):
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.workers = workers
+        self.mmap_threshold = mmap_threshold
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='file-reader'
+                )
+            return self._executor
+
+    def read(self, path: str, limit: Optional[int] = None) -> FileContent:
+        """Lê um arquivo com no máximo ``limit`` bytes (padrão: max_file_bytes)"""
+        if os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS:
+            return FileContent(path, None, skipped='binary')
+        limit = self.max_file_bytes if limit is None else min(limit, self.max_file_bytes)
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return FileContent(path, '', 0)
+                if size >= self.mmap_threshold:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        return self._decode(path, mapped, size, limit)
+                return self._decode(path, f.read(min(size, limit)), size, limit, f)
+        except (OSError, ValueError) as e:
+            return FileContent(path, None, skipped=str(e))
+
+    def _decode(self, path: str, data, size: int, limit: int, f=None) -> FileContent:
+        if is_binary(data[:SNIFF_BYTES]):
+            return FileContent(path, None, size, skipped='binary')
+        if size <= limit:
+            return FileContent(path, bytes(data[:size]).decode('utf-8', errors='replace'), size)
+        if limit <= 0:
+            return FileContent(path, None, size, skipped='budget')
+        head_size = int(limit * HEAD_FRACTION)
+        tail_size = limit - head_size
+        head = bytes(data[:head_size])
+        if f is not None:
+            f.seek(size - tail_size)
+            tail = f.read(tail_size)
+        else:
+            tail = bytes(data[size - tail_size:size])
+        return FileContent(path, sample_text(head, tail, size - head_size - tail_size), size, truncated=True)
+
+    def read_many(self, paths: Sequence[str]) -> List[FileContent]:
+        """Lê vários arquivos em paralelo, na ordem recebida, dentro do orçamento total"""
+        remaining = self.max_total_bytes
+        results: List[Optional[FileContent]] = [None] * len(paths)
+        plan = []
+        for index, path in enumerate(paths):
+            if os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS:
+                results[index] = FileContent(path, None, skipped='binary')
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError as e:
+                results[index] = FileContent(path, None, skipped=str(e))
+                continue
+            if size and remaining <= 0:
+                results[index] = FileContent(path, None, size, skipped='budget')
+                continue
+            limit = min(size, self.max_file_bytes, remaining)
+            remaining -= limit
+            plan.append((index, limit))
+
+        if len(plan) == 1:
+            index, limit = plan[0]
+            results[index] = self.read(paths[index], limit)
+        elif plan:
+            futures = [(index, self._pool().submit(self.read, paths[index], limit)) for index, limit in plan]
+            for index, future in futures:
+                results[index] = future.result()
+
+        skipped = sum(1 for result in results if result.skipped)
+        truncated = sum(1 for result in results if result.truncated)
+        if skipped or truncated:
+            self.logger.info(
+                f"Leitura de {len(paths)} arquivos: {truncated} amostrados, {skipped} ignorados"
+            )
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+# Leitor padrão usado pelos agentes (READ_MAX_FILE_BYTES, READ_MAX_TOTAL_BYTES,
+# READ_WORKERS e READ_MMAP_THRESHOLD ajustam os limites)
+READER = FileReader(
+    max_file_bytes=int(os.getenv("READ_MAX_FILE_BYTES", str(256 * 1024))),
+    max_total_bytes=int(os.getenv("READ_MAX_TOTAL_BYTES", str(8 * 1024 * 1024))),
+    workers=int(os.getenv("READ_WORKERS", "8")),
+    mmap_threshold=int(os.getenv("READ_MMAP_THRESHOLD", str(1024 * 1024)))
+)
+
+# Leitor dos arquivos resumidos no modo 'outline': o arquivo inteiro é
+# analisado (até OUTLINE_MAX_FILE_BYTES) e só o resumo vai para o prompt, por
+# isso ele não consome o orçamento total do leitor padrão
+OUTLINE_READER = FileReader(
+    max_file_bytes=int(os.getenv("OUTLINE_MAX_FILE_BYTES", str(4 * 1024 * 1024))),
+    max_total_bytes=sys.maxsize,
+    workers=int(os.getenv("READ_WORKERS", "8")),
+    mmap_threshold=int(os.getenv("READ_MMAP_THRESHOLD", str(1024 * 1024)))
+)
+
+def read_files(paths: Sequence[str]) -> List[FileContent]:
+    """Lê os arquivos com o leitor padrão
+
+    No modo de renderização 'outline' (``indexing.outline.render_mode``),
+    arquivos Python e JavaScript/TypeScript chegam resumidos em imports,
+    classes, assinaturas e docstrings; os demais, e os que não puderem ser
+    analisados, são lidos normalmente.
+    """
+    if current_render_mode() != 'outline':
+        return READER.read_many(paths)
+    return _read_outlines(paths)
+
+def _read_outlines(paths: Sequence[str]) -> List[FileContent]:
+    results: List[Optional[FileContent]] = [None] * len(paths)
+    candidates = [index for index, path in enumerate(paths) if outline_language(path)]
+    original = outlined = 0
+    for index, content in zip(candidates, OUTLINE_READER.read_many([paths[index] for index in candidates])):
+        if content.text is None or content.truncated:
+            continue
+        text = cached_outline(paths[index], content.text)
+        if text is not None:
+            results[index] = FileContent(paths[index], text, content.size, outlined=True)
+            original += content.size
+            outlined += len(text.encode('utf-8'))
+
+    rest = [index for index, result in enumerate(results) if result is None]
+    for index, content in zip(rest, READER.read_many([paths[index] for index in rest])):
+        results[index] = content
+    if candidates:
+        READER.logger.info(
+            f"Resumo de {len(paths) - len(rest)} arquivos: {original} -> {outlined} bytes"
+        )
+    return results
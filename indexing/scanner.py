@@ -0,0 +1,370 @@
+# indexing/scanner.py
+import os
+import sys
+import stat as stat_module
+import time
+import sqlite3
+import logging
+import threading
+import contextlib
+import contextvars
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .file_index import RACY_SECONDS, DirectoryRecord, FileIndex, index_path
+from .file_table import FileTable
+from .git_source import find_git_dir, read_index
+from .ignore import DEFAULT_IGNORE_FILE, IgnoreFile, root_rules
+
+# Diretórios (e arquivos) que nenhum agente analisa
+DEFAULT_IGNORE_NAMES = frozenset({'.git', '__pycache__', 'node_modules', 'venv', 'env', '.env'})
+
+# Varredura da solicitação em andamento (ver shared_scan)
+_current_scan: contextvars.ContextVar = contextvars.ContextVar('current_scan', default=None)
+
+@dataclass(frozen=True, slots=True)
+class ScannedFile:
+    """Arquivo encontrado na varredura do projeto"""
+    path: str
+    relative_path: str
+    name: str
+    extension: str
+    size: int
+    mtime: float
+    inode: int = 0
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        """Componentes do caminho relativo, como em Path.parts"""
+        return tuple(self.relative_path.split(os.sep))
+
+    def info(self, **fields) -> Dict[str, Any]:
+        """Descrição do arquivo no formato usado pelos agentes"""
+        return dict({
+            'path': self.path,
+            'name': self.name,
+            'extension': self.extension,
+            'relative_path': self.relative_path
+        }, **fields)
+
+class ProjectScan:
+    """Resultado de uma varredura: os arquivos do projeto e as visões dos agentes
+
+    Cada agente classifica os arquivos com a sua própria regra; ``view``
+    guarda o resultado de cada classificação, de modo que os arquivos são
+    listados uma vez e classificados uma vez por regra. As regras recebem a
+    ``table`` da varredura (ver FileTable), também construída uma única vez.
+    """
+
+    def __init__(self, root: str, files: List[ScannedFile], duration: float = 0.0,
+                 index: Optional[FileIndex] = None, complete: bool = True):
+        self.root = root
+        self.files = files
+        self.duration = duration
+        self.index = index
+        # False quando só parte dos arquivos do projeto está presente (ver subset)
+        self.complete = complete
+        self._views: Dict[Hashable, Any] = {}
+        self._table: Optional[FileTable] = None
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> FileTable:
+        """Metadados dos arquivos em colunas, construídos na primeira consulta"""
+        with self._lock:
+            if self._table is None:
+                self._table = FileTable(self.root, self.files)
+            return self._table
+
+    def view(self, key: Hashable, build: Callable[[FileTable], Any]) -> Any:
+        """Retorna a visão ``key``, construindo-a na primeira consulta"""
+        with self._lock:
+            if key in self._views:
+                return self._views[key]
+        result = build(self.table)
+        with self._lock:
+            return self._views.setdefault(key, result)
+
+    def subset(self, relative_paths: Iterable[str]) -> "ProjectScan":
+        """Varredura só com os arquivos informados (por exemplo, os alterados)"""
+        wanted = set(relative_paths)
+        return ProjectScan(self.root, [file for file in self.files if file.relative_path in wanted],
+                           self.duration, self.index, complete=False)
+
+    def matches(self, project_path: str) -> bool:
+        return os.path.abspath(project_path) == self.root
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+class ProjectScanner:
+    """Lista os arquivos de um projeto em uma única passada com os.scandir
+
+    Entradas excluídas são descartadas antes de qualquer outra verificação,
+    de modo que diretórios ignorados nunca são percorridos. Valem os nomes
+    em ``ignore_names``, os .gitignore do projeto (inclusive os de
+    subdiretórios, para os caminhos abaixo deles) e o arquivo de exclusão do
+    projeto (``ignore_file``). Links simbólicos para diretórios não são
+    seguidos, evitando ciclos.
+
+    Com ``use_index``, cada projeto tem um índice persistente em
+    ``index_dir`` (ver FileIndex): diretórios cujo mtime não mudou não são
+    listados novamente.
+
+    Com ``source='git'``, projetos que são checkouts do Git são listados pelo
+    índice do repositório (só arquivos rastreados, sem percorrer diretórios);
+    os demais continuam sendo percorridos.
+    """
+
+    def __init__(self, ignore_names: Iterable[str] = DEFAULT_IGNORE_NAMES,
+                 use_gitignore: bool = True, ignore_file: Optional[str] = DEFAULT_IGNORE_FILE,
+                 use_index: bool = False, index_dir: Optional[str] = None, source: str = 'walk'):
+        self.ignore_names = frozenset(ignore_names)
+        self.source = source
+        self.use_gitignore = use_gitignore
+        self.ignore_file = ignore_file
+        self.use_index = use_index
+        self.index_dir = index_dir
+        self.logger = logging.getLogger(__name__)
+        self._indexes: Dict[str, FileIndex] = {}
+        self._lock = threading.Lock()
+
+    def scan(self, project_path: str) -> ProjectScan:
+        """Varredura do projeto, reaproveitando a da solicitação em andamento"""
+        current = _current_scan.get()
+        if current is not None and current.matches(project_path):
+            return current
+        return self.walk(project_path)
+
+    def index(self, root: str) -> Optional[FileIndex]:
+        """Índice persistente do projeto; None se desativado ou indisponível"""
+        if not self.use_index:
+            return None
+        with self._lock:
+            index = self._indexes.get(root)
+            if index is None:
+                index_dir = self.index_dir or os.getenv(
+                    "INDEX_DIR", os.path.join(os.getenv("CACHE_DIR", ".cache"), "index")
+                )
+                try:
+                    index = FileIndex(index_path(index_dir, root), root)
+                except (OSError, sqlite3.Error) as e:
+                    self.logger.warning(f"Índice de arquivos indisponível para {root}: {str(e)}")
+                    return None
+                self._indexes[root] = index
+            return index
+
+    def walk(self, project_path: str) -> ProjectScan:
+        """Percorre o projeto e retorna os arquivos ordenados pelo caminho relativo"""
+        started_at = time.perf_counter()
+        root = os.path.abspath(project_path)
+        if self.source == 'git':
+            scan = self._from_git(root, started_at)
+            if scan is not None:
+                return scan
+        files: List[ScannedFile] = []
+        skipped = 0
+        index = self.index(root)
+        changes = _IndexChanges(index, self.logger)
+        pending = [(root, '', root_rules(root, self.ignore_file, self.use_gitignore))]
+
+        while pending:
+            directory, prefix, rules = pending.pop()
+            try:
+                entries = self._list(directory, _posix(prefix), changes)
+            except OSError as e:
+                if directory == root:
+                    raise
+                self.logger.warning(f"Não foi possível listar {directory}: {str(e)}")
+                continue
+
+            # O .gitignore de um subdiretório vale para o que está abaixo dele
+            if prefix and self.use_gitignore and any(name == '.gitignore' for name, _ in entries):
+                rules = rules.child(IgnoreFile.load(os.path.join(directory, '.gitignore'), _posix(prefix)))
+
+            for name, kind in entries:
+                if name in self.ignore_names:
+                    skipped += 1
+                    continue
+                relative_path = prefix + name
+                path = os.path.join(directory, name)
+                is_dir = kind == 'd'
+                if rules and rules.ignored(_posix(relative_path), is_dir):
+                    skipped += 1
+                elif is_dir:
+                    pending.append((path, relative_path + os.sep, rules))
+                else:
+                    try:
+                        stat = os.stat(path)
+                    except OSError as e:
+                        self.logger.debug(f"Ignorando {path}: {str(e)}")
+                        continue
+                    if not stat_module.S_ISREG(stat.st_mode):
+                        continue
+                    files.append(ScannedFile(
+                        path=path,
+                        relative_path=relative_path,
+                        name=name,
+                        extension=_extension(name),
+                        size=stat.st_size,
+                        mtime=stat.st_mtime,
+                        inode=stat.st_ino
+                    ))
+
+        files.sort(key=lambda file: file.relative_path)
+        changed = changes.commit()
+        duration = time.perf_counter() - started_at
+        self.logger.info(
+            f"Varredura de {root}: {len(files)} arquivos em {duration:.3f}s ({skipped} entradas excluídas"
+            + (f", {changed} alterações no índice)" if index is not None else ")")
+        )
+        return ProjectScan(root, files, duration, index)
+
+    def _from_git(self, root: str, started_at: float) -> Optional[ProjectScan]:
+        """Arquivos rastreados pelo índice do Git; None se não houver índice utilizável"""
+        git_dir = find_git_dir(root)
+        entries = read_index(git_dir) if git_dir else None
+        if entries is None:
+            return None
+
+        # Arquivos rastreados já passaram pelo .gitignore; valem os nomes
+        # ignorados e o arquivo de exclusão do projeto
+        rules = root_rules(root, self.ignore_file, use_gitignore=False)
+        ignored_dirs: Dict[str, bool] = {}
+
+        def directory_ignored(directory: str) -> bool:
+            if directory not in ignored_dirs:
+                parent = directory.rpartition('/')[0]
+                ignored_dirs[directory] = ((bool(parent) and directory_ignored(parent))
+                                           or rules.ignored(directory, True))
+            return ignored_dirs[directory]
+
+        files: List[ScannedFile] = []
+        skipped = 0
+        for entry in entries:
+            directory, _, name = entry.path.rpartition('/')
+            if any(part in self.ignore_names for part in entry.path.split('/')) or (rules and (
+                    (directory and directory_ignored(directory)) or rules.ignored(entry.path, False))):
+                skipped += 1
+                continue
+            relative_path = entry.path.replace('/', os.sep)
+            path = os.path.join(root, relative_path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Rastreado, mas removido da área de trabalho
+                continue
+            if not stat_module.S_ISREG(stat.st_mode):
+                continue
+            files.append(ScannedFile(
+                path=path,
+                relative_path=relative_path,
+                name=name,
+                extension=_extension(name),
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                inode=stat.st_ino
+            ))
+
+        files.sort(key=lambda file: file.relative_path)
+        duration = time.perf_counter() - started_at
+        self.logger.info(
+            f"Varredura de {root} pelo índice do Git: {len(files)} arquivos em {duration:.3f}s "
+            f"({skipped} entradas excluídas)"
+        )
+        return ProjectScan(root, files, duration, self.index(root))
+
+    def _list(self, directory: str, key: str, changes: "_IndexChanges") -> List[Tuple[str, str]]:
+        """Entradas do diretório como (nome, 'd' | 'f'), do índice se ele não mudou"""
+        if changes.index is None:
+            return _scandir(directory)
+        stat = os.stat(directory)
+        record = changes.directories.pop(key, None)
+        if record is not None and (record.mtime, record.inode) == (stat.st_mtime, stat.st_ino):
+            return record.entries
+        entries = _scandir(directory)
+        changes.directory(key, stat, entries, record is not None)
+        return entries
+
+class _IndexChanges:
+    """Diferenças entre uma varredura e o índice, gravadas ao final dela"""
+
+    def __init__(self, index: Optional[FileIndex], logger: logging.Logger):
+        self.index = index
+        self.logger = logger
+        self.listed_at = time.time()
+        self.directories: Dict[str, DirectoryRecord] = {}
+        if index is not None:
+            try:
+                self.directories = index.snapshot()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Erro ao ler o índice de arquivos: {str(e)}")
+                self.index = None
+        self.updated_directories: List[Tuple[str, DirectoryRecord]] = []
+        self.stale_directories: List[str] = []
+
+    def directory(self, key: str, stat: os.stat_result, entries: List[Tuple[str, str]], known: bool) -> None:
+        # Uma listagem feita no mesmo intervalo do mtime pode não incluir uma
+        # alteração que mantenha esse mtime; nesse caso ela não é guardada
+        if self.listed_at - stat.st_mtime > RACY_SECONDS:
+            self.updated_directories.append((key, DirectoryRecord(stat.st_mtime, stat.st_ino, entries)))
+        elif known:
+            self.stale_directories.append(key)
+
+    def commit(self) -> int:
+        """Grava as mudanças; o que não foi visto nesta varredura sai do índice"""
+        if self.index is None:
+            return 0
+        removed_directories = list(self.directories) + self.stale_directories
+        try:
+            self.index.update(self.updated_directories, removed_directories)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Erro ao gravar o índice de arquivos: {str(e)}")
+        return len(self.updated_directories) + len(removed_directories)
+
+def _scandir(directory: str) -> List[Tuple[str, str]]:
+    entries = []
+    with os.scandir(directory) as iterator:
+        for entry in iterator:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    entries.append((entry.name, 'd'))
+                elif entry.is_file():
+                    entries.append((entry.name, 'f'))
+            except OSError:
+                continue
+    return entries
+
+def _posix(relative_path: str) -> str:
+    """Caminho relativo com "/", como nos padrões de exclusão"""
+    return relative_path if os.sep == '/' else relative_path.replace(os.sep, '/')
+
+def _extension(name: str) -> str:
+    """Extensão como em Path.suffix"""
+    extension = os.path.splitext(name)[1]
+    # As mesmas poucas extensões se repetem em todos os arquivos
+    return '' if extension == '.' else sys.intern(extension)
+
+# Scanner padrão usado pelos agentes (SCAN_USE_GITIGNORE=0 desativa o .gitignore;
+# PROJECT_IGNORE_FILE define o nome do arquivo de exclusão do projeto; SCAN_INDEX=0
+# desativa o índice persistente, guardado em INDEX_DIR ou em CACHE_DIR/index;
+# SCAN_SOURCE=git lista checkouts do Git pelo índice do repositório)
+SCANNER = ProjectScanner(
+    use_gitignore=os.getenv("SCAN_USE_GITIGNORE", "1") != "0",
+    ignore_file=os.getenv("PROJECT_IGNORE_FILE", DEFAULT_IGNORE_FILE) or None,
+    use_index=os.getenv("SCAN_INDEX", "1") != "0",
+    source=os.getenv("SCAN_SOURCE", "walk")
+)
+
+def scan_project(project_path: str) -> ProjectScan:
+    """Arquivos do projeto: a varredura compartilhada da solicitação ou uma nova"""
+    return SCANNER.scan(project_path)
+
+@contextlib.contextmanager
+def shared_scan(scan: ProjectScan):
+    """Compartilha a varredura com os agentes chamados neste contexto"""
+    token = _current_scan.set(scan)
+    try:
+        yield scan
+    finally:
+        _current_scan.reset(token)
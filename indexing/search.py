@@ -0,0 +1,240 @@
+# indexing/search.py
+import os
+import re
+import math
+import time
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .outline import current_render_mode
+from .reader import FileReader
+from .scanner import ProjectScan, ScannedFile, scan_project
+
+logger = logging.getLogger(__name__)
+
+# Parâmetros do BM25
+K1 = 1.2
+B = 0.75
+
+# Peso de um termo que aparece no caminho em relação ao conteúdo
+PATH_WEIGHT = 3
+
+# Quantos arquivos os agentes enviam no prompt, no máximo
+DEFAULT_TOP_K = int(os.getenv("SEARCH_TOP_K", "20"))
+# No modo 'outline' cada arquivo custa uma fração dos tokens, então cabem mais
+OUTLINE_TOP_K = int(os.getenv("SEARCH_OUTLINE_TOP_K", "200"))
+
+# Bytes lidos por atualização do índice; o que passar disso fica só com os
+# termos do caminho e é lido de novo na atualização seguinte
+MAX_UPDATE_BYTES = int(os.getenv("SEARCH_MAX_UPDATE_BYTES", str(64 * 1024 * 1024)))
+
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e ela ele em entre essa esse esta este eu isso
+mais mas me meu minha na nas no nos o os ou para pela pelas pelo pelos por qual quais
+que se sem ser seu sua tem um uma umas uns voce favor analise analisar projeto
+an and are as at be by can do for from how i if in is it me my of on or please
+the this to what which with you your
+""".split())
+
+WORD_PATTERN = re.compile(r'[^\W_]+(?:_[^\W_]+)*|_+[^\W_]+', re.UNICODE)
+CAMEL_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+def _strip_accents(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+def _fold(word: str) -> str:
+    """Minúsculas sem o plural simples ("usuarios" -> "usuario")"""
+    word = word.lower()
+    if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """Termos de um texto em português ou inglês
+
+    Identificadores entram inteiros e também divididos em snake_case e
+    camelCase (``getUserName`` -> ``getusername``, ``get``, ``user``,
+    ``name``); palavras vazias das duas línguas são descartadas.
+    """
+    terms = []
+    for match in WORD_PATTERN.finditer(_strip_accents(text)):
+        word = match.group(0).strip('_')
+        parts = [part for piece in word.split('_') for part in CAMEL_PATTERN.findall(piece) or [piece]]
+        if len(parts) > 1:
+            terms.append(_fold(word.replace('_', '')))
+        for part in parts:
+            folded = _fold(part)
+            if len(folded) > 1 and folded not in STOPWORDS:
+                terms.append(folded)
+    return terms
+
+def path_terms(relative_path: str) -> List[str]:
+    return tokenize(relative_path.replace(os.sep, ' ').replace('.', ' '))
+
+class SearchIndex:
+    """Índice invertido dos arquivos de um projeto com ranqueamento BM25
+
+    Cada documento é um arquivo: os termos do caminho (com peso
+    ``PATH_WEIGHT``) e os do conteúdo, incluindo identificadores. ``update``
+    reindexa apenas arquivos novos ou com tamanho/mtime/inode diferentes, de
+    modo que consultas seguintes custam só o ranqueamento. Cada atualização
+    lê no máximo ``max_total_bytes`` do reader.
+    """
+
+    def __init__(self, reader: Optional[FileReader] = None):
+        self.reader = reader or FileReader(
+            max_file_bytes=int(os.getenv("SEARCH_MAX_FILE_BYTES", str(256 * 1024))),
+            max_total_bytes=MAX_UPDATE_BYTES
+        )
+        # caminho -> (tamanho, mtime, inode), frequência dos termos e total de termos
+        self.documents: Dict[str, Tuple[Optional[Tuple[int, float, int]], Counter, int]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+        # Agentes da mesma solicitação atualizam o índice um de cada vez, sem
+        # ler duas vezes os mesmos arquivos
+        self._update_lock = threading.Lock()
+
+    def update(self, files: Sequence[ScannedFile], complete: bool = True) -> int:
+        """Indexa os arquivos alterados; com ``complete``, remove os que sumiram"""
+        with self._update_lock:
+            return self._update(files, complete)
+
+    def _update(self, files: Sequence[ScannedFile], complete: bool) -> int:
+        with self._lock:
+            stale = [file for file in files
+                     if self.documents.get(file.relative_path, (None,))[0] != (file.size, file.mtime, file.inode)]
+            removed = set(self.documents) - {file.relative_path for file in files} if complete else set()
+        if not stale and not removed:
+            return 0
+
+        contents = self.reader.read_many([file.path for file in stale])
+        documents = []
+        for file, content in zip(stale, contents):
+            terms = Counter(tokenize(content.text or ''))
+            for term in path_terms(file.relative_path):
+                terms[term] += PATH_WEIGHT
+            # Sem assinatura, o arquivo que ficou fora do limite é lido na próxima atualização
+            signature = None if content.skipped == 'budget' else (file.size, file.mtime, file.inode)
+            documents.append((file.relative_path, signature, terms))
+
+        with self._lock:
+            for path in removed:
+                self._remove(path)
+            for path, signature, terms in documents:
+                self._remove(path)
+                length = sum(terms.values())
+                self.documents[path] = (signature, terms, length)
+                self.total_length += length
+                for term, frequency in terms.items():
+                    self.postings.setdefault(term, {})[path] = frequency
+        return len(documents) + len(removed)
+
+    def retain(self, paths: Iterable[str]) -> int:
+        """Remove do índice os arquivos fora de ``paths`` (os que sumiram do projeto)"""
+        keep = set(paths)
+        with self._lock:
+            removed = [path for path in self.documents if path not in keep]
+            for path in removed:
+                self._remove(path)
+        return len(removed)
+
+    def _remove(self, path: str) -> None:
+        document = self.documents.pop(path, None)
+        if document is None:
+            return
+        _, terms, length = document
+        self.total_length -= length
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(path, None)
+                if not posting:
+                    del self.postings[term]
+
+    def search(self, query: str, candidates: Optional[Iterable[str]] = None,
+               k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Arquivos mais relevantes para a consulta, com a pontuação BM25"""
+        allowed = set(candidates) if candidates is not None else None
+        scores: Dict[str, float] = {}
+        with self._lock:
+            count = len(self.documents)
+            if not count:
+                return []
+            average = self.total_length / count
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for path, frequency in posting.items():
+                    if allowed is not None and path not in allowed:
+                        continue
+                    length = self.documents[path][2]
+                    scores[path] = scores.get(path, 0.0) + idf * frequency * (K1 + 1) / (
+                        frequency + K1 * (1 - B + B * length / average)
+                    )
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k] if k is not None else ranked
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+def search_index(project_path: str) -> SearchIndex:
+    """Índice de busca do projeto, mantido enquanto o processo estiver ativo"""
+    root = os.path.abspath(project_path)
+    with _indexes_lock:
+        if root not in _indexes:
+            _indexes[root] = SearchIndex()
+        return _indexes[root]
+
+def search_project(project_path: str, query: str, candidates: Optional[Iterable[str]] = None,
+                   k: Optional[int] = None, scan: Optional[ProjectScan] = None) -> List[Tuple[str, float]]:
+    """Busca no projeto, atualizando antes o índice com a varredura da solicitação
+
+    Com ``candidates``, só esses arquivos são lidos e indexados; os demais
+    do projeto não custam nenhuma leitura.
+    """
+    started_at = time.perf_counter()
+    scan = scan or scan_project(project_path)
+    index = search_index(project_path)
+    if candidates is None:
+        updated = index.update(scan.files, complete=scan.complete)
+    else:
+        candidates = set(candidates)
+        updated = index.update([file for file in scan.files if file.relative_path in candidates], complete=False)
+        if scan.complete:
+            updated += index.retain(file.relative_path for file in scan.files)
+    results = index.search(query, candidates, k)
+    logger.info(
+        f"Busca em {scan.root}: {len(results)} resultados em {(time.perf_counter() - started_at) * 1000:.1f}ms "
+        f"({updated} arquivos reindexados)"
+    )
+    return results
+
+def select_relevant(project_path: str, files: List[Dict], query: str, k: Optional[int] = None) -> List[Dict]:
+    """Os ``k`` arquivos (no formato dos agentes) mais relevantes para a solicitação
+
+    Arquivos sem nenhum termo da solicitação completam a lista na ordem
+    original; com até ``k`` arquivos, todos são mantidos. O ``k`` padrão
+    depende do modo de renderização (SEARCH_TOP_K ou SEARCH_OUTLINE_TOP_K).
+    Os arquivos ranqueados voltam como cópias com a pontuação em
+    'relevance', usada pelo empacotamento do prompt (``model.packer``).
+    Entradas repetidas de um mesmo arquivo (uma por categoria, como nas
+    visões de ``FileTable.tagged``) são mantidas, cada uma com a pontuação
+    do arquivo.
+    """
+    if k is None:
+        k = OUTLINE_TOP_K if current_render_mode() == 'outline' else DEFAULT_TOP_K
+    positions: Dict[str, List[int]] = {}
+    for position, file_info in enumerate(files):
+        positions.setdefault(file_info['relative_path'], []).append(position)
+    ranked = search_project(project_path, query, positions, min(k, len(files)))
+    chosen = [(position, score) for path, score in ranked for position in positions[path]][:k]
+    picked = {position for position, _ in chosen}
+    rest = [file_info for position, file_info in enumerate(files) if position not in picked]
+    return [dict(files[position], relevance=score) for position, score in chosen] + rest[:k - len(chosen)]
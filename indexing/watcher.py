@@ -0,0 +1,181 @@
+# indexing/watcher.py
+import os
+import sys
+import errno
+import struct
+import ctypes
+import ctypes.util
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .scanner import DEFAULT_IGNORE_NAMES
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONTFOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONTFOLLOW)
+
+# Eventos que mudam a lista de arquivos, e não só o conteúdo de um deles
+STRUCTURAL_EVENTS = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+EVENT_HEADER = struct.Struct('iIII')
+READ_SIZE = 64 * 1024
+
+_libc = None
+
+def _inotify():
+    """libc com as funções do inotify; OSError se não estiver disponível"""
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify disponível apenas no Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "libc sem suporte a inotify")
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc = libc
+    return _libc
+
+def _oserror(path: Optional[str] = None) -> OSError:
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), path)
+
+@dataclass(frozen=True)
+class Change:
+    """Caminho alterado no projeto (relativo, com "/")
+
+    ``path`` None indica que eventos foram perdidos e tudo deve ser
+    considerado alterado; ``structural`` indica criação, remoção ou
+    renomeação, que mudam a lista de arquivos.
+    """
+    path: Optional[str]
+    structural: bool
+
+class InotifyWatcher:
+    """Observa a árvore de um projeto com inotify
+
+    Cada diretório (exceto os de ``ignore_names``) recebe um watch; novos
+    diretórios passam a ser observados assim que o evento de criação é lido.
+    Os eventos ficam na fila do kernel desde a escrita e são lidos sem
+    bloquear em ``changes``, de modo que quem consulta antes de usar o cache
+    vê todas as alterações já concluídas, sem thread em segundo plano.
+    """
+
+    def __init__(self, root: str, ignore_names: Iterable[str] = DEFAULT_IGNORE_NAMES):
+        self.root = os.path.abspath(root)
+        self.ignore_names = frozenset(ignore_names)
+        self.logger = logging.getLogger(__name__)
+        self._libc = _inotify()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise _oserror()
+        self._dirs: Dict[int, str] = {}
+        try:
+            self._add_tree('')
+        except OSError:
+            self.close()
+            raise
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            _inotify()
+            return True
+        except OSError:
+            return False
+
+    def _add_tree(self, relative: str) -> None:
+        """Observa o diretório e todos os subdiretórios dele"""
+        pending = [relative]
+        while pending:
+            current = pending.pop()
+            path = os.path.join(self.root, *current.split('/')) if current else self.root
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                error = _oserror(path)
+                # Diretório removido antes de ser observado: o evento de remoção já foi lido
+                if error.errno in (errno.ENOENT, errno.ENOTDIR) and current:
+                    continue
+                raise error
+            self._dirs[wd] = current
+            try:
+                with os.scandir(path) as iterator:
+                    for entry in iterator:
+                        if entry.name not in self.ignore_names and entry.is_dir(follow_symlinks=False):
+                            pending.append(f"{current}/{entry.name}" if current else entry.name)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+    def _remove_tree(self, relative: str) -> None:
+        """Deixa de observar um diretório movido para fora ou renomeado"""
+        prefix = relative + '/'
+        for wd, current in list(self._dirs.items()):
+            if current == relative or current.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+
+    def changes(self) -> List[Change]:
+        """Alterações desde a última consulta"""
+        changes: List[Change] = []
+        while True:
+            try:
+                data = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                return changes
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                change = self._handle(wd, mask, name)
+                if change is not None:
+                    changes.append(change)
+
+    def _handle(self, wd: int, mask: int, name: str) -> Optional[Change]:
+        if mask & IN_Q_OVERFLOW:
+            self.logger.warning(f"Fila do inotify excedida em {self.root}; cache invalidado")
+            return Change(None, True)
+        directory = self._dirs.get(wd)
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return None
+        if directory is None:
+            return None
+        path = (f"{directory}/{name}" if directory else name) if name else directory
+        if name in self.ignore_names:
+            return None
+
+        if mask & IN_ISDIR:
+            if mask & IN_MOVED_FROM:
+                self._remove_tree(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._add_tree(path)
+                except OSError as e:
+                    self.logger.warning(f"Não foi possível observar {path}: {str(e)}")
+                    return Change(None, True)
+        return Change(path, bool(mask & STRUCTURAL_EVENTS))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._dirs.clear()
@@ -1,71 +1,210 @@
 # integration/integration_layer.py
 import os
 import logging
+import threading
+import contextvars
 import concurrent.futures
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Set, Any
 from pathlib import Path
 
+from indexing.blob_store import BLOBS, BlobStore
+from indexing.file_table import FileTable
+from indexing.ignore import DEFAULT_IGNORE_FILE
+from indexing.import_graph import focus_files
+from indexing.outline import render_mode
+from indexing.scanner import SCANNER, scan_project, shared_scan
+from indexing.watcher import Change, InotifyWatcher
+from model.metrics import agent_context
+from model.transformer_model import stream_tokens
+
+# Método de análise de cada agente
+AGENT_METHODS = {
+    'code_analysis': 'analyze',
+    'project_improvement': 'suggest_improvements',
+    'database': 'analyze_database',
+    'backend': 'analyze_backend',
+    'frontend': 'analyze_frontend',
+    'devops': 'analyze_devops',
+    'project_management': 'analyze_project'
+}
+
+# Arquivos cuja alteração muda quais arquivos do projeto são listados
+IGNORE_FILES = frozenset({'.gitignore', SCANNER.ignore_file or DEFAULT_IGNORE_FILE})
+
 class IntegrationError(Exception):
     """Exceção personalizada para erros na camada de integração"""
     pass
 
 class FileManager:
-    """Gerencia operações de arquivo centralizadas"""
+    """Gerencia operações de arquivo centralizadas
+
+    O conteúdo lido fica no BlobStore compartilhado, uma vez por hash para
+    todos os projetos, e o cache guarda só o hash de cada arquivo. No modo ``poll`` (padrão), cada entrada é
+    conferida pelo mtime e tamanho antes de ser usada; no modo ``inotify``, um
+    InotifyWatcher por projeto remove do cache só os arquivos alterados e a
+    lista de arquivos só é refeita quando algo é criado, removido ou
+    renomeado, de modo que consultas sem alterações não tocam o disco. Sem
+    inotify disponível, o modo ``poll`` é usado.
+    """
     
-    def __init__(self):
+    def __init__(self, watch_mode: Optional[str] = None, blob_store: Optional[BlobStore] = None):
         self.logger = logging.getLogger(__name__)
+        # (projeto, arquivo) -> hash do conteúdo no BlobStore, mtime e tamanho
         self.file_cache = {}
+        self.blob_store = blob_store or BLOBS
+        self.watch_mode = watch_mode or os.getenv("FILE_CACHE_WATCH", "poll")
+        self.file_lists: Dict[str, List[str]] = {}
+        self.list_generations: Dict[str, int] = {}
+        self.watchers: Dict[str, Optional[InotifyWatcher]] = {}
+        # Protege o cache e as listas; reentrante porque _invalidate, chamado
+        # sob ela, remove entradas com _evict
+        self._lock = threading.RLock()
+    
+    def _sync(self, project_path: str) -> Optional[InotifyWatcher]:
+        """Aplica ao cache as alterações observadas; None se o projeto não é observado"""
+        if self.watch_mode != 'inotify':
+            return None
+        root = os.path.abspath(project_path)
+        with self._lock:
+            if root not in self.watchers:
+                try:
+                    self.watchers[root] = InotifyWatcher(root)
+                except OSError as e:
+                    self.logger.warning(f"inotify indisponível para {root}, usando mtime: {str(e)}")
+                    self.watchers[root] = None
+            watcher = self.watchers[root]
+            if watcher is not None:
+                for change in watcher.changes():
+                    self._invalidate(root, change)
+            return watcher
+    
+    def _invalidate(self, root: str, change: Change) -> None:
+        """Remove do cache o que uma alteração afeta"""
+        if not change.path:
+            self._invalidate_list(root)
+            for key in [key for key in self.file_cache if key[0] == root]:
+                self._evict(key)
+            return
+        relative_path = change.path.replace('/', os.sep)
+        self._evict((root, relative_path))
+        if change.structural or os.path.basename(relative_path) in IGNORE_FILES:
+            self._invalidate_list(root)
+            if change.structural:
+                # Um diretório removido ou renomeado leva junto o que está abaixo dele
+                prefix = relative_path + os.sep
+                for key in [key for key in self.file_cache if key[0] == root and key[1].startswith(prefix)]:
+                    self._evict(key)
+    
+    def _invalidate_list(self, root: str) -> None:
+        self.file_lists.pop(root, None)
+        self.list_generations[root] = self.list_generations.get(root, 0) + 1
     
     def get_project_files(self, project_path: str) -> List[str]:
         """Obtém lista de arquivos relevantes do projeto"""
-        if project_path in self.file_cache:
-            return self.file_cache[project_path]['files']
-            
         try:
-            files = []
-            ignored_dirs = {'.git', '__pycache__', 'node_modules', 'venv', 'env', '.env'}
-            relevant_extensions = {'.py', '.js', '.html', '.css', '.json', '.yml', '.yaml', '.md', '.txt'}
-            
-            path = Path(project_path)
-            for item in path.rglob('*'):
-                if item.is_file() and not any(part in ignored_dirs for part in item.parts):
-                    if item.suffix in relevant_extensions:
-                        files.append(str(item.relative_to(path)))
-            
-            self.file_cache[project_path] = {'files': files}
+            root = os.path.abspath(project_path)
+            watcher = self._sync(project_path)
+            if watcher is None:
+                files = scan_project(project_path).view('file_manager', self._select_relevant_files)
+            elif root in self.file_lists:
+                return list(self.file_lists[root])
+            else:
+                # Varredura nova, posterior aos eventos já aplicados; a lista só
+                # fica em cache se nada mudou na estrutura durante ela
+                generation = self.list_generations.get(root, 0)
+                files = self._select_relevant_files(SCANNER.walk(project_path).table)
+                self._sync(project_path)
+                with self._lock:
+                    if self.list_generations.get(root, 0) == generation:
+                        self.file_lists[root] = list(files)
             self.logger.info(f"Encontrados {len(files)} arquivos relevantes")
-            return files
+            return list(files)
             
         except Exception as e:
             self.logger.error(f"Erro ao obter arquivos do projeto: {str(e)}")
             raise IntegrationError(f"Erro ao obter arquivos do projeto: {str(e)}")
     
+    @staticmethod
+    def _select_relevant_files(table: FileTable) -> List[str]:
+        """Caminhos relativos dos arquivos com extensões relevantes"""
+        ignored_dirs = {'.git', '__pycache__', 'node_modules', 'venv', 'env', '.env'}
+        relevant_extensions = {'.py', '.js', '.html', '.css', '.json', '.yml', '.yaml', '.md', '.txt'}
+        selected = table.extension_mask(relevant_extensions) & table.excluding(ignored_dirs)
+        return [row['relative_path'] for row in table.rows(selected)]
+    
     def get_file_content(self, project_path: str, file_path: str) -> str:
         """Obtém conteúdo de um arquivo específico"""
-        cache_key = f"{project_path}:{file_path}"
-        if cache_key in self.file_cache:
-            return self.file_cache[cache_key]['content']
+        content = self._cached_content(project_path, file_path)
+        if content is not None:
+            return content
+        cache_key = (os.path.abspath(project_path), file_path)
+        full_path = Path(project_path) / file_path
             
         try:
-            full_path = Path(project_path) / file_path
+            stat = os.stat(full_path)
             with open(full_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                self.file_cache[cache_key] = {'content': content}
-                return content
+            # Alterações durante a leitura aparecem na próxima consulta ao watcher
+            self._store(cache_key, {'blob': self.blob_store.put(content), 'mtime': stat.st_mtime_ns,
+                                    'size': stat.st_size})
+            return content
                 
         except Exception as e:
+            self._evict(cache_key)
             self.logger.error(f"Erro ao ler arquivo {file_path}: {str(e)}")
             return f"Erro ao ler arquivo: {str(e)}"
     
-    def get_files_with_content(self, project_path: str) -> Dict[str, str]:
-        """Obtém dicionário de arquivos com seu conteúdo"""
+    def _cached_content(self, project_path: str, file_path: str) -> Optional[str]:
+        """Conteúdo em cache, se ainda corresponde ao arquivo no disco"""
+        watcher = self._sync(project_path)
+        cached = self.file_cache.get((os.path.abspath(project_path), file_path))
+        if cached is None:
+            return None
+        if watcher is None:
+            try:
+                stat = os.stat(Path(project_path) / file_path)
+            except OSError:
+                return None
+            if (cached['mtime'], cached['size']) != (stat.st_mtime_ns, stat.st_size):
+                return None
+        # None se o conteúdo já saiu do BlobStore; o arquivo é lido de novo
+        return self.blob_store.get(cached['blob'])
+    
+    def _store(self, cache_key, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            previous = self.file_cache.get(cache_key)
+            self.file_cache[cache_key] = entry
+        if previous is not None:
+            self.blob_store.release(previous['blob'])
+    
+    def _evict(self, cache_key) -> None:
+        with self._lock:
+            entry = self.file_cache.pop(cache_key, None)
+        if entry is not None:
+            self.blob_store.release(entry['blob'])
+    
+    def get_files_with_content(self, project_path: str, only: Optional[Set[str]] = None) -> Dict[str, str]:
+        """Obtém dicionário de arquivos com seu conteúdo (só os de ``only``, se informado)"""
         files = self.get_project_files(project_path)
         result = {}
         
         for file_path in files:
+            if only is not None and file_path not in only:
+                continue
             result[file_path] = self.get_file_content(project_path, file_path)
             
         return result
+    
+    def close(self) -> None:
+        """Encerra os watchers e libera as referências ao BlobStore"""
+        with self._lock:
+            for watcher in self.watchers.values():
+                if watcher is not None:
+                    watcher.close()
+            self.watchers.clear()
+            self.file_lists.clear()
+        for key in list(self.file_cache):
+            self._evict(key)
 
 class IntegrationLayer:
     """Camada de integração que coordena os agentes"""
@@ -98,55 +237,137 @@ class IntegrationLayer:
         
         # Gerenciador de arquivos centralizado
         self.file_manager = FileManager()
+        
+        # Foco nos arquivos citados na solicitação e na vizinhança deles no
+        # grafo de imports (GRAPH_CONTEXT=0 desativa)
+        self.graph_context = os.getenv("GRAPH_CONTEXT", "1") != "0"
     
-    def process_request(self, request_type: str, project_path: str, user_message: str) -> str:
-        """Processa solicitações do usuário"""
+    def process_request(self, request_type: str, project_path: str, user_message: str,
+                        on_token: Optional[Callable[[str], None]] = None,
+                        changed_files: Optional[Iterable[str]] = None,
+                        render: Optional[str] = None) -> str:
+        """Processa solicitações do usuário
+
+        Se on_token for informado, os tokens da resposta final são entregues a
+        ele à medida que o modelo os gera. Com changed_files (caminhos
+        relativos), só esses arquivos são analisados (análise "delta").
+        render escolhe como os arquivos entram nos prompts: 'full' ou
+        'outline' (só a estrutura); None usa o padrão (PROMPT_RENDER).
+        """
+        emitted = []
+        
+        def emit(token: str) -> None:
+            emitted.append(True)
+            on_token(token)
+        
+        sink = emit if on_token else None
+        
         try:
-            if not user_message:
-                return "Por favor, forneça uma mensagem para processar."
-            
-            self.logger.info(f"Processando solicitação: {user_message[:50]}...")
-            
-            # Validar caminho do projeto
-            self.validate_project_path(project_path)
-            
-            # Obter arquivos do projeto
-            project_files = self.file_manager.get_files_with_content(project_path)
-            if not project_files:
-                return "Nenhum arquivo relevante encontrado no projeto."
-            
-            # Analisar a solicitação para determinar quais agentes são necessários
-            required_agents = self._analyze_request(user_message)
+            with render_mode(render):
+                result = self._process_request(project_path, user_message, sink, changed_files)
             
-            # Preparar contexto
-            context = {
-                'project_files': project_files,
-                'user_message': user_message
-            }
-            
-            # Processar com os agentes identificados
-            responses = self._process_with_agents(
-                required_agents, project_path, user_message, project_files, context
-            )
-            
-            # Otimizar ou formatar respostas
-            if self.response_optimizer and len(responses) > 1:
-                combined_response = "\n\n".join([f"**{agent}**: {response}" 
-                                               for agent, response in responses.items() 
-                                               if 'error' not in response])
-                
-                return self.response_optimizer.optimize_response(combined_response, user_message)
-            else:
-                return self._format_raw_responses(responses)
+            # Respostas que não vieram do modelo são entregues de uma vez
+            if on_token and not emitted:
+                on_token(result)
+            return result
                 
         except Exception as e:
             self.logger.error(f"Erro ao processar solicitação: {str(e)}")
             raise IntegrationError(f"Erro ao processar solicitação: {str(e)}")
     
+    def _process_request(self, project_path: str, user_message: str,
+                         sink: Optional[Callable[[str], None]],
+                         changed_files: Optional[Iterable[str]] = None) -> str:
+        """Executa as etapas do processamento de uma solicitação"""
+        if not user_message:
+            return "Por favor, forneça uma mensagem para processar."
+            
+        self.logger.info(f"Processando solicitação: {user_message[:50]}...")
+        
+        # Validar caminho do projeto
+        self.validate_project_path(project_path)
+        
+        # Uma única varredura do projeto, compartilhada por todos os agentes
+        scan = scan_project(project_path)
+        only = None
+        if changed_files is not None:
+            # Análise delta: os agentes veem apenas os arquivos alterados
+            only = set(changed_files)
+            scan = scan.subset(only)
+            self.logger.info(f"Análise delta: {len(scan)} arquivos alterados")
+            if not scan.files:
+                return "Nenhum arquivo alterado desde a última análise."
+        elif self.graph_context:
+            # Arquivos citados na mensagem e ligados no grafo: os agentes veem
+            # eles e os seus imports e importadores, em vez do projeto inteiro;
+            # sem foco (README.md, pedido geral) a varredura inteira é usada
+            focus = focus_files(project_path, user_message, scan)
+            if focus:
+                only = set(focus)
+                scan = scan.subset(only)
+                self.logger.info(f"Contexto pelo grafo de imports: {len(scan)} arquivos")
+        with shared_scan(scan):
+            return self._process_scanned(project_path, user_message, sink, only)
+    
+    def _process_scanned(self, project_path: str, user_message: str,
+                         sink: Optional[Callable[[str], None]], only: Optional[Set[str]] = None) -> str:
+        """Processa a solicitação com a varredura do projeto já feita"""
+        # Obter arquivos do projeto
+        project_files = self.file_manager.get_files_with_content(project_path, only)
+        if not project_files:
+            return "Nenhum arquivo relevante encontrado no projeto."
+        
+        # Analisar a solicitação para determinar quais agentes são necessários
+        required_agents = self._analyze_request(user_message)
+        
+        # Preparar contexto
+        context = {
+            'project_files': project_files,
+            'user_message': user_message
+        }
+        
+        # Processar com os agentes identificados; com um único agente a
+        # resposta dele é a final e pode ser transmitida
+        responses = self._process_with_agents(
+            required_agents, project_path, user_message, project_files, context,
+            sink=sink if len(required_agents) == 1 else None
+        )
+        
+        # Otimizar ou formatar respostas
+        if self.response_optimizer and len(responses) > 1:
+            combined_response = "\n\n".join([f"**{agent}**: {response}" 
+                                           for agent, response in responses.items() 
+                                           if 'error' not in response])
+            
+            with agent_context('response_optimizer'):
+                if sink:
+                    with stream_tokens(sink):
+                        return self.response_optimizer.optimize_response(combined_response, user_message)
+                return self.response_optimizer.optimize_response(combined_response, user_message)
+        else:
+            return self._format_raw_responses(responses)
+    
+    def validate_project_path(self, project_path: str) -> None:
+        """Valida se o caminho do projeto existe e é um diretório"""
+        if not project_path:
+            raise ValueError("Caminho do projeto não informado")
+        
+        path = Path(project_path)
+        if not path.exists():
+            raise ValueError(f"Caminho do projeto não existe: {project_path}")
+        if not path.is_dir():
+            raise ValueError(f"Caminho do projeto não é um diretório: {project_path}")
+    
     def _analyze_request(self, user_message: str) -> List[str]:
         """Analisa a solicitação para determinar quais agentes usar"""
         if self.request_analyzer:
-            return self.request_analyzer.analyze_request(user_message)
+            with agent_context('request_analyzer'):
+                analysis = self.request_analyzer.analyze_request(user_message)
+            agents = analysis.get('agents_to_use', []) if isinstance(analysis, dict) else analysis
+            required_agents = [agent for agent in agents if agent in self.agents]
+            if not required_agents and 'code_analysis' in self.agents:
+                required_agents.append('code_analysis')
+            return required_agents
         
         # Análise simplificada baseada em palavras-chave
         keywords = {
@@ -172,4 +393,47 @@ class IntegrationLayer:
         
         return required_agents
     
-    # [Outros métodos existentes com otimizações]
\ No newline at end of file
+    def _process_with_agents(self, required_agents: List[str], project_path: str, user_message: str,
+                             project_files: Dict[str, str], context: Dict[str, Any],
+                             sink: Optional[Callable[[str], None]] = None) -> Dict[str, str]:
+        """Executa os agentes necessários em paralelo e reúne as respostas"""
+        responses = {}
+        if not required_agents:
+            return responses
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(required_agents)) as executor:
+            futures = {
+                executor.submit(
+                    contextvars.copy_context().run, self._run_agent, agent, project_path, user_message, sink
+                ): agent
+                for agent in required_agents
+            }
+            for future in concurrent.futures.as_completed(futures):
+                agent = futures[future]
+                try:
+                    responses[agent] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Erro no agente {agent}: {str(e)}")
+                    responses[agent] = f"error: {str(e)}"
+        
+        # Manter a ordem em que os agentes foram solicitados
+        return {agent: responses[agent] for agent in required_agents}
+    
+    def _run_agent(self, agent_name: str, project_path: str, user_message: str,
+                   sink: Optional[Callable[[str], None]] = None) -> str:
+        """Chama o método de análise do agente"""
+        agent = self.agents[agent_name]
+        method = getattr(agent, AGENT_METHODS.get(agent_name, 'analyze'))
+        with agent_context(agent_name):
+            if sink:
+                with stream_tokens(sink):
+                    return method(project_path, user_message)
+            return method(project_path, user_message)
+    
+    def _format_raw_responses(self, responses: Dict[str, str]) -> str:
+        """Formata as respostas dos agentes sem otimização"""
+        if not responses:
+            return "Nenhum agente disponível para processar a solicitação."
+        if len(responses) == 1:
+            return next(iter(responses.values()))
+        return "\n\n".join(f"**{agent}**: {response}" for agent, response in responses.items())
\ No newline at end of file
@@ -137,7 +137,8 @@ def create_app():
         # Configurar rotas
         configure_routes(app, integration_layer)
         
-        # Criar tabelas do banco de dados
+        # Criar tabelas do banco de dados (colunas novas das existentes vêm
+        # das migrações em migrations/, aplicadas com "flask db upgrade")
         with app.app_context():
             db.create_all()
         
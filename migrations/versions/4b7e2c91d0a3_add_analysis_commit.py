@@ -0,0 +1,39 @@
+"""add analysis.commit
+
+Revision ID: 4b7e2c91d0a3
+Revises: 
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2c91d0a3'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    # Bancos criados antes da migração (db.create_all) podem já ter a coluna
+    # ou nem ter a tabela, que o create_all cria completa
+    columns = _columns('analysis')
+    if columns is not None and 'commit' not in columns:
+        with op.batch_alter_table('analysis') as batch_op:
+            batch_op.add_column(sa.Column('commit', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    columns = _columns('analysis')
+    if columns is not None and 'commit' in columns:
+        with op.batch_alter_table('analysis') as batch_op:
+            batch_op.drop_column('commit')
@@ -6,5 +6,6 @@ This package contains the transformer model and related utilities.
 """
 
 from .transformer_model import TransformerModel, OpenAIError
+from .cache_manager import CacheManager
 
-__all__ = ['TransformerModel', 'OpenAIError']
+__all__ = ['TransformerModel', 'OpenAIError', 'CacheManager']
@@ -0,0 +1,267 @@
+# model/cache_manager.py
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .segment_store import SegmentStore
+
+class CacheManager:
+    """Gerencia cache de respostas em dois níveis para reduzir chamadas à API
+
+    O primeiro nível é um LRU em memória, limitado por número de entradas.
+    O segundo nível fica em disco, em um ``SegmentStore`` (segmentos somente
+    de acréscimo com compressão e compactação), limitado por número de
+    entradas e por bytes, com expiração por TTL e remoção das entradas menos
+    usadas recentemente.
+
+    A ordem LRU do disco é mantida em memória por processo; chaves gravadas
+    por outros processos são encontradas pelo próprio store.
+    """
+
+    def __init__(self, cache_dir=".cache", memory_entries: Optional[int] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, compression: Optional[str] = None,
+                 refresh_interval: Optional[float] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Limites (0 desativa o limite correspondente)
+        self.memory_entries = self._setting(memory_entries, "CACHE_MEMORY_ENTRIES", 256)
+        self.max_entries = self._setting(max_entries, "CACHE_MAX_ENTRIES", 10000)
+        self.max_bytes = self._setting(max_bytes, "CACHE_MAX_BYTES", 256 * 1024 * 1024)
+        self.ttl = float(ttl if ttl is not None else os.getenv("CACHE_TTL", str(7 * 24 * 3600)))
+
+        self.store = SegmentStore(
+            self.cache_dir / "segments",
+            segment_bytes=self._setting(None, "CACHE_SEGMENT_BYTES", 64 * 1024 * 1024),
+            compression=compression or os.getenv("CACHE_COMPRESSION", "zlib"),
+            compact_ratio=float(os.getenv("CACHE_COMPACT_RATIO", "0.5")),
+            refresh_interval=float(refresh_interval if refresh_interval is not None
+                                   else os.getenv("CACHE_REFRESH_SECONDS", "1.0"))
+        )
+
+        self._lock = threading.Lock()
+
+        # Nível em memória: chave -> (resposta, instante de gravação)
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+        # Índice do disco em ordem LRU: chave -> (tamanho em bytes, instante de gravação)
+        self._index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._disk_bytes = 0
+
+        # Contadores
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._load_index()
+
+    @staticmethod
+    def _setting(value: Optional[int], env_name: str, default: int) -> int:
+        """Resolve um limite a partir do argumento ou da variável de ambiente"""
+        if value is not None:
+            return int(value)
+        return int(os.getenv(env_name, str(default)))
+
+    def get_cache_key(self, prompt: str) -> str:
+        """Gera uma chave de cache baseada no prompt"""
+        return hashlib.md5(prompt.encode()).hexdigest()
+
+    def get_from_cache(self, key: str) -> Optional[str]:
+        """Recupera resposta do cache se existir"""
+        deleted: List[str] = []
+        try:
+            return self._lookup(key, deleted)
+        finally:
+            # Remoções do disco fora do lock, como as gravações
+            self._delete(deleted)
+
+    def _lookup(self, key: str, deleted: List[str]) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_expired(entry[1], now):
+                    self._drop(key, deleted)
+                    self.expirations += 1
+                    self.misses += 1
+                    return None
+                self._memory.move_to_end(key)
+                if key in self._index:
+                    self._index.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+            meta = self._index.get(key)
+            if meta is not None and self._is_expired(meta[1], now):
+                self._drop(key, deleted)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+        # Leitura do disco fora do lock para não serializar as threads; uma
+        # chave fora do índice pode ter sido gravada por outro processo
+        try:
+            data = self.store.get(key)
+            response = data.decode('utf-8') if data is not None else None
+        except Exception:
+            response = None
+
+        with self._lock:
+            if response is None:
+                if meta is not None:
+                    # Entrada removida por outro processo ou corrompida
+                    self._drop(key, deleted)
+                self.misses += 1
+                return None
+            if meta is None:
+                meta = self._adopt(key, deleted)
+                if self._is_expired(meta[1], now):
+                    self._drop(key, deleted)
+                    self.expirations += 1
+                    self.misses += 1
+                    return None
+            if key in self._index:
+                self._index.move_to_end(key)
+            self._remember(key, response, meta[1])
+            self.disk_hits += 1
+            return response
+
+    def save_to_cache(self, key: str, response: str) -> None:
+        """Salva resposta no cache"""
+        now = time.time()
+        try:
+            size = self.store.put(key, response.encode('utf-8'), written_at=now)
+        except Exception:
+            return
+
+        deleted: List[str] = []
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous[0]
+            self._index[key] = (size, now)
+            self._disk_bytes += size
+            self._remember(key, response, now)
+            self._evict_disk(deleted)
+        self._delete(deleted)
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores de acertos, falhas e remoções do cache"""
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'hits': self.memory_hits + self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'memory_entries': len(self._memory),
+                'disk_entries': len(self._index),
+                'disk_bytes': self._disk_bytes
+            }
+
+    def _adopt(self, key: str, deleted: List[str]) -> Tuple[int, float]:
+        """Inclui no índice uma chave gravada por outro processo"""
+        meta = self.store.meta(key) or (0, time.time())
+        self._index[key] = meta
+        self._disk_bytes += meta[0]
+        self._evict_disk(deleted)
+        return meta
+
+    def _is_expired(self, written_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - written_at > self.ttl
+
+    def _remember(self, key: str, response: str, written_at: float) -> None:
+        """Insere no nível em memória respeitando o limite de entradas"""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (response, written_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _drop(self, key: str, deleted: List[str]) -> None:
+        """Remove uma entrada dos dois níveis; a chave vai para ``deleted`` se está no disco"""
+        self._memory.pop(key, None)
+        meta = self._index.pop(key, None)
+        if meta is not None:
+            self._disk_bytes -= meta[0]
+            deleted.append(key)
+
+    def _delete(self, keys: List[str]) -> None:
+        """Remove as entradas do disco; chamado sem o lock"""
+        for key in keys:
+            try:
+                self.store.delete(key)
+            except OSError:
+                pass
+
+    def _evict_disk(self, deleted: List[str]) -> None:
+        """Remove as entradas menos usadas até respeitar os limites do disco"""
+        while self._index and (
+            (self.max_entries > 0 and len(self._index) > self.max_entries) or
+            (self.max_bytes > 0 and self._disk_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._index))
+            self._drop(key, deleted)
+            self.evictions += 1
+
+    def _load_index(self) -> None:
+        """Reconstrói o índice do disco, migrando arquivos do layout antigo"""
+        self._migrate_files()
+        now = time.time()
+
+        # Sem registro de acesso persistido, a ordem LRU inicial segue a data de gravação
+        for key, size, written_at in sorted(self.store.items(), key=lambda item: item[2]):
+            if self._is_expired(written_at, now):
+                self.store.delete(key)
+                continue
+            self._index[key] = (size, written_at)
+            self._disk_bytes += size
+
+        deleted: List[str] = []
+        self._evict_disk(deleted)
+        self._delete(deleted)
+
+    def _migrate_files(self) -> None:
+        """Move para o store as entradas gravadas como um arquivo JSON por chave"""
+        legacy = []
+        try:
+            with os.scandir(self.cache_dir) as root:
+                for entry in root:
+                    if entry.is_file() and entry.name.endswith('.json'):
+                        legacy.append(Path(entry.path))
+                    elif entry.is_dir() and len(entry.name) == 2:
+                        with os.scandir(entry.path) as shard:
+                            legacy.extend(
+                                Path(item.path) for item in shard
+                                if item.name.endswith('.json') and not item.name.startswith('.')
+                            )
+        except OSError:
+            return
+
+        for path in legacy:
+            try:
+                written_at = path.stat().st_mtime
+                with open(path, 'r', encoding='utf-8') as f:
+                    response = json.load(f).get('response')
+                if response is not None:
+                    self.store.put(path.name[:-5], response.encode('utf-8'), written_at=written_at)
+                path.unlink()
+            except (OSError, ValueError, AttributeError):
+                continue
+
+        for path in {path.parent for path in legacy if path.parent != self.cache_dir}:
+            try:
+                path.rmdir()
+            except OSError:
+                pass
@@ -0,0 +1,285 @@
+# model/chunker.py
+import re
+import math
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Dependência opcional: sem ela os tokens são estimados
+    tiktoken = None
+
+# Cabeçalhos de arquivo usados pelos agentes ao montar prompts
+FILE_HEADER = re.compile(r'^(?:\s*Arquivo:\s*(?P<path>\S.*?)|\[(?P<bracket>[^\]\n]+)\])\s*$')
+FENCE = re.compile(r'^\s*```')
+
+def content_hash(text: str) -> str:
+    """Hash do conteúdo, usado como endereço de segmentos e partes"""
+    return hashlib.sha256(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+@dataclass
+class Segment:
+    """Trecho contínuo de um prompt: um arquivo completo ou texto livre"""
+    kind: str
+    text: str
+    path: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """Endereço do segmento pelo seu conteúdo"""
+        return content_hash(self.text)
+
+class TokenCounter:
+    """Conta tokens com o tokenizer do modelo ou, sem tiktoken, por estimativa"""
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model_name)
+            except Exception:
+                try:
+                    self.encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    # Sem acesso aos arquivos do tokenizer
+                    self.encoding = None
+
+    @property
+    def exact(self) -> bool:
+        """Indica se a contagem usa o tokenizer real do modelo"""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        """Retorna o número de tokens do texto"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / self.CHARS_PER_TOKEN)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Divide o texto em pedaços de no máximo max_tokens tokens"""
+        max_tokens = max(1, max_tokens)
+        if self.encoding is not None:
+            ids = self.encoding.encode(text, disallowed_special=())
+            return [self.encoding.decode(ids[i:i + max_tokens]) for i in range(0, len(ids), max_tokens)]
+        step = max_tokens * self.CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+def split_segments(text: str) -> List[Segment]:
+    """Separa o prompt em blocos de arquivo e trechos de texto livre
+
+    Um bloco de arquivo começa em um cabeçalho (``Arquivo: caminho`` ou
+    ``[caminho]`` seguido imediatamente de um bloco de código) e termina no
+    fechamento do seu bloco de código. Linhas ``[...]`` sem bloco de código
+    logo abaixo, como os exemplos de formato das instruções, são texto livre.
+    Blocos de código soltos também nunca são cortados ao meio.
+    """
+    segments: List[Segment] = []
+    buffer: List[str] = []
+    kind = 'text'
+    path = None
+    in_fence = False
+
+    def flush():
+        nonlocal buffer, kind, path
+        if buffer:
+            segments.append(Segment(kind, "".join(buffer), path))
+        buffer, kind, path = [], 'text', None
+
+    lines = text.splitlines(keepends=True)
+    for index, line in enumerate(lines):
+        if in_fence:
+            buffer.append(line)
+            if FENCE.match(line):
+                in_fence = False
+                if kind in ('file', 'code'):
+                    flush()
+            continue
+
+        header = FILE_HEADER.match(line)
+        if header and header.group('bracket') is not None and not (
+                index + 1 < len(lines) and FENCE.match(lines[index + 1])):
+            header = None
+        if header:
+            flush()
+            kind = 'file'
+            path = (header.group('path') or header.group('bracket')).strip()
+            buffer.append(line)
+            continue
+
+        if FENCE.match(line):
+            if kind == 'text':
+                flush()
+                kind = 'code'
+            buffer.append(line)
+            in_fence = True
+            continue
+
+        buffer.append(line)
+
+    flush()
+
+    # Blocos de código soltos fazem parte do texto livre, mas sem cortes internos
+    for segment in segments:
+        if segment.kind == 'code':
+            segment.kind = 'text'
+    return segments
+
+class PromptChunker:
+    """Divide prompts grandes em partes que cabem exatamente no limite de tokens"""
+
+    def __init__(self, counter: TokenCounter, max_tokens: int, reserved_tokens: int = 0):
+        self.counter = counter
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+
+    @property
+    def budget(self) -> int:
+        """Tokens disponíveis para o conteúdo de uma mensagem"""
+        return max(1, self.max_tokens - self.reserved_tokens)
+
+    def fits(self, text: str) -> bool:
+        """Verifica se o texto cabe em uma única chamada"""
+        return self.counter.count(text) <= self.budget
+
+    def split_groups(self, prompt: str, template_tokens: int,
+                     group_size: int = 0) -> Tuple[str, List[List[Segment]]]:
+        """Separa o prompt em instruções e nos segmentos de cada parte de conteúdo
+
+        As instruções (texto fora dos blocos de arquivo) acompanham cada parte;
+        ``template_tokens`` é o custo do modelo de prompt que envolve as duas.
+        Se as instruções forem grandes demais, todo o prompt vira conteúdo e
+        apenas o seu início é usado como instrução. As partes são formadas por
+        ``group`` (o texto de cada uma vem de ``join``).
+        """
+        segments = split_segments(prompt)
+        instructions = "".join(s.text for s in segments if s.kind == 'text').strip()
+        content = [s for s in segments if s.kind == 'file']
+
+        available = self.budget - template_tokens
+        if not content or self.counter.count(instructions) > available // 2:
+            content = segments
+            instructions = self.truncate(instructions or prompt, available // 4)
+
+        budget = available - self.counter.count(instructions)
+        return instructions, self.group(content, budget, group_size)
+
+    def group(self, segments: List[Segment], budget: int, group_size: int = 0) -> List[List[Segment]]:
+        """Agrupa segmentos em ordem em partes dentro do limite de tokens
+
+        Sem ``group_size``, as partes são empacotadas de forma gulosa, no
+        menor número possível. Com ``group_size`` maior que zero, as fronteiras
+        são definidas pelo conteúdo: uma parte termina após um segmento cujo
+        hash é múltiplo de ``group_size`` (em média, uma parte a cada
+        ``group_size`` arquivos) ou quando o limite seria excedido. Como a
+        fronteira depende apenas do próprio segmento, editar um arquivo altera
+        somente a sua parte, e as demais continuam com o mesmo conteúdo e o
+        mesmo endereço.
+        """
+        if group_size <= 0:
+            return self._group(segments, budget)
+        return self._group(
+            segments, budget,
+            boundary=lambda segment: int(segment.digest[:8], 16) % group_size == 0
+        )
+
+    @staticmethod
+    def join(group: List[Segment]) -> str:
+        """Texto de uma parte"""
+        return "".join(segment.text for segment in group)
+
+    def _group(self, segments: List[Segment], budget: int,
+               boundary: Optional[Callable[[Segment], bool]] = None) -> List[List[Segment]]:
+        budget = max(1, budget)
+        groups: List[List[Segment]] = []
+        current: List[Segment] = []
+        current_tokens = 0
+
+        for segment in segments:
+            for text in self._fit_segment(segment, budget):
+                piece = Segment(segment.kind, text, segment.path)
+                tokens = self.counter.count(text)
+                if current and current_tokens + tokens > budget:
+                    groups.extend(self._close(current, budget))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += tokens
+                if boundary is not None and piece.kind == 'file' and boundary(piece):
+                    groups.extend(self._close(current, budget))
+                    current, current_tokens = [], 0
+
+        if current:
+            groups.extend(self._close(current, budget))
+        return groups
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Corta o texto no limite de tokens"""
+        if self.counter.count(text) <= max_tokens:
+            return text
+        pieces = self.counter.split(text, max(1, max_tokens))
+        return pieces[0] if pieces else ""
+
+    def _close(self, pieces: List[Segment], budget: int) -> List[List[Segment]]:
+        """Confere a contagem real da parte montada e a divide se necessário
+
+        Somar contagens de pedaços é apenas uma aproximação para tokenizers
+        BPE; a parte final é sempre recontada para garantir o limite.
+        """
+        if len(pieces) == 1 or self.counter.count(self.join(pieces)) <= budget:
+            return [pieces]
+        middle = len(pieces) // 2
+        return self._close(pieces[:middle], budget) + self._close(pieces[middle:], budget)
+
+    def _fit_segment(self, segment: Segment, budget: int) -> List[str]:
+        """Divide um segmento maior que o limite em pedaços por linha"""
+        if self.counter.count(segment.text) <= budget:
+            return [segment.text]
+
+        lines = segment.text.splitlines(keepends=True)
+        prefix = ""
+        suffix = ""
+        if segment.kind == 'file':
+            # Preservar cabeçalho e abertura do bloco de código em cada pedaço
+            fence_index = next((i for i, line in enumerate(lines) if FENCE.match(line)), None)
+            if fence_index is not None:
+                prefix = "".join(lines[:fence_index + 1])
+                lines = lines[fence_index + 1:]
+                if lines and FENCE.match(lines[-1]):
+                    lines = lines[:-1]
+                suffix = "```\n"
+
+        # Um token extra para a quebra de linha antes do fechamento do bloco
+        overhead = self.counter.count(prefix) + self.counter.count(suffix) + (1 if suffix else 0)
+        room = max(1, budget - overhead)
+        pieces: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for line in lines:
+            line_tokens = self.counter.count(line)
+            if line_tokens > room:
+                chunks = self.counter.split(line, room)
+            else:
+                chunks = [line]
+            for chunk in chunks:
+                tokens = self.counter.count(chunk)
+                if current and current_tokens + tokens > room:
+                    pieces.append(self._wrap(prefix, current, suffix))
+                    current, current_tokens = [], 0
+                current.append(chunk)
+                current_tokens += tokens
+
+        if current:
+            pieces.append(self._wrap(prefix, current, suffix))
+        return pieces
+
+    @staticmethod
+    def _wrap(prefix: str, lines: List[str], suffix: str) -> str:
+        body = "".join(lines)
+        if suffix and not body.endswith("\n"):
+            body += "\n"
+        return prefix + body + suffix
@@ -0,0 +1,254 @@
+# model/clients.py
+import os
+import json
+import logging
+import importlib
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+import openai
+from openai.util import convert_to_openai_object
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+
+logger = logging.getLogger(__name__)
+
+class ModelClient:
+    """Interface dos clientes do endpoint de chat
+
+    ``create`` recebe os mesmos parâmetros de ``openai.ChatCompletion.create``
+    e retorna objetos no mesmo formato (``choices[0].message.content`` ou,
+    com ``stream=True``, um iterador de partes com ``choices[0].delta``).
+    Falhas são levantadas como exceções de ``openai.error``, de modo que o
+    tratamento de limite de taxa e de novas tentativas não depende do cliente.
+    """
+
+    def create(self, messages: List[Dict[str, str]], stream: bool = False,
+               timeout: Optional[float] = None, **params) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera as conexões mantidas pelo cliente"""
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    def __enter__(self) -> "ModelClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class HTTPModelClient(ModelClient):
+    """Cliente HTTP com pool de conexões persistentes (keep-alive)
+
+    As chamadas reutilizam conexões abertas em vez de negociar TCP e TLS a
+    cada requisição. ``max_connections`` limita as conexões simultâneas (as
+    chamadas excedentes aguardam uma conexão livre até ``pool_timeout``) e
+    ``max_keepalive`` quantas ficam abertas entre as chamadas.
+    """
+
+    def __init__(self, api_key: str, api_base: Optional[str] = None,
+                 organization: Optional[str] = None,
+                 max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0, timeout: float = 60.0,
+                 connect_timeout: float = 10.0, pool_timeout: float = 30.0,
+                 transport: Optional[httpx.BaseTransport] = None):
+        headers = {'Authorization': f"Bearer {api_key}"}
+        if organization:
+            headers['OpenAI-Organization'] = organization
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout)
+        self._client = httpx.Client(
+            base_url=(api_base or DEFAULT_API_BASE).rstrip('/') + '/',
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=self.timeout,
+            transport=transport
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def create(self, messages: List[Dict[str, str]], stream: bool = False,
+               timeout: Optional[float] = None, **params) -> Any:
+        payload = dict(params, messages=messages)
+        if stream:
+            payload['stream'] = True
+            return self._stream(payload, timeout)
+
+        response = self._send(payload, timeout)
+        try:
+            body = response.json()
+        except ValueError as e:
+            raise openai.error.APIError(
+                f"Resposta inválida da API: {response.text[:200]}", response.text, response.status_code
+            ) from e
+        return convert_to_openai_object(body)
+
+    def _send(self, payload: Dict, timeout: Optional[float], stream: bool = False) -> httpx.Response:
+        """Envia a requisição pelo pool e converte falhas em exceções da API"""
+        request = self._client.build_request(
+            'POST', 'chat/completions', json=payload,
+            timeout=self._timeout(timeout),
+            extensions={'trace': self._trace}
+        )
+        try:
+            response = self._client.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            raise openai.error.Timeout(f"Tempo esgotado na chamada à API: {str(e)}") from e
+        except httpx.TransportError as e:
+            raise openai.error.APIConnectionError(f"Erro de conexão com a API: {str(e)}") from e
+
+        with self._lock:
+            self.requests += 1
+        if response.status_code != 200:
+            if stream:
+                response.read()
+                response.close()
+            raise self._error(response)
+        return response
+
+    def _stream(self, payload: Dict, timeout: Optional[float]) -> Iterator[Any]:
+        """Lê a resposta transmitida (SSE); a conexão volta ao pool ao final"""
+        response = self._send(payload, timeout, stream=True)
+        try:
+            for line in response.iter_lines():
+                if not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                if 'error' in chunk:
+                    raise openai.error.APIError(
+                        chunk['error'].get('message'), data, response.status_code, chunk
+                    )
+                yield convert_to_openai_object(chunk)
+        except httpx.TimeoutException as e:
+            raise openai.error.Timeout(f"Tempo esgotado na transmissão: {str(e)}") from e
+        except httpx.TransportError as e:
+            raise openai.error.APIConnectionError(f"Erro de conexão na transmissão: {str(e)}") from e
+        finally:
+            response.close()
+
+    def _timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        if timeout is None:
+            return self.timeout
+        return httpx.Timeout(timeout, connect=self.timeout.connect, pool=self.timeout.pool)
+
+    def _trace(self, event: str, info: Dict) -> None:
+        """Conta as conexões abertas, para verificar a reutilização do pool"""
+        if event == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.connections += 1
+
+    @staticmethod
+    def _error(response: httpx.Response) -> openai.error.OpenAIError:
+        """Converte uma resposta de erro na exceção equivalente do SDK"""
+        body = response.text
+        try:
+            json_body = response.json()
+            error = json_body['error']
+            message = error.get('message')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            json_body, error, message = None, {}, body[:200]
+        headers = dict(response.headers)
+        status = response.status_code
+
+        if status == 429:
+            return openai.error.RateLimitError(message, body, status, json_body, headers)
+        if status in (400, 404, 415):
+            return openai.error.InvalidRequestError(
+                message, error.get('param'), error.get('code'), body, status, json_body, headers
+            )
+        if status == 401:
+            return openai.error.AuthenticationError(message, body, status, json_body, headers)
+        if status == 403:
+            return openai.error.PermissionError(message, body, status, json_body, headers)
+        if status == 409:
+            return openai.error.TryAgain(message, body, status, json_body, headers)
+        if status == 503:
+            return openai.error.ServiceUnavailableError(message, body, status, json_body, headers)
+        return openai.error.APIError(f"{message} (HTTP {status})", body, status, json_body, headers)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'requests': self.requests, 'connections': self.connections}
+
+    def close(self) -> None:
+        self._client.close()
+
+class OpenAISDKClient(ModelClient):
+    """Cliente que delega ao SDK da OpenAI (openai.ChatCompletion)
+
+    As credenciais são passadas a cada chamada em vez de configuradas nas
+    variáveis globais do módulo ``openai``.
+    """
+
+    def __init__(self, api_key: str, api_base: Optional[str] = None,
+                 organization: Optional[str] = None, timeout: float = 60.0, **_):
+        self.api_key = api_key
+        self.api_base = api_base
+        self.organization = organization
+        self.timeout = timeout
+
+    def create(self, messages: List[Dict[str, str]], stream: bool = False,
+               timeout: Optional[float] = None, **params) -> Any:
+        if self.api_base:
+            params['api_base'] = self.api_base
+        if self.organization:
+            params['organization'] = self.organization
+        return openai.ChatCompletion.create(
+            api_key=self.api_key,
+            messages=messages,
+            stream=stream,
+            request_timeout=timeout or self.timeout,
+            **params
+        )
+
+# Backends disponíveis em MODEL_CLIENT; outros podem ser indicados como "pacote.modulo:Classe"
+BACKENDS = {
+    'http': HTTPModelClient,
+    'openai': OpenAISDKClient
+}
+
+def create_client(backend: Optional[str] = None, **options) -> ModelClient:
+    """Cria o cliente do backend indicado, com a configuração das variáveis de ambiente
+
+    Variáveis:
+        MODEL_CLIENT: backend ("http", "openai" ou "pacote.modulo:Classe")
+        MODEL_POOL_CONNECTIONS / MODEL_POOL_KEEPALIVE: limites do pool de conexões
+        MODEL_KEEPALIVE_EXPIRY: segundos que uma conexão ociosa fica aberta
+        MODEL_TIMEOUT / MODEL_CONNECT_TIMEOUT / MODEL_POOL_TIMEOUT: tempos limite em segundos
+    """
+    backend = backend or os.getenv("MODEL_CLIENT", "http")
+    if backend in BACKENDS:
+        cls = BACKENDS[backend]
+    elif ':' in backend:
+        module_name, _, class_name = backend.partition(':')
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Backend de modelo inválido: {backend}") from e
+    else:
+        raise ValueError(f"Backend de modelo desconhecido: {backend}")
+
+    settings = {
+        'api_key': os.getenv("OPENAI_API_KEY"),
+        'api_base': os.getenv("OPENAI_API_BASE"),
+        'organization': os.getenv("OPENAI_ORGANIZATION"),
+        'max_connections': int(os.getenv("MODEL_POOL_CONNECTIONS", "20")),
+        'max_keepalive': int(os.getenv("MODEL_POOL_KEEPALIVE", "10")),
+        'keepalive_expiry': float(os.getenv("MODEL_KEEPALIVE_EXPIRY", "30")),
+        'timeout': float(os.getenv("MODEL_TIMEOUT", "60")),
+        'connect_timeout': float(os.getenv("MODEL_CONNECT_TIMEOUT", "10")),
+        'pool_timeout': float(os.getenv("MODEL_POOL_TIMEOUT", "30"))
+    }
+    settings.update(options)
+    logger.debug(f"Cliente do modelo: {cls.__name__}")
+    return cls(**settings)
@@ -0,0 +1,231 @@
+# model/packer.py
+import os
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from indexing.blob_store import BLOBS, BlobStore
+from indexing.outline import cached_outline
+from indexing.reader import FileContent
+
+from .chunker import TokenCounter
+from .metrics import REGISTRY, current_agent
+from .transformer_model import MESSAGE_OVERHEAD_TOKENS, SYSTEM_PROMPT
+
+# Fração da relevância de um arquivo preservada por cada forma de renderização
+MODE_VALUES = {'full': 1.0, 'head_tail': 0.5, 'outline': 0.4}
+
+# Parte do recorte início/fim usada pelo início do arquivo
+HEAD_FRACTION = 0.75
+
+PACKED_FILES = REGISTRY.counter(
+    'prompt_packed_files_total', 'Arquivos incluídos nos prompts, por forma de renderização', ['agent', 'mode']
+)
+
+@dataclass(frozen=True)
+class PackItem:
+    """Arquivo candidato ao prompt
+
+    ``overhead`` é o custo em tokens do bloco sem o conteúdo (cabeçalho e
+    cercas de código); ``outlined`` indica que ``text`` já é um resumo.
+    """
+    path: str
+    text: str
+    score: float = 0.0
+    overhead: int = 0
+    outlined: bool = False
+
+@dataclass(frozen=True)
+class PackedFile:
+    """Forma escolhida para um arquivo: 'full', 'outline', 'head_tail' ou 'omitted'"""
+    item: PackItem
+    mode: str
+    text: Optional[str]
+    tokens: int
+
+def head_tail(text: str, max_chars: int) -> str:
+    """Início e fim do texto em até ``max_chars`` caracteres, cortando em linhas"""
+    if len(text) <= max_chars:
+        return text
+    head = text[:int(max_chars * HEAD_FRACTION)]
+    tail = text[len(text) - (max_chars - len(head)):]
+    head = head[:head.rfind('\n') + 1] or head
+    cut = tail.find('\n')
+    if 0 <= cut < len(tail) - 1:
+        tail = tail[cut + 1:]
+    omitted = text.count('\n', len(head), len(text) - len(tail))
+    return f"{head}\n[... {omitted} linhas omitidas ...]\n\n{tail}"
+
+class PromptPacker:
+    """Escolhe quais arquivos entram no prompt, e em que forma, dentro do limite de tokens
+
+    Cada arquivo pode entrar completo, resumido (``indexing.outline``),
+    recortado em início e fim (``head_tail_tokens``) ou ficar de fora. O valor
+    de cada forma é a relevância do arquivo vezes ``MODE_VALUES``, e o
+    empacotamento maximiza a soma dos valores sem passar do orçamento
+    (mochila de múltipla escolha, resolvida pelas melhorias de maior valor
+    por token). As contagens de tokens ficam guardadas como artefatos do hash
+    do conteúdo, então arquivos que não mudaram não são contados de novo.
+    """
+
+    def __init__(self, counter: TokenCounter, max_tokens: int, reserved_tokens: int = 0,
+                 head_tail_tokens: int = 512, store: Optional[BlobStore] = None, enabled: bool = True):
+        self.counter = counter
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.head_tail_tokens = head_tail_tokens
+        self.store = store or BLOBS
+        self.enabled = enabled
+        self.logger = logging.getLogger(__name__)
+
+    def budget(self, template: str) -> int:
+        """Tokens disponíveis para os arquivos em um prompt com as instruções ``template``"""
+        return max(0, self.max_tokens - self.reserved_tokens - self.counter.count(template))
+
+    def tokens(self, text: str, kind: str = 'full') -> int:
+        """Tokens do texto, memorizados pelo hash do conteúdo"""
+        digest = self.store.put(text)
+        try:
+            return self.store.derived(digest, ('tokens', kind), self.counter.count)
+        except KeyError:
+            return self.counter.count(text)
+        finally:
+            self.store.release(digest)
+
+    def _options(self, item: PackItem, weight: float,
+                 full_tokens: int) -> List[Tuple[int, float, str, Callable[[], Optional[str]]]]:
+        """Formas possíveis do arquivo: (custo, valor, modo, renderização), da mais barata"""
+        options = [(0, 0.0, 'omitted', lambda: None)]
+        full_mode = 'outline' if item.outlined else 'full'
+        candidates = [(full_tokens, MODE_VALUES[full_mode], full_mode, lambda: item.text)]
+        if not item.outlined:
+            outline = cached_outline(item.path, item.text, self.store)
+            if outline is not None:
+                candidates.append((self.tokens(outline, 'outline'), MODE_VALUES['outline'], 'outline',
+                                   lambda: outline))
+        if full_tokens > self.head_tail_tokens:
+            chars = int(len(item.text) * self.head_tail_tokens / full_tokens)
+            sample = head_tail(item.text, chars)
+            candidates.append((self.counter.count(sample), MODE_VALUES['head_tail'], 'head_tail',
+                               lambda: sample))
+
+        # Só ficam as formas que valem mais do que todas as mais baratas
+        for cost, value, mode, render in sorted(candidates, key=lambda option: (option[0], -option[1])):
+            if value * weight > options[-1][1]:
+                options.append((cost + item.overhead, value * weight, mode, render))
+        return options
+
+    def pack(self, items: Sequence[PackItem], budget: Optional[int]) -> List[PackedFile]:
+        """Forma de cada arquivo (na ordem recebida) que maximiza a relevância no orçamento
+
+        Com ``budget`` None ou o empacotamento desativado, todos entram completos.
+        """
+        if budget is None or not self.enabled:
+            return [PackedFile(item, 'outline' if item.outlined else 'full', item.text, 0) for item in items]
+
+        full_tokens = [self.tokens(item.text) for item in items]
+        if sum(tokens + item.overhead for tokens, item in zip(full_tokens, items)) <= budget:
+            return [PackedFile(item, 'outline' if item.outlined else 'full', item.text, tokens + item.overhead)
+                    for item, tokens in zip(items, full_tokens)]
+
+        # A relevância soma um termo decrescente com a posição: sem pontuação
+        # (nenhum termo da solicitação), vale a ordem recebida
+        options = [self._options(item, item.score + 1.0 / (index + 1), tokens)
+                   for index, (item, tokens) in enumerate(zip(items, full_tokens))]
+        chosen = self._choose(options, budget)
+
+        packed = []
+        for item, choices, index in zip(items, options, chosen):
+            cost, _, mode, render = choices[index]
+            packed.append(PackedFile(item, mode, render(), cost))
+        self._report(packed, budget)
+        return packed
+
+    @staticmethod
+    def _hull(choices) -> List[int]:
+        """Índices das formas na envoltória convexa (valor por token decrescente)"""
+        hull = [0]
+        for index in range(1, len(choices)):
+            while len(hull) > 1:
+                a, b = choices[hull[-2]], choices[hull[-1]]
+                if (b[1] - a[1]) * (choices[index][0] - b[0]) <= (choices[index][1] - b[1]) * (b[0] - a[0]):
+                    hull.pop()
+                else:
+                    break
+            hull.append(index)
+        return hull
+
+    def _choose(self, options, budget: int) -> List[int]:
+        chosen = [0] * len(options)
+        upgrades = []
+        for item, choices in enumerate(options):
+            hull = self._hull(choices)
+            for step, (previous, current) in enumerate(zip(hull, hull[1:])):
+                extra = choices[current][0] - choices[previous][0]
+                gain = choices[current][1] - choices[previous][1]
+                upgrades.append((-gain / max(extra, 1), item, step, previous, current))
+        upgrades.sort()
+
+        remaining = budget
+        blocked = set()
+        for _, item, _, previous, current in upgrades:
+            if item in blocked or chosen[item] != previous:
+                continue
+            extra = options[item][current][0] - options[item][previous][0]
+            if extra > remaining:
+                blocked.add(item)
+                continue
+            chosen[item] = current
+            remaining -= extra
+
+        # O que sobrou do orçamento vai para a melhor forma que ainda cabe
+        for item in sorted(blocked, key=lambda index: -options[index][-1][1]):
+            current = options[item][chosen[item]]
+            for index in range(len(options[item]) - 1, chosen[item], -1):
+                extra = options[item][index][0] - current[0]
+                if extra <= remaining:
+                    chosen[item] = index
+                    remaining -= extra
+                    break
+        return chosen
+
+    def _report(self, packed: List[PackedFile], budget: int) -> None:
+        modes: Dict[str, int] = {}
+        for result in packed:
+            modes[result.mode] = modes.get(result.mode, 0) + 1
+            PACKED_FILES.inc(agent=current_agent(), mode=result.mode)
+        summary = ', '.join(f"{count} {mode}" for mode, count in sorted(modes.items()))
+        self.logger.info(
+            f"Empacotamento de {len(packed)} arquivos em {sum(result.tokens for result in packed)}"
+            f"/{budget} tokens: {summary}"
+        )
+
+# Empacotador padrão, com o mesmo limite de entrada do modelo (MAX_INPUT_TOKENS);
+# PROMPT_PACKING=0 desativa e PACK_HEAD_TAIL_TOKENS define o tamanho do recorte
+_counter = TokenCounter(os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"))
+PACKER = PromptPacker(
+    _counter,
+    int(os.getenv("MAX_INPUT_TOKENS", "4000")),
+    reserved_tokens=_counter.count(SYSTEM_PROMPT) + MESSAGE_OVERHEAD_TOKENS,
+    head_tail_tokens=int(os.getenv("PACK_HEAD_TAIL_TOKENS", "512")),
+    enabled=os.getenv("PROMPT_PACKING", "1") != "0"
+)
+
+def pack_files(files: Sequence[Tuple[Dict, FileContent]], template: Optional[str],
+               block: Callable[[Dict, str], str]) -> str:
+    """Blocos dos arquivos lidos que cabem no prompt cujas instruções são ``template``
+
+    ``files`` vem na ordem de relevância (a chave 'relevance', se houver, é a
+    pontuação da busca) e ``block`` formata um arquivo com o conteúdo
+    escolhido. Sem ``template``, todos os arquivos entram completos.
+    """
+    items = [
+        PackItem(file_info['path'], content.text, file_info.get('relevance', 0.0),
+                 PACKER.counter.count(block(file_info, '')), content.outlined)
+        for file_info, content in files
+    ]
+    budget = PACKER.budget(template) if template is not None else None
+    return "".join(
+        block(file_info, result.text)
+        for (file_info, _), result in zip(files, PACKER.pack(items, budget)) if result.text is not None
+    )
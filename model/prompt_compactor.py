@@ -0,0 +1,318 @@
+# model/prompt_compactor.py
+import io
+import re
+import json
+import tokenize
+import textwrap
+import threading
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .chunker import FENCE, Segment, TokenCounter, split_segments
+
+# Uma etapa recebe o texto e a família de linguagem do conteúdo (None para o
+# texto livre do prompt) e retorna o texto compactado
+CompactionPass = Callable[[str, Optional[str]], str]
+
+# Família de sintaxe de comentários por extensão de arquivo
+EXTENSION_LANGUAGES = {
+    '.py': 'python', '.pyi': 'python', '.pyw': 'python',
+    '.js': 'c', '.jsx': 'c', '.mjs': 'c', '.cjs': 'c', '.ts': 'c', '.tsx': 'c',
+    '.java': 'c', '.kt': 'c', '.scala': 'c', '.swift': 'c', '.dart': 'c',
+    '.c': 'c', '.h': 'c', '.cc': 'c', '.cpp': 'c', '.hpp': 'c', '.cs': 'c',
+    '.go': 'c', '.rs': 'c', '.php': 'c',
+    '.css': 'css', '.scss': 'css', '.sass': 'css', '.less': 'css',
+    '.html': 'markup', '.htm': 'markup', '.xml': 'markup', '.svg': 'markup',
+    '.vue': 'markup', '.svelte': 'markup', '.md': 'markup',
+    '.sh': 'hash', '.bash': 'hash', '.zsh': 'hash', '.rb': 'hash', '.pl': 'hash', '.r': 'hash',
+    '.yml': 'hash', '.yaml': 'hash', '.toml': 'hash', '.ini': 'hash', '.cfg': 'hash',
+    '.conf': 'hash', '.env': 'hash',
+    '.sql': 'dash', '.lua': 'dash', '.hs': 'dash',
+    '.json': 'json'
+}
+
+# Arquivos sem extensão reconhecidos pelo nome
+FILENAME_LANGUAGES = {
+    'dockerfile': 'hash', 'makefile': 'hash', 'procfile': 'hash', '.gitignore': 'hash',
+    'requirements.txt': 'hash'
+}
+
+# Família por marcador do bloco de código (```python), quando o caminho não basta
+FENCE_LANGUAGES = {
+    'python': 'python', 'py': 'python',
+    'javascript': 'c', 'js': 'c', 'typescript': 'c', 'ts': 'c', 'jsx': 'c', 'tsx': 'c',
+    'java': 'c', 'go': 'c', 'rust': 'c', 'c#': 'c', 'csharp': 'c', 'php': 'c', 'c': 'c', 'cpp': 'c',
+    'css': 'css', 'scss': 'css',
+    'html': 'markup', 'xml': 'markup', 'markdown': 'markup',
+    'yaml': 'hash', 'shell': 'hash', 'bash': 'hash', 'sh': 'hash', 'ruby': 'hash',
+    'dockerfile': 'hash', 'toml': 'hash',
+    'sql': 'dash', 'json': 'json'
+}
+
+# Arquivos com linhas médias acima deste tamanho são tratados como minificados
+MINIFIED_LINE_LENGTH = 500
+MINIFIED_MIN_CHARS = 2000
+
+def language_for(path: Optional[str], fence_tag: str = "") -> Optional[str]:
+    """Família de linguagem de um arquivo pelo caminho ou pelo marcador do bloco"""
+    if path:
+        name = PurePosixPath(path.replace('\\', '/')).name.lower()
+        if name in FILENAME_LANGUAGES:
+            return FILENAME_LANGUAGES[name]
+        language = EXTENSION_LANGUAGES.get(PurePosixPath(name).suffix)
+        if language:
+            return language
+    return FENCE_LANGUAGES.get(fence_tag.strip().lower()) or 'plain'
+
+def dedent_text(text: str, language: Optional[str]) -> str:
+    """Remove a indentação comum de cada parágrafo do texto livre
+
+    Os templates dos agentes são f-strings indentadas junto com o código;
+    cada bloco de linhas não vazias perde a indentação que tem em comum,
+    preservando a estrutura relativa (como listas aninhadas).
+    """
+    if language is not None:
+        return text
+    paragraphs = re.split(r'(\n[ \t]*\n)', text)
+    return "".join(
+        part if i % 2 else textwrap.dedent(part)
+        for i, part in enumerate(paragraphs)
+    )
+
+def collapse_whitespace(text: str, language: Optional[str]) -> str:
+    """Remove espaços no fim das linhas e sequências de linhas em branco
+
+    No texto livre, espaços repetidos dentro das linhas também são reduzidos;
+    no código, a indentação é mantida. JSON válido é reescrito sem espaços.
+    """
+    if language == 'json':
+        try:
+            return json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':')) + "\n"
+        except ValueError:
+            pass
+
+    lines = []
+    blank = False
+    for line in text.splitlines():
+        line = line.rstrip()
+        if language is None:
+            indent = len(line) - len(line.lstrip())
+            line = line[:indent] + re.sub(r'[ \t]{2,}', ' ', line[indent:])
+        if not line:
+            if blank or not lines:
+                continue
+            blank = True
+        else:
+            blank = False
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    if not lines:
+        return ""
+    return "\n".join(lines) + ("\n" if text.endswith("\n") or language is not None else "")
+
+def omit_minified(text: str, language: Optional[str]) -> str:
+    """Substitui conteúdo minificado, sem valor para a análise, por um aviso"""
+    if language is None or len(text) < MINIFIED_MIN_CHARS:
+        return text
+    lines = text.count("\n") + 1
+    if len(text) / lines < MINIFIED_LINE_LENGTH:
+        return text
+    return f"[conteúdo minificado omitido: {len(text.strip())} caracteres]\n"
+
+def remove_comments(text: str, language: Optional[str]) -> str:
+    """Remove comentários (e docstrings, em Python) conforme a linguagem"""
+    if language == 'python':
+        return _strip_python(text)
+    if language == 'c':
+        return _strip_c_like(text, line_comments=True)
+    if language == 'css':
+        return _strip_c_like(text, line_comments=False)
+    if language == 'markup':
+        return re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
+    if language == 'hash':
+        return _strip_full_line(text, '#')
+    if language == 'dash':
+        return _strip_full_line(text, '--')
+    return text
+
+def _strip_full_line(text: str, marker: str) -> str:
+    """Remove linhas que contêm apenas um comentário (mantendo o shebang)"""
+    lines = text.splitlines(keepends=True)
+    return "".join(
+        line for i, line in enumerate(lines)
+        if not line.lstrip().startswith(marker) or (i == 0 and line.startswith('#!'))
+    )
+
+def _strip_c_like(text: str, line_comments: bool) -> str:
+    """Remove comentários /* */ (e //) fora de strings"""
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        char = text[i]
+        if char in '"\'`':
+            # Aspas simples e duplas não atravessam linhas (evita apóstrofos em texto)
+            end = i + 1
+            while end < n and text[end] != char and (char == '`' or text[end] != "\n"):
+                end += 2 if text[end] == '\\' else 1
+            out.append(text[i:end + 1])
+            i = end + 1
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+        elif line_comments and text.startswith('//', i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+        else:
+            out.append(char)
+            i += 1
+    return _drop_emptied_lines(text, "".join(out))
+
+def _drop_emptied_lines(original: str, stripped: str) -> str:
+    """Remove as linhas que ficaram vazias só pela retirada de comentários"""
+    if original.count("\n") != stripped.count("\n"):
+        # Comentários de várias linhas mudam a contagem; linhas em branco são
+        # reduzidas depois por collapse_whitespace
+        return stripped
+    return "".join(
+        line for line, before in zip(stripped.splitlines(keepends=True), original.splitlines(keepends=True))
+        if line.strip() or not before.strip()
+    )
+
+def _strip_python(text: str) -> str:
+    """Remove comentários e docstrings de código Python usando o tokenizador"""
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Trecho incompleto ou inválido: retirar apenas linhas de comentário
+        return _strip_full_line(text, '#')
+
+    structural = (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT)
+    significant = [tok for tok in tokens if tok.type not in (tokenize.NL, tokenize.COMMENT)]
+    drop_rows = set()
+    cut_at: Dict[int, int] = {}
+
+    for tok in tokens:
+        if tok.type == tokenize.COMMENT and not (tok.start[0] == 1 and tok.string.startswith('#!')):
+            cut_at[tok.start[0]] = tok.start[1]
+
+    for i, tok in enumerate(significant):
+        if tok.type != tokenize.STRING:
+            continue
+        before = significant[i - 1].type if i else tokenize.NEWLINE
+        after = significant[i + 1].type if i + 1 < len(significant) else tokenize.ENDMARKER
+        if before not in structural or after not in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            continue
+        # Uma string que é o corpo inteiro do bloco fica, para o código continuar válido
+        following = significant[i + 2].type if i + 2 < len(significant) else tokenize.ENDMARKER
+        if before == tokenize.INDENT and following in (tokenize.DEDENT, tokenize.ENDMARKER):
+            continue
+        drop_rows.update(range(tok.start[0], tok.end[0] + 1))
+
+    lines = []
+    for row, line in enumerate(text.splitlines(keepends=True), start=1):
+        if row in drop_rows:
+            continue
+        if row in cut_at:
+            kept = line[:cut_at[row]].rstrip()
+            if not kept:
+                continue
+            line = kept + "\n"
+        lines.append(line)
+    return "".join(lines)
+
+@dataclass
+class CompactionResult:
+    """Prompt compactado e a economia obtida"""
+    text: str
+    original_tokens: int
+    compacted_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+class PromptCompactor:
+    """Reduz os tokens de entrada de um prompt antes do envio ao modelo
+
+    O prompt é separado em texto livre e blocos de arquivo (ver
+    chunker.split_segments). Cada etapa é aplicada ao texto livre e ao
+    conteúdo de cada bloco de código com a família de linguagem do arquivo;
+    cabeçalhos e marcadores dos blocos são preservados, assim como a
+    divisão em partes do map-reduce.
+
+    ``passes`` substitui a sequência padrão (dedent, omissão de conteúdo
+    minificado, remoção opcional de comentários e compactação de espaços).
+    """
+
+    def __init__(self, counter: Optional[TokenCounter] = None, strip_comments: bool = False,
+                 passes: Optional[Sequence[CompactionPass]] = None):
+        self.counter = counter or TokenCounter()
+        if passes is None:
+            passes = [dedent_text, omit_minified]
+            if strip_comments:
+                passes.append(remove_comments)
+            passes.append(collapse_whitespace)
+        self.passes: List[CompactionPass] = list(passes)
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.original_tokens = 0
+        self.saved_tokens = 0
+
+    def compact(self, prompt: str) -> CompactionResult:
+        """Compacta o prompt e conta os tokens economizados"""
+        parts = []
+        for segment in split_segments(prompt):
+            if segment.kind == 'file':
+                parts.append(self._compact_file(segment))
+            else:
+                parts.append(self._apply(segment.text, None))
+        text = re.sub(r'\n{3,}', '\n\n', "".join(parts)).strip()
+
+        original_tokens = self.counter.count(prompt)
+        compacted_tokens = self.counter.count(text)
+        if compacted_tokens > original_tokens:
+            text, compacted_tokens = prompt, original_tokens
+
+        with self._lock:
+            self.prompts += 1
+            self.original_tokens += original_tokens
+            self.saved_tokens += original_tokens - compacted_tokens
+        return CompactionResult(text, original_tokens, compacted_tokens)
+
+    def _apply(self, text: str, language: Optional[str]) -> str:
+        for compaction_pass in self.passes:
+            text = compaction_pass(text, language)
+        return text
+
+    def _compact_file(self, segment: Segment) -> str:
+        """Compacta o conteúdo do bloco de código de um arquivo, mantendo o cabeçalho"""
+        lines = segment.text.splitlines(keepends=True)
+        fences = [i for i, line in enumerate(lines) if FENCE.match(line)]
+        if len(fences) < 2:
+            return self._apply(segment.text, None)
+
+        opening, closing = fences[0], fences[-1]
+        fence_tag = lines[opening].strip()[3:]
+        language = language_for(segment.path, fence_tag)
+        # O cabeçalho herda a indentação do template na primeira linha
+        header = self._apply("".join(line.lstrip(' \t') for line in lines[:opening]), None)
+        body = self._apply("".join(lines[opening + 1:closing]), language)
+        if body and not body.endswith("\n"):
+            body += "\n"
+        return (
+            header.rstrip() + "\n"
+            + lines[opening].strip() + "\n"
+            + body
+            + lines[closing].strip() + "\n"
+            + "".join(lines[closing + 1:])
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'prompts': self.prompts,
+                'original_tokens': self.original_tokens,
+                'saved_tokens': self.saved_tokens
+            }
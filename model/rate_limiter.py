@@ -0,0 +1,224 @@
+# model/rate_limiter.py
+import time
+import random
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0,
+                  rng: Optional[random.Random] = None) -> float:
+    """Atraso exponencial com jitter completo para a tentativa indicada (1, 2, ...)"""
+    if base <= 0:
+        return 0.0
+    ceiling = min(cap, base * (2 ** max(0, attempt - 1)))
+    return (rng or random).uniform(0, ceiling)
+
+class _Dimension:
+    """Balde de fichas de uma dimensão do limite (requisições ou tokens por minuto)
+
+    ``ceiling`` é o limite configurado (None = sem limite). O limite efetivo
+    cai quando o provedor recusa requisições e volta a subir aos poucos a
+    cada sucesso, sem ultrapassar o configurado.
+    """
+
+    WINDOW = 60.0
+    # Histórico mínimo para estimar o teto pelo consumo observado
+    MIN_SAMPLE_SECONDS = 10.0
+
+    def __init__(self, ceiling: Optional[float], burst_seconds: float, now: float):
+        self.ceiling = ceiling if ceiling and ceiling > 0 else None
+        self.configured = self.ceiling is not None
+        self.limit = self.ceiling
+        self.burst_seconds = burst_seconds
+        self.level = self.capacity
+        self.updated = now
+        self.recovery_step = 0.0
+        # Referência para o piso e a recuperação quando não há limite configurado
+        self.reference: Optional[float] = None
+        # Consumo recente, usado para estimar o teto quando não há limite configurado
+        self.history: deque = deque()
+
+    @property
+    def capacity(self) -> float:
+        if self.limit is None:
+            return float('inf')
+        return max(1.0, self.limit * self.burst_seconds / self.WINDOW)
+
+    def refill(self, now: float) -> None:
+        if self.limit is not None:
+            rate = self.limit / self.WINDOW
+            self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+        while self.history and self.history[0][0] <= now - self.WINDOW:
+            self.history.popleft()
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos até haver fichas suficientes para ``amount``"""
+        if self.limit is None:
+            return 0.0
+        # Um pedido maior que o balde nunca caberia: basta o balde cheio
+        amount = min(amount, self.capacity)
+        missing = amount - self.level
+        return 0.0 if missing <= 0 else missing * self.WINDOW / self.limit
+
+    def take(self, amount: float, now: float) -> None:
+        if self.limit is not None:
+            self.level -= min(amount, self.capacity)
+        self.history.append((now, amount))
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Corrige o consumo estimado de um pedido com o valor real"""
+        if self.limit is not None:
+            self.level = min(self.capacity, self.level - amount)
+        self.history.append((now, amount))
+
+    def observed(self, now: float) -> Optional[float]:
+        """Consumo por minuto, se o histórico for longo o bastante para estimá-lo"""
+        if not self.history or now - self.history[0][0] < self.MIN_SAMPLE_SECONDS:
+            return None
+        total = sum(amount for _, amount in self.history)
+        return total * self.WINDOW / min(now - self.history[0][0], self.WINDOW)
+
+    def learn(self, ceiling: Optional[float]) -> None:
+        """Adota o limite informado pelo provedor quando nenhum foi configurado"""
+        if not ceiling or ceiling <= 0 or self.configured:
+            return
+        if self.limit is None or self.limit > ceiling:
+            self.limit = ceiling
+            self.level = min(self.level, self.capacity)
+        self.ceiling = ceiling
+
+    def decrease(self, factor: float, min_fraction: float, now: float) -> None:
+        current = self.limit if self.limit is not None else self.observed(now)
+        if not current:
+            # Sem limite nem histórico suficiente: apenas a pausa se aplica
+            return
+        if self.ceiling is None and self.reference is None:
+            self.reference = current
+        reference = self.ceiling or self.reference
+        self.limit = max(1.0, reference * min_fraction, current * factor)
+        self.level = min(self.level, self.capacity)
+        self.recovery_step = reference * 0.05
+
+    def increase(self) -> None:
+        if self.limit is None or not self.recovery_step:
+            return
+        self.limit += self.recovery_step
+        if self.ceiling is not None and self.limit >= self.ceiling:
+            self.limit = self.ceiling
+            self.recovery_step = 0.0
+
+class RateLimiter:
+    """Limitador adaptativo de requisições e tokens por minuto
+
+    Cada chamada reserva uma requisição e a estimativa de tokens antes de ir
+    ao provedor, aguardando se algum dos baldes estiver vazio. Uma resposta de
+    limite excedido (429) pausa todas as chamadas pelo tempo indicado pelo
+    provedor e reduz o limite efetivo pela metade; cada sucesso o recupera
+    aos poucos até o valor configurado. Sem limite configurado, o teto é o
+    anunciado pelo provedor ou, na falta dele, o consumo observado no último
+    minuto no momento do primeiro 429.
+    """
+
+    # Intervalo mínimo, em segundos, entre duas reduções do limite
+    DECREASE_INTERVAL = 1.0
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 burst_seconds: float = 10.0, decrease_factor: float = 0.5,
+                 min_fraction: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._requests = _Dimension(requests_per_minute, burst_seconds, now)
+        self._tokens = _Dimension(tokens_per_minute, burst_seconds, now)
+        self.decrease_factor = decrease_factor
+        self.min_fraction = min_fraction
+        self._paused_until = 0.0
+        self._last_decrease: Optional[float] = None
+
+        # Métricas
+        self.acquired = 0
+        self.throttled = 0
+        self.throttle_seconds = 0.0
+        self.rate_limited = 0
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Reserva uma requisição com ``tokens`` estimados; retorna o tempo de espera"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._requests.refill(now)
+                self._tokens.refill(now)
+                wait = max(
+                    self._paused_until - now,
+                    self._requests.wait_time(1),
+                    self._tokens.wait_time(tokens)
+                )
+                if wait <= 0:
+                    self._requests.take(1, now)
+                    self._tokens.take(tokens, now)
+                    self.acquired += 1
+                    if waited:
+                        self.throttled += 1
+                        self.throttle_seconds += waited
+                    return waited
+            # Dormir fora da trava; outras threads podem ter consumido nesse meio tempo
+            delay = min(wait, 1.0)
+            self._sleep(delay)
+            waited += delay
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Ajusta o balde de tokens com o consumo informado pelo provedor"""
+        if actual <= 0 or actual == estimated:
+            return
+        with self._lock:
+            now = self._clock()
+            self._tokens.refill(now)
+            self._tokens.adjust(actual - estimated, now)
+
+    def on_success(self) -> None:
+        """Recupera gradualmente o limite após uma redução"""
+        with self._lock:
+            self._requests.increase()
+            self._tokens.increase()
+
+    def on_rate_limited(self, retry_after: Optional[float] = None,
+                        requests_limit: Optional[float] = None,
+                        tokens_limit: Optional[float] = None) -> None:
+        """Registra uma recusa do provedor: pausa as chamadas e reduz o limite
+
+        ``requests_limit`` e ``tokens_limit`` são os limites por minuto
+        anunciados pelo provedor (cabeçalhos x-ratelimit-limit-*), usados como
+        teto quando nenhum limite foi configurado.
+        """
+        with self._lock:
+            now = self._clock()
+            self.rate_limited += 1
+            self._requests.learn(requests_limit)
+            self._tokens.learn(tokens_limit)
+            if retry_after and retry_after > 0:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            # Recusas simultâneas vêm da mesma sobrecarga: reduzir uma vez por janela
+            if self._last_decrease is not None and now - self._last_decrease < self.DECREASE_INTERVAL:
+                return
+            self._last_decrease = now
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            self._requests.decrease(self.decrease_factor, self.min_fraction, now)
+            self._tokens.decrease(self.decrease_factor, self.min_fraction, now)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Métricas de espera e limites efetivos"""
+        with self._lock:
+            return {
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'throttle_seconds': self.throttle_seconds,
+                'rate_limited': self.rate_limited,
+                'requests_per_minute': self._requests.limit,
+                'tokens_per_minute': self._tokens.limit
+            }
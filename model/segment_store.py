@@ -0,0 +1,524 @@
+# model/segment_store.py
+import os
+import re
+import time
+import zlib
+import errno
+import struct
+import logging
+import threading
+import contextlib
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Sem fcntl (Windows) o store é seguro apenas dentro de um processo
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # Dependência opcional: sem ela usa-se zlib
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Registro: crc32, instante de gravação, flags, tamanho da chave, tamanho do valor
+RECORD_HEADER = struct.Struct('>IdBHI')
+# Dica: instante de gravação, flags, tamanho da chave, deslocamento, tamanho do registro
+HINT_HEADER = struct.Struct('>dBHQI')
+
+FLAG_ZLIB = 0x01
+FLAG_ZSTD = 0x02
+FLAG_TOMBSTONE = 0x80
+
+# Valores menores que isso não compensam a compressão
+MIN_COMPRESS_BYTES = 256
+
+SEGMENT_NAME = re.compile(r'^(\d{8})\.seg$')
+
+class _Entry(NamedTuple):
+    """Posição da versão mais recente de uma chave"""
+    segment: int
+    offset: int
+    size: int
+    written_at: float
+
+class SegmentStore:
+    """Armazenamento chave-valor em segmentos somente de acréscimo
+
+    Cada gravação acrescenta um registro (com CRC) ao segmento ativo; remoções
+    gravam um marcador. O índice fica em memória e aponta para o deslocamento
+    de cada chave, de modo que uma leitura é um único ``pread``. Segmentos
+    fechados ganham um arquivo de dicas (``.hint``) com as posições dos
+    registros, que permite reconstruir o índice sem ler os dados.
+
+    Vários processos podem compartilhar o diretório: as gravações são
+    serializadas por uma trava de arquivo e cada processo incorpora os
+    registros acrescentados pelos demais antes das leituras, no máximo uma
+    vez a cada ``refresh_interval`` segundos (as gravações do próprio
+    processo aparecem na hora). Entre versões de uma mesma chave vale a de
+    instante de gravação mais recente.
+    A compactação em segundo plano reescreve os registros vivos dos
+    segmentos fechados e remove os antigos.
+    """
+
+    def __init__(self, directory, segment_bytes: int = 64 * 1024 * 1024,
+                 compression: str = "zlib", compact_ratio: float = 0.5,
+                 compact_min_bytes: int = 1024 * 1024, background: bool = True,
+                 refresh_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.compression = self._resolve_compression(compression)
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.background = background
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._lock_path = self.directory / "LOCK"
+        self._keydir: Dict[str, _Entry] = {}
+        # Bytes já indexados de cada segmento e segmentos fechados já lidos por inteiro
+        self._indexed: Dict[int, int] = {}
+        self._closed: Set[int] = set()
+        self._readers: Dict[int, int] = {}
+        self._live_bytes = 0
+        self._total_bytes = 0
+        self._compacting = False
+        self._refreshed_at = 0.0
+
+        # Contadores
+        self.compactions = 0
+        self.corrupt_records = 0
+
+        with self._lock:
+            self._refresh()
+
+    @staticmethod
+    def _resolve_compression(name: str) -> str:
+        name = (name or "none").lower()
+        if name == "zstd" and zstandard is None:
+            logger.warning("zstandard não instalado; usando zlib na compressão do cache")
+            return "zlib"
+        if name not in ("zstd", "zlib", "none"):
+            raise ValueError(f"Compressão desconhecida: {name}")
+        return name
+
+    # Operações públicas
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Retorna o valor da chave ou None"""
+        for _ in range(2):
+            with self._lock:
+                # Incorporar gravações e compactações de outros processos
+                self._refresh_if_due()
+                entry = self._keydir.get(key)
+                if entry is None:
+                    return None
+                fd = self._reader(entry.segment)
+            try:
+                record = os.pread(fd, entry.size, entry.offset) if fd is not None else b""
+                parsed = self._parse(record)
+            except OSError:
+                parsed = None
+            if parsed is not None and parsed[1] == key:
+                return self._decode(parsed[0], parsed[2])
+            # Segmento removido por uma compactação de outro processo
+            with self._lock:
+                self._close_reader(entry.segment)
+                self._refresh()
+        return None
+
+    def put(self, key: str, value: bytes, written_at: Optional[float] = None) -> int:
+        """Grava o valor da chave; retorna o tamanho do registro em bytes"""
+        flags, payload = self._encode(value)
+        return self._append(key, payload, flags, written_at or time.time())
+
+    def delete(self, key: str) -> None:
+        """Remove a chave gravando um marcador"""
+        with self._lock:
+            if key not in self._keydir:
+                return
+        self._append(key, b"", FLAG_TOMBSTONE, time.time())
+
+    def meta(self, key: str) -> Optional[Tuple[int, float]]:
+        """Tamanho do registro e instante de gravação da chave, se existir"""
+        with self._lock:
+            entry = self._keydir.get(key)
+            if entry is None:
+                self._refresh_if_due()
+                entry = self._keydir.get(key)
+            return (entry.size, entry.written_at) if entry is not None else None
+
+    def items(self) -> Iterator[Tuple[str, int, float]]:
+        """Lista (chave, tamanho do registro, instante de gravação) das chaves vivas"""
+        with self._lock:
+            self._refresh()
+            entries = list(self._keydir.items())
+        for key, entry in entries:
+            yield key, entry.size, entry.written_at
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'keys': len(self._keydir),
+                'segments': len(self._indexed),
+                'live_bytes': self._live_bytes,
+                'total_bytes': self._total_bytes,
+                'compactions': self.compactions,
+                'corrupt_records': self.corrupt_records
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in list(self._readers):
+                self._close_reader(segment)
+
+    # Gravação
+
+    def _append(self, key: str, payload: bytes, flags: int, written_at: float) -> int:
+        key_bytes = key.encode('utf-8')
+        body = RECORD_HEADER.pack(0, written_at, flags, len(key_bytes), len(payload))[4:] + key_bytes + payload
+        record = struct.pack('>I', zlib.crc32(body)) + body
+
+        with self._lock, self._file_lock():
+            self._refresh(repair=True)
+            segment = self._active_segment()
+            if self._indexed.get(segment, 0) + len(record) > self.segment_bytes and self._indexed.get(segment, 0):
+                self._seal(segment)
+                self._closed.add(segment)
+                segment += 1
+            path = self._segment_path(segment)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                offset = os.fstat(fd).st_size
+                os.write(fd, record)
+            finally:
+                os.close(fd)
+            self._indexed[segment] = offset + len(record)
+            self._total_bytes += len(record)
+            self._apply(key, flags, _Entry(segment, offset, len(record), written_at))
+
+        self._maybe_compact()
+        return len(record)
+
+    def _active_segment(self) -> int:
+        return max(self._indexed) if self._indexed else 1
+
+    def _seal(self, segment: int) -> None:
+        """Grava as dicas de um segmento que deixa de receber registros"""
+        hints = []
+        for key, flags, offset, size, written_at in self._scan(segment, 0)[0]:
+            key_bytes = key.encode('utf-8')
+            hints.append(HINT_HEADER.pack(written_at, flags, len(key_bytes), offset, size) + key_bytes)
+        self._write_atomic(self._hint_path(segment), b"".join(hints))
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Trava exclusiva entre processos para gravações e compactação"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    # Índice
+
+    def _refresh_if_due(self) -> None:
+        """Incorpora o que outros processos gravaram, se já passou ``refresh_interval``"""
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self._refresh()
+
+    def _refresh(self, repair: bool = False) -> None:
+        """Incorpora segmentos e registros gravados desde a última leitura
+
+        Com ``repair`` (apenas sob a trava de gravação), um registro
+        incompleto no fim do segmento ativo é resto de uma gravação
+        interrompida e é descartado.
+        """
+        self._refreshed_at = time.monotonic()
+        segments = self._list_segments()
+        active = segments[-1] if segments else None
+
+        for segment in segments:
+            # Segmentos fechados não mudam depois de lidos por inteiro
+            if segment in self._closed:
+                continue
+            if segment != active and segment not in self._indexed and self._load_hints(segment):
+                self._closed.add(segment)
+                continue
+            start = self._indexed.get(segment, 0)
+            try:
+                size = self._segment_path(segment).stat().st_size
+            except FileNotFoundError:
+                continue
+            if size > start:
+                records, end = self._scan(segment, start)
+                for key, flags, offset, length, written_at in records:
+                    self._total_bytes += length
+                    self._apply(key, flags, _Entry(segment, offset, length, written_at))
+                if end < size and repair and segment == active:
+                    self.corrupt_records += 1
+                    logger.warning(f"Descartando registro incompleto no segmento {segment} do cache")
+                    os.truncate(self._segment_path(segment), end)
+                start = end
+            self._indexed[segment] = start
+            if segment != active:
+                self._closed.add(segment)
+
+        # Segmentos removidos por uma compactação: os bytes deles deixam o total
+        removed = set(self._indexed) - set(segments)
+        if removed:
+            for segment in removed:
+                self._total_bytes -= self._indexed.pop(segment)
+                self._closed.discard(segment)
+                self._close_reader(segment)
+            for key, entry in list(self._keydir.items()):
+                if entry.segment in removed:
+                    self._forget(key)
+
+    def _apply(self, key: str, flags: int, entry: _Entry) -> None:
+        """Aplica um registro ao índice se for a versão mais recente da chave"""
+        current = self._keydir.get(key)
+        if current is not None and current.written_at > entry.written_at:
+            return
+        if current is not None:
+            self._live_bytes -= current.size
+        if flags & FLAG_TOMBSTONE:
+            self._keydir.pop(key, None)
+            # O marcador em si também é espaço morto
+            return
+        self._keydir[key] = entry
+        self._live_bytes += entry.size
+
+    def _forget(self, key: str) -> None:
+        entry = self._keydir.pop(key, None)
+        if entry is not None:
+            self._live_bytes -= entry.size
+
+    def _load_hints(self, segment: int) -> bool:
+        try:
+            data = self._hint_path(segment).read_bytes()
+        except FileNotFoundError:
+            return False
+        position = 0
+        end = 0
+        while position + HINT_HEADER.size <= len(data):
+            written_at, flags, key_len, offset, size = HINT_HEADER.unpack_from(data, position)
+            position += HINT_HEADER.size
+            key = data[position:position + key_len].decode('utf-8')
+            position += key_len
+            self._total_bytes += size
+            self._apply(key, flags, _Entry(segment, offset, size, written_at))
+            end = max(end, offset + size)
+        self._indexed[segment] = end
+        return True
+
+    def _scan(self, segment: int, start: int) -> Tuple[List[Tuple[str, int, int, int, float]], int]:
+        """Lê os registros válidos de um segmento a partir de ``start``"""
+        try:
+            with open(self._segment_path(segment), 'rb') as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return [], start
+
+        records = []
+        position = 0
+        while position + RECORD_HEADER.size <= len(data):
+            crc, written_at, flags, key_len, value_len = RECORD_HEADER.unpack_from(data, position)
+            length = RECORD_HEADER.size + key_len + value_len
+            if position + length > len(data):
+                break
+            if zlib.crc32(data[position + 4:position + length]) != crc:
+                break
+            key_start = position + RECORD_HEADER.size
+            key = data[key_start:key_start + key_len].decode('utf-8')
+            records.append((key, flags, start + position, length, written_at))
+            position += length
+        return records, start + position
+
+    # Leitura
+
+    def _reader(self, segment: int) -> Optional[int]:
+        fd = self._readers.get(segment)
+        if fd is None:
+            try:
+                fd = os.open(self._segment_path(segment), os.O_RDONLY)
+            except FileNotFoundError:
+                return None
+            self._readers[segment] = fd
+        return fd
+
+    def _close_reader(self, segment: int) -> None:
+        fd = self._readers.pop(segment, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _parse(self, record: bytes) -> Optional[Tuple[bytes, str, int]]:
+        """Valida um registro lido do disco; retorna (valor, chave, flags)"""
+        if len(record) < RECORD_HEADER.size:
+            return None
+        crc, _, flags, key_len, value_len = RECORD_HEADER.unpack_from(record)
+        if len(record) != RECORD_HEADER.size + key_len + value_len or zlib.crc32(record[4:]) != crc:
+            return None
+        key = record[RECORD_HEADER.size:RECORD_HEADER.size + key_len].decode('utf-8')
+        return record[RECORD_HEADER.size + key_len:], key, flags
+
+    # Compressão
+
+    def _encode(self, value: bytes) -> Tuple[int, bytes]:
+        if self.compression == "none" or len(value) < MIN_COMPRESS_BYTES:
+            return 0, value
+        if self.compression == "zstd":
+            compressed, flag = zstandard.ZstdCompressor().compress(value), FLAG_ZSTD
+        else:
+            compressed, flag = zlib.compress(value, 6), FLAG_ZLIB
+        if len(compressed) >= len(value):
+            return 0, value
+        return flag, compressed
+
+    @staticmethod
+    def _decode(payload: bytes, flags: int) -> bytes:
+        if flags & FLAG_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Registro comprimido com zstd, mas zstandard não está instalado")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if flags & FLAG_ZLIB:
+            return zlib.decompress(payload)
+        return payload
+
+    # Compactação
+
+    def _maybe_compact(self) -> None:
+        with self._lock:
+            dead = self._total_bytes - self._live_bytes
+            if (self._compacting or self._total_bytes < self.compact_min_bytes or
+                    dead < self._total_bytes * self.compact_ratio):
+                return
+            self._compacting = True
+        if self.background:
+            threading.Thread(target=self._run_compaction, daemon=True).start()
+        else:
+            self._run_compaction()
+
+    def _run_compaction(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Erro na compactação do cache: {str(e)}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self) -> None:
+        """Reescreve os registros vivos dos segmentos fechados e remove os antigos
+
+        Todos os segmentos existentes entram na compactação, então os
+        marcadores de remoção podem ser descartados com segurança. A trava de
+        gravação fica retida durante a cópia: gravações de outros processos
+        aguardam, mas nunca veem um estado intermediário.
+        """
+        with self._lock, self._file_lock():
+            self._refresh(repair=True)
+            dead = self._total_bytes - self._live_bytes
+            if not self._indexed or dead <= 0:
+                return
+            sealed = sorted(self._indexed)
+            live = sorted((entry.segment, entry.offset, key) for key, entry in self._keydir.items())
+
+            # Copiar os registros vivos para novos segmentos, após os atuais
+            next_id = sealed[-1] + 1
+            published: Dict[int, List[Tuple[str, _Entry]]] = {}
+            buffer = bytearray()
+            records: List[Tuple[str, _Entry]] = []
+
+            def flush():
+                nonlocal buffer, records, next_id
+                if not buffer:
+                    return
+                hints = b"".join(
+                    HINT_HEADER.pack(entry.written_at, 0, len(key.encode('utf-8')), entry.offset, entry.size) +
+                    key.encode('utf-8')
+                    for key, entry in records
+                )
+                self._write_atomic(self._hint_path(next_id), hints)
+                self._write_atomic(self._segment_path(next_id), bytes(buffer))
+                published[next_id] = records
+                next_id += 1
+                buffer, records = bytearray(), []
+
+            for segment, _, key in live:
+                entry = self._keydir[key]
+                fd = self._reader(segment)
+                record = os.pread(fd, entry.size, entry.offset) if fd is not None else b""
+                parsed = self._parse(record)
+                if parsed is None or parsed[1] != key:
+                    self.corrupt_records += 1
+                    continue
+                if buffer and len(buffer) + len(record) > self.segment_bytes:
+                    flush()
+                records.append((key, _Entry(next_id, len(buffer), len(record), entry.written_at)))
+                buffer += record
+            flush()
+
+            # Novo segmento ativo depois dos compactados
+            self._write_atomic(self._segment_path(next_id), b"")
+
+            for segment in sealed:
+                for path in (self._segment_path(segment), self._hint_path(segment)):
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                self._indexed.pop(segment, None)
+                self._closed.discard(segment)
+                self._close_reader(segment)
+
+            self._keydir = {}
+            for segment, entries in published.items():
+                self._indexed[segment] = sum(entry.size for _, entry in entries)
+                self._closed.add(segment)
+                self._keydir.update(entries)
+            self._indexed[next_id] = 0
+            self._total_bytes = self._live_bytes = sum(self._indexed.values())
+            self.compactions += 1
+
+    # Arquivos
+
+    def _list_segments(self) -> List[int]:
+        segments = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    match = SEGMENT_NAME.match(entry.name)
+                    if match:
+                        segments.append(int(match.group(1)))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        return sorted(segments)
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:08d}.seg"
+
+    def _hint_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:08d}.hint"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Grava um arquivo completo com fsync e rename"""
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
@@ -0,0 +1,60 @@
+# model/single_flight.py
+import threading
+from typing import Any, Callable, Dict, Optional
+
+class _Call:
+    """Chamada em andamento compartilhada entre as threads que a aguardam"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Agrupa chamadas simultâneas com a mesma chave em uma única execução
+
+    A primeira thread a pedir uma chave executa a função; as que chegam
+    enquanto ela está em andamento aguardam e recebem o mesmo resultado
+    (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Executa fn uma única vez para todas as chamadas simultâneas da chave"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Número de chaves com execução em andamento"""
+        with self._lock:
+            return len(self._calls)
@@ -1,44 +1,83 @@
 # model/transformer_model.py
 import os
 import re
-import hashlib
-import json
-from typing import Dict, List, Optional
-from pathlib import Path
+import time
+import queue
+import logging
+import threading
+import contextlib
+import contextvars
+import concurrent.futures
+from typing import Callable, Dict, Iterator, List, Optional
 import openai
 from dotenv import load_dotenv
 
-class CacheManager:
-    """Gerencia cache de respostas para reduzir chamadas à API"""
-    
-    def __init__(self, cache_dir=".cache"):
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
-    
-    def get_cache_key(self, prompt: str) -> str:
-        """Gera uma chave de cache baseada no prompt"""
-        return hashlib.md5(prompt.encode()).hexdigest()
-    
-    def get_from_cache(self, key: str) -> Optional[str]:
-        """Recupera resposta do cache se existir"""
-        cache_file = self.cache_dir / f"{key}.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('response')
-            except Exception:
-                return None
-        return None
-    
-    def save_to_cache(self, key: str, response: str) -> None:
-        """Salva resposta no cache"""
-        cache_file = self.cache_dir / f"{key}.json"
-        try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({'response': response}, f)
-        except Exception:
-            pass
+from .cache_manager import CacheManager
+from .clients import create_client
+from .metrics import REGISTRY, TOKEN_BUCKETS, current_agent
+from .prompt_compactor import PromptCompactor
+from .chunker import PromptChunker, Segment, TokenCounter, content_hash
+from .rate_limiter import RateLimiter, backoff_delay
+from .single_flight import SingleFlight
+
+SYSTEM_PROMPT = "Você é um assistente especializado em análise de código."
+
+# Tokens consumidos pela estrutura das mensagens de chat além do conteúdo
+MESSAGE_OVERHEAD_TOKENS = 12
+
+MAP_PROMPT = """Você está analisando uma das partes de um projeto grande que foi dividido em várias partes.
+
+Solicitação original:
+{instructions}
+
+Conteúdo desta parte:
+{content}
+
+Produza uma análise parcial, concisa e objetiva, apenas com as observações relevantes para a solicitação sobre o conteúdo desta parte. Cite os caminhos dos arquivos. Não escreva introdução nem conclusão: as análises parciais serão combinadas depois."""
+
+REDUCE_PROMPT = """Combine as análises parciais abaixo, feitas sobre partes diferentes do mesmo projeto, em uma única resposta coerente para a solicitação original.
+
+Solicitação original:
+{instructions}
+
+Análises parciais:
+{partials}
+
+Elimine repetições, resolva contradições e siga o formato pedido na solicitação original."""
+
+# Telemetria das chamadas ao modelo, por agente (ver metrics.agent_context)
+GENERATE_SECONDS = REGISTRY.histogram(
+    'model_generate_seconds', 'Duração de TransformerModel.generate', ['agent', 'outcome']
+)
+API_CALL_SECONDS = REGISTRY.histogram(
+    'model_api_call_seconds', 'Duração de cada chamada à API de chat', ['agent', 'status']
+)
+PROMPT_TOKENS = REGISTRY.histogram(
+    'model_prompt_tokens', 'Tokens de entrada por chamada à API', ['agent'], buckets=TOKEN_BUCKETS
+)
+COMPLETION_TOKENS = REGISTRY.histogram(
+    'model_completion_tokens', 'Tokens de saída por chamada à API', ['agent'], buckets=TOKEN_BUCKETS
+)
+PROMPT_TOKENS_SAVED = REGISTRY.counter(
+    'model_prompt_tokens_saved_total', 'Tokens de entrada removidos pela compactação de prompts', ['agent']
+)
+
+# Destino dos tokens da resposta final no contexto atual (ver stream_tokens)
+_token_sink: contextvars.ContextVar = contextvars.ContextVar('token_sink', default=None)
+
+@contextlib.contextmanager
+def stream_tokens(callback: Callable[[str], None]):
+    """Envia ao callback os tokens das respostas geradas neste contexto
+
+    Apenas a chamada que produz a resposta final é transmitida; as partes
+    intermediárias do map-reduce não são. Respostas vindas do cache são
+    entregues de uma vez.
+    """
+    token = _token_sink.set(callback)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
 
 class OpenAIError(Exception):
     """Exceção personalizada para erros da API OpenAI"""
@@ -53,68 +92,251 @@ class TransformerModel:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY não encontrada nas variáveis de ambiente")
         
-        openai.api_key = self.api_key
+        # Cliente do endpoint de chat (pool de conexões; ver clients.create_client).
+        # OPENAI_API_BASE aponta para um endpoint compatível, como o servidor simulado
+        self.client = create_client()
         
         # Configurações do modelo
         self.model_name = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
         self.max_tokens = int(os.getenv("MAX_TOKENS", "1000"))
         self.max_input_tokens = int(os.getenv("MAX_INPUT_TOKENS", "4000"))
-        self.chunk_size = int(os.getenv("CHUNK_SIZE", "2000"))
+        
+        # Divisão de prompts grandes pelo número real de tokens
+        self.token_counter = TokenCounter(self.model_name)
+        self.chunker = PromptChunker(
+            self.token_counter,
+            self.max_input_tokens,
+            reserved_tokens=self.token_counter.count(SYSTEM_PROMPT) + MESSAGE_OVERHEAD_TOKENS
+        )
+        
+        # Compactação dos prompts antes do envio (PROMPT_COMPACTION=0 desativa);
+        # pode ser substituída por qualquer objeto com compact(prompt)
+        self.compactor = None
+        if os.getenv("PROMPT_COMPACTION", "1") != "0":
+            self.compactor = PromptCompactor(
+                self.token_counter,
+                strip_comments=os.getenv("PROMPT_STRIP_COMMENTS", "0") == "1"
+            )
+        
+        # Número médio de arquivos por parte no map-reduce; as fronteiras dependem
+        # do conteúdo para que a edição de um arquivo invalide apenas a sua parte
+        self.segment_group_size = max(1, int(os.getenv("SEGMENT_GROUP_SIZE", "4")))
+        
+        # Envio concorrente de chunks (1 mantém o envio sequencial)
+        self.chunk_concurrency = max(1, int(os.getenv("CHUNK_CONCURRENCY", "4")))
+        self.chunk_max_retries = max(0, int(os.getenv("CHUNK_MAX_RETRIES", "2")))
+        self.chunk_retry_delay = float(os.getenv("CHUNK_RETRY_DELAY", "1.0"))
+        self.chunk_max_retry_delay = float(os.getenv("CHUNK_MAX_RETRY_DELAY", "30"))
+        
+        # Limites de requisições e tokens por minuto (0 = ajustar pelas recusas do provedor)
+        self.rate_limit_max_retries = max(0, int(os.getenv("RATE_LIMIT_MAX_RETRIES", "6")))
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=float(os.getenv("RATE_LIMIT_RPM", "0")),
+            tokens_per_minute=float(os.getenv("RATE_LIMIT_TPM", "0"))
+        )
+        
+        self.logger = logging.getLogger(__name__)
         
         # Cache para respostas
-        self.cache_manager = CacheManager()
+        self.cache_manager = CacheManager(os.getenv("CACHE_DIR", ".cache"))
+        
+        # Agrupamento de prompts idênticos em andamento
+        self.in_flight = SingleFlight()
         
         # Rastreamento de arquivos
         self.current_file_content = {}
         self.modified_files = {}
+        
+        self._register_metrics()
+    
+    def _register_metrics(self) -> None:
+        """Expõe no registro de métricas os contadores do cache e do limitador"""
+        def cache_requests():
+            stats = self.cache_manager.stats()
+            yield 'model_cache_requests_total', {'tier': 'memory', 'result': 'hit'}, stats['memory_hits']
+            yield 'model_cache_requests_total', {'tier': 'disk', 'result': 'hit'}, stats['disk_hits']
+            yield 'model_cache_requests_total', {'tier': 'all', 'result': 'miss'}, stats['misses']
+        
+        def cache_hit_ratio():
+            stats = self.cache_manager.stats()
+            total = stats['hits'] + stats['misses']
+            yield 'model_cache_hit_ratio', {}, stats['hits'] / total if total else 0.0
+        
+        def cache_entries():
+            stats = self.cache_manager.stats()
+            yield 'model_cache_entries', {'tier': 'memory'}, stats['memory_entries']
+            yield 'model_cache_entries', {'tier': 'disk'}, stats['disk_entries']
+        
+        def throttle_seconds():
+            yield 'model_throttle_seconds_total', {}, self.rate_limiter.stats()['throttle_seconds']
+        
+        def rate_limited():
+            yield 'model_rate_limited_total', {}, self.rate_limiter.stats()['rate_limited']
+        
+        REGISTRY.register_collector('model_cache_requests_total', 'counter',
+                                    'Consultas ao cache de respostas por nível e resultado', cache_requests)
+        REGISTRY.register_collector('model_cache_hit_ratio', 'gauge',
+                                    'Fração das consultas ao cache atendidas', cache_hit_ratio)
+        REGISTRY.register_collector('model_cache_entries', 'gauge',
+                                    'Entradas no cache por nível', cache_entries)
+        REGISTRY.register_collector('model_throttle_seconds_total', 'counter',
+                                    'Tempo de espera imposto pelo limitador de taxa', throttle_seconds)
+        REGISTRY.register_collector('model_rate_limited_total', 'counter',
+                                    'Respostas 429 recebidas do provedor', rate_limited)
     
     def generate(self, prompt: str, project_files: Optional[Dict[str, str]] = None) -> str:
         """Gera uma resposta com base no prompt e arquivos do projeto"""
         if not prompt:
             raise ValueError("Prompt não pode estar vazio")
         
+        started_at = time.perf_counter()
+        outcome = 'error'
+        try:
+            response, outcome = self._generate(self._compact(prompt), project_files)
+            return response
+        finally:
+            GENERATE_SECONDS.observe(time.perf_counter() - started_at, agent=current_agent(), outcome=outcome)
+    
+    def _compact(self, prompt: str) -> str:
+        """Aplica a compactação ao prompt e registra os tokens economizados"""
+        if self.compactor is None:
+            return prompt
+        result = self.compactor.compact(prompt)
+        if result.saved_tokens > 0:
+            PROMPT_TOKENS_SAVED.inc(result.saved_tokens, agent=current_agent())
+            self.logger.debug(
+                f"Compactação do prompt: {result.original_tokens} -> {result.compacted_tokens} tokens"
+            )
+        return result.text
+    
+    def _generate(self, prompt: str, project_files: Optional[Dict[str, str]]):
+        """Executa generate; retorna a resposta e a sua origem (hit, coalesced ou miss)"""
+        sink = _token_sink.get()
+        
         # Verificar cache primeiro
         cache_key = self.cache_manager.get_cache_key(prompt)
         cached_response = self.cache_manager.get_from_cache(cache_key)
         if cached_response:
-            return cached_response
+            if sink:
+                sink(cached_response)
+            return cached_response, 'hit'
         
         # Armazenar arquivos do projeto para contexto
         if project_files:
             self.current_file_content = project_files
         
-        try:
-            # Criar prompt de código e dividir em chunks
-            code_prompt = self._create_code_prompt(prompt)
-            chunks = self._chunk_content(code_prompt)
+        # Chamadas simultâneas com o mesmo prompt aguardam a primeira
+        executed = []
+        
+        def run():
+            executed.append(True)
+            return self._generate_uncached(prompt, cache_key, sink)
+        
+        response = self.in_flight.do(cache_key, run)
+        if sink and not executed:
+            sink(response)
+        return response, 'miss' if executed else 'coalesced'
+    
+    def generate_many(self, prompts: List[str], return_exceptions: bool = False) -> List:
+        """Gera respostas para vários prompts, na ordem de entrada
+        
+        O cache é consultado para o lote inteiro antes de qualquer chamada,
+        prompts repetidos são enviados uma única vez e os que faltam rodam em
+        paralelo (até CHUNK_CONCURRENCY por vez), passando pelo limitador de
+        taxa como qualquer outra chamada. Com ``return_exceptions``, a falha de
+        um prompt ocupa a sua posição no resultado em vez de interromper o lote.
+        """
+        if any(not prompt for prompt in prompts):
+            raise ValueError("Prompt não pode estar vazio")
+        
+        prompts = [self._compact(prompt) for prompt in prompts]
+        keys = [self.cache_manager.get_cache_key(prompt) for prompt in prompts]
+        results: Dict[str, object] = {}
+        pending: Dict[str, str] = {}
+        for prompt, key in zip(prompts, keys):
+            if key in results or key in pending:
+                continue
+            cached_response = self.cache_manager.get_from_cache(key)
+            if cached_response:
+                results[key] = cached_response
+            else:
+                pending[key] = prompt
+        
+        if pending:
+            self.logger.info(
+                f"Lote de {len(prompts)} prompts: {len(results)} do cache, {len(pending)} para gerar"
+            )
+            
+            def run(key: str) -> str:
+                return self.in_flight.do(key, lambda: self._generate_uncached(pending[key], key))
             
-            responses = []
-            for i, chunk in enumerate(chunks):
+            workers = min(self.chunk_concurrency, len(pending))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(contextvars.copy_context().run, run, key): key
+                    for key in pending
+                }
                 try:
-                    # Usar a versão correta da API OpenAI (0.28.1)
-                    response = openai.ChatCompletion.create(
-                        model=self.model_name,
-                        messages=[
-                            {"role": "system", "content": "Você é um assistente especializado em análise de código."},
-                            {"role": "user", "content": chunk}
-                        ],
-                        max_tokens=self.max_tokens,
-                        temperature=0.2,
-                        top_p=0.95,
-                        frequency_penalty=0,
-                        presence_penalty=0
-                    )
-                    
-                    # Extrair resposta
-                    response_text = response.choices[0].message.content
-                    responses.append(response_text)
-                    
-                except Exception as e:
-                    raise OpenAIError(f"OpenAI API error: {str(e)}")
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            results[futures[future]] = future.result()
+                        except Exception as e:
+                            if not return_exceptions:
+                                raise
+                            results[futures[future]] = e
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        
+        return [results[key] for key in keys]
+    
+    def generate_stream(self, prompt: str, project_files: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """Gera uma resposta entregando os tokens à medida que chegam"""
+        tokens: queue.Queue = queue.Queue()
+        finished = object()
+        outcome = {}
+        
+        def run():
+            try:
+                with stream_tokens(tokens.put):
+                    outcome['response'] = self.generate(prompt, project_files)
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                tokens.put(finished)
+        
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+        
+        while True:
+            token = tokens.get()
+            if token is finished:
+                break
+            yield token
+        
+        if 'error' in outcome:
+            raise outcome['error']
+    
+    def _generate_uncached(self, prompt: str, cache_key: str,
+                           sink: Optional[Callable[[str], None]] = None) -> str:
+        """Gera a resposta na API e a salva no cache"""
+        # Outra chamada pode ter concluído entre a consulta ao cache e o agrupamento
+        cached_response = self.cache_manager.get_from_cache(cache_key)
+        if cached_response:
+            if sink:
+                sink(cached_response)
+            return cached_response
+        
+        try:
+            # Criar prompt de código; prompts acima do limite passam por map-reduce
+            code_prompt = self._create_code_prompt(prompt)
+            if self.chunker.fits(code_prompt):
+                response_text = self._call_chunk(0, code_prompt, sink)
+            else:
+                response_text = self._map_reduce(code_prompt, sink)
             
-            # Combinar e formatar respostas
-            combined_response = " ".join(responses)
-            formatted_response = self._format_code_blocks(combined_response)
+            # Formatar resposta
+            formatted_response = self._format_code_blocks(response_text)
             
             # Salvar no cache
             self.cache_manager.save_to_cache(cache_key, formatted_response)
@@ -126,4 +348,253 @@ class TransformerModel:
                 raise e
             raise OpenAIError(f"Error: {str(e)}")
     
-    # [Outros métodos existentes permanecem iguais]
\ No newline at end of file
+    def _map_reduce(self, prompt: str, sink: Optional[Callable[[str], None]] = None) -> str:
+        """Analisa cada parte do prompt e combina as análises parciais
+        
+        As análises parciais ficam em cache pelo hash dos segmentos de cada
+        parte: após a edição de um arquivo, apenas a parte que o contém volta
+        ao modelo, e as demais vêm do cache antes da combinação final.
+        """
+        template_tokens = self.token_counter.count(MAP_PROMPT.format(instructions="", content=""))
+        instructions, groups = self.chunker.split_groups(prompt, template_tokens, self.segment_group_size)
+        self.logger.info(f"Prompt dividido em {len(groups)} partes para map-reduce")
+        
+        instructions_hash = content_hash(instructions)
+        map_prompts = [
+            MAP_PROMPT.format(instructions=instructions, content=self.chunker.join(group))
+            for group in groups
+        ]
+        cache_keys = [
+            self.cache_manager.get_cache_key(
+                "map:" + instructions_hash + ":" + ",".join(segment.digest for segment in group)
+            )
+            for group in groups
+        ]
+        partials = self._dispatch_cached(map_prompts, cache_keys)
+        return self._reduce(instructions, partials, sink)
+    
+    def _reduce(self, instructions: str, partials: List[str],
+                sink: Optional[Callable[[str], None]] = None) -> str:
+        """Combina análises parciais, em níveis se não couberem em uma chamada"""
+        template_tokens = self.token_counter.count(REDUCE_PROMPT.format(instructions=instructions, partials=""))
+        budget = self.chunker.budget - template_tokens
+        
+        while True:
+            sections = [f"### Parte {i + 1}\n{partial.strip()}\n\n" for i, partial in enumerate(partials)]
+            combined = "".join(sections)
+            
+            groups = []
+            if len(sections) > 1 and self.token_counter.count(combined) > budget:
+                groups = [self.chunker.join(group)
+                          for group in self.chunker.group([Segment('text', section) for section in sections], budget)]
+            
+            if len(groups) <= 1 or len(groups) >= len(partials):
+                # Combinação final; se não houver como agrupar, cortar no limite
+                return self._call_chunk(0, REDUCE_PROMPT.format(
+                    instructions=instructions,
+                    partials=self.chunker.truncate(combined, budget).strip()
+                ), sink)
+            
+            # Consolidar grupos de análises parciais antes da combinação final
+            reduce_prompts = [
+                REDUCE_PROMPT.format(instructions=instructions, partials=group.strip())
+                for group in groups
+            ]
+            partials = self._dispatch_cached(reduce_prompts, [
+                self.cache_manager.get_cache_key("reduce:" + content_hash(reduce_prompt))
+                for reduce_prompt in reduce_prompts
+            ])
+    
+    def _dispatch_cached(self, chunks: List[str], cache_keys: List[str]) -> List[str]:
+        """Envia apenas os chunks sem resposta em cache, preservando a ordem"""
+        responses = [self.cache_manager.get_from_cache(key) for key in cache_keys]
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if len(missing) < len(chunks):
+            self.logger.info(f"{len(chunks) - len(missing)} de {len(chunks)} partes reaproveitadas do cache")
+        
+        if missing:
+            computed = self._dispatch_chunks(
+                [chunks[i] for i in missing],
+                [cache_keys[i] for i in missing]
+            )
+            for i, response in zip(missing, computed):
+                responses[i] = response
+        return responses
+    
+    def _dispatch_chunks(self, chunks: List[str], cache_keys: Optional[List[str]] = None) -> List[str]:
+        """Envia os chunks à API e retorna as respostas na ordem original
+        
+        Com ``cache_keys``, cada resposta é salva assim que chega, para que uma
+        falha em outro chunk não descarte o trabalho já concluído.
+        """
+        def call(index: int, chunk: str) -> str:
+            response = self._call_chunk(index, chunk)
+            if cache_keys:
+                self.cache_manager.save_to_cache(cache_keys[index], response)
+            return response
+        
+        if len(chunks) <= 1 or self.chunk_concurrency <= 1:
+            return [call(i, chunk) for i, chunk in enumerate(chunks)]
+        
+        responses: List[Optional[str]] = [None] * len(chunks)
+        workers = min(self.chunk_concurrency, len(chunks))
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, call, i, chunk): i
+                for i, chunk in enumerate(chunks)
+            }
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    responses[futures[future]] = future.result()
+            except Exception:
+                # Não iniciar chunks pendentes se um deles falhou definitivamente
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        return responses
+    
+    def _call_chunk(self, index: int, chunk: str, sink: Optional[Callable[[str], None]] = None) -> str:
+        """Envia um chunk à API, respeitando o limite de taxa e repetindo em caso de falha"""
+        emitted = []
+        
+        def emit(token: str) -> None:
+            emitted.append(True)
+            sink(token)
+        
+        # Estimativa de tokens da chamada: entrada, estrutura das mensagens e resposta máxima
+        estimated_tokens = self.token_counter.count(chunk) + self.chunker.reserved_tokens + self.max_tokens
+        attempt = 0
+        rate_limited = 0
+        while True:
+            waited = self.rate_limiter.acquire(estimated_tokens)
+            if waited:
+                self.logger.debug(f"Chunk {index + 1} aguardou {waited:.2f}s pelo limite de taxa")
+            try:
+                response = self._attempt(chunk, emit if sink else None, estimated_tokens)
+                self.rate_limiter.on_success()
+                return response
+            except openai.error.RateLimitError as e:
+                headers = {name.lower(): value for name, value in (getattr(e, 'headers', None) or {}).items()}
+                retry_after = self._header_number(headers, 'retry-after')
+                self.rate_limiter.on_rate_limited(
+                    retry_after,
+                    requests_limit=self._header_number(headers, 'x-ratelimit-limit-requests'),
+                    tokens_limit=self._header_number(headers, 'x-ratelimit-limit-tokens')
+                )
+                if emitted or rate_limited >= self.rate_limit_max_retries:
+                    raise OpenAIError(f"OpenAI API error (chunk {index + 1}): {str(e)}")
+                rate_limited += 1
+                self.logger.warning(
+                    f"Limite de taxa no chunk {index + 1} "
+                    f"(tentativa {rate_limited}/{self.rate_limit_max_retries}, Retry-After: {retry_after})"
+                )
+                # A pausa do Retry-After vale para todas as chamadas e é cumprida no acquire;
+                # o jitter evita que as chamadas pausadas voltem todas no mesmo instante
+                base_delay = retry_after if retry_after is not None else self.chunk_retry_delay
+                time.sleep(backoff_delay(rate_limited, base_delay, self.chunk_max_retry_delay))
+            except Exception as e:
+                # Não repetir uma transmissão que já entregou tokens
+                if emitted or attempt >= self.chunk_max_retries:
+                    raise OpenAIError(f"OpenAI API error (chunk {index + 1}): {str(e)}")
+                attempt += 1
+                self.logger.warning(
+                    f"Falha no chunk {index + 1} (tentativa {attempt}/{self.chunk_max_retries}): {str(e)}"
+                )
+                time.sleep(backoff_delay(attempt, self.chunk_retry_delay, self.chunk_max_retry_delay))
+    
+    def _attempt(self, chunk: str, on_token: Optional[Callable[[str], None]], estimated_tokens: int) -> str:
+        """Uma tentativa de chamada à API, com a duração registrada por agente e resultado"""
+        started_at = time.perf_counter()
+        status = 'error'
+        try:
+            if on_token:
+                response = self._call_api_stream(chunk, on_token)
+            else:
+                response = self._call_api(chunk, estimated_tokens)
+            status = 'ok'
+            return response
+        except openai.error.RateLimitError:
+            status = 'rate_limited'
+            raise
+        finally:
+            API_CALL_SECONDS.observe(time.perf_counter() - started_at, agent=current_agent(), status=status)
+    
+    @staticmethod
+    def _header_number(headers: Dict[str, str], name: str) -> Optional[float]:
+        """Lê um cabeçalho numérico de uma resposta de erro da API"""
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _call_api(self, content: str, estimated_tokens: int = 0) -> str:
+        """Executa uma chamada à API de chat e retorna o texto da resposta"""
+        response = self._create_completion(content)
+        
+        # Extrair resposta
+        text = response.choices[0].message.content
+        
+        # Corrigir a reserva de tokens com o consumo informado pela API
+        usage = response.get('usage') if isinstance(response, dict) else None
+        if usage and estimated_tokens:
+            self.rate_limiter.record_usage(estimated_tokens, int(usage.get('total_tokens', 0)))
+        self._record_tokens(content, text, usage)
+        
+        return text
+    
+    def _call_api_stream(self, content: str, on_token: Callable[[str], None]) -> str:
+        """Executa uma chamada transmitida, entregando cada token ao callback"""
+        parts = []
+        for chunk in self._create_completion(content, stream=True):
+            token = chunk.choices[0].delta.get('content')
+            if token:
+                parts.append(token)
+                on_token(token)
+        text = "".join(parts)
+        self._record_tokens(content, text)
+        return text
+    
+    def _record_tokens(self, content: str, text: str, usage: Optional[Dict] = None) -> None:
+        """Registra os tokens de uma chamada, informados pela API ou contados localmente"""
+        if usage:
+            prompt_tokens = int(usage.get('prompt_tokens', 0))
+            completion_tokens = int(usage.get('completion_tokens', 0))
+        else:
+            prompt_tokens = self.token_counter.count(content) + self.chunker.reserved_tokens
+            completion_tokens = self.token_counter.count(text or "")
+        agent = current_agent()
+        PROMPT_TOKENS.observe(prompt_tokens, agent=agent)
+        COMPLETION_TOKENS.observe(completion_tokens, agent=agent)
+    
+    def _create_completion(self, content: str, stream: bool = False):
+        """Chama o endpoint de chat com os parâmetros do modelo"""
+        return self.client.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": content}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=0.2,
+            top_p=0.95,
+            frequency_penalty=0,
+            presence_penalty=0,
+            stream=stream
+        )
+    
+    def close(self) -> None:
+        """Fecha as conexões do cliente do modelo"""
+        self.client.close()
+
+    def _create_code_prompt(self, prompt: str) -> str:
+        """Prepara o prompt de código para envio"""
+        return prompt.strip()
+    
+    def _format_code_blocks(self, text: str) -> str:
+        """Garante que os blocos de código da resposta estejam fechados"""
+        text = text.strip()
+        if len(re.findall(r"^```", text, flags=re.MULTILINE)) % 2 == 1:
+            text += "\n```"
+        return text
\ No newline at end of file
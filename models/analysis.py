@@ -10,6 +10,7 @@ class Analysis(db.Model):
     error_message = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
+    commit = db.Column(db.String(64), nullable=True)  # HEAD do projeto (Git) quando analisado
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
     
     def __repr__(self):
@@ -266,4 +266,15 @@ class TestIntegrationLayer(unittest.TestCase):
         try:
             self.integration_layer.validate_project_path(self.project_path)
         except ValueError:
-            self.fail("validate_project_path() lançou ValueError inesperadamente!")
\ No newline at end of file
+            self.fail("validate_project_path() lançou ValueError inesperadamente!")
+    
+    def test_process_request_streams_raw_response(self):
+        """Testa a entrega da resposta final ao callback de tokens"""
+        tokens = []
+        
+        response = self.integration_layer.process_request(
+            "chat", self.project_path, "Analise o código deste projeto", on_token=tokens.append
+        )
+        
+        self.assertEqual(response, "Análise de código concluída")
+        self.assertEqual(tokens, ["Análise de código concluída"])
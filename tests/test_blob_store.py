@@ -0,0 +1,58 @@
+# tests/test_blob_store.py
+import unittest
+from unittest.mock import MagicMock
+import os
+import tempfile
+from indexing.blob_store import BlobStore
+
+class TestBlobStore(unittest.TestCase):
+    """Testes para o armazenamento de conteúdo endereçado pelo hash"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def test_identical_content_stored_once(self):
+        """Testa a deduplicação, a contagem de referências e os artefatos derivados"""
+        store = BlobStore()
+        first = store.put("print('olá')\n")
+        second = store.put("print('olá')\n")
+        build = MagicMock(return_value=['símbolo'])
+
+        self.assertEqual(first, second)
+        self.assertEqual(store.references(first), 2)
+        self.assertEqual(store.derived(first, 'outline', build), ['símbolo'])
+        self.assertEqual(store.derived(second, 'outline', build), ['símbolo'])
+        build.assert_called_once_with("print('olá')\n")
+        stats = store.stats()
+        self.assertEqual((stats['blobs'], stats['deduplicated']), (1, 1))
+
+        store.release(first)
+        store.release(first)
+        self.assertEqual(store.references(first), 0)
+        self.assertEqual(store.get(first), "print('olá')\n")
+
+    def test_budget_evicts_unreferenced_first_and_spills_to_disk(self):
+        """Testa o despejo pelo limite de memória e o transbordo para o disco"""
+        store = BlobStore(self.temp_dir.name, memory_bytes=25, disk_bytes=25)
+        kept = store.put('a' * 10)
+        dropped = store.put('b' * 10)
+        store.release(dropped)
+        spilled = store.put('c' * 10)
+        store.put('d' * 10)
+
+        self.assertIsNone(store.get(dropped))
+        self.assertEqual(store.stats()['disk_blobs'], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, kept[:2], kept)))
+        self.assertEqual(store.get(kept), 'a' * 10)
+        self.assertEqual(store.get(spilled), 'c' * 10)
+
+        # Outro processo encontra os blobs gravados
+        self.assertEqual(BlobStore(self.temp_dir.name).get(spilled), 'c' * 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/test_cache_manager.py
+import unittest
+import json
+import tempfile
+from pathlib import Path
+from model.cache_manager import CacheManager
+
+class TestCacheManager(unittest.TestCase):
+    """Testes para a classe CacheManager"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def test_save_and_get(self):
+        """Testa gravação e leitura nos dois níveis"""
+        cache = CacheManager(self.cache_dir)
+        key = cache.get_cache_key("prompt")
+
+        self.assertIsNone(cache.get_from_cache(key))
+        cache.save_to_cache(key, "resposta")
+        self.assertEqual(cache.get_from_cache(key), "resposta")
+
+        # Entrada gravada no store de segmentos, sem um arquivo por chave
+        self.assertEqual(cache.store.get(key), "resposta".encode('utf-8'))
+        self.assertFalse((self.cache_dir / key[:2]).exists())
+
+        stats = cache.stats()
+        self.assertEqual(stats['memory_hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_disk_tier_survives_restart(self):
+        """Testa se uma nova instância encontra as entradas gravadas em disco"""
+        cache = CacheManager(self.cache_dir)
+        key = cache.get_cache_key("prompt")
+        cache.save_to_cache(key, "resposta")
+
+        reopened = CacheManager(self.cache_dir)
+        self.assertEqual(reopened.get_from_cache(key), "resposta")
+        self.assertEqual(reopened.stats()['disk_hits'], 1)
+
+    def test_entry_budget_evicts_least_recently_used(self):
+        """Testa a remoção LRU ao exceder o limite de entradas"""
+        cache = CacheManager(self.cache_dir, memory_entries=0, max_entries=2)
+        cache.save_to_cache('aa01', 'um')
+        cache.save_to_cache('bb02', 'dois')
+
+        # Acessar a primeira entrada a torna a mais recente
+        self.assertEqual(cache.get_from_cache('aa01'), 'um')
+        cache.save_to_cache('cc03', 'três')
+
+        self.assertEqual(cache.get_from_cache('aa01'), 'um')
+        self.assertIsNone(cache.get_from_cache('bb02'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertIsNone(cache.store.get('bb02'))
+
+    def test_byte_budget(self):
+        """Testa se o total em disco respeita o limite de bytes"""
+        cache = CacheManager(self.cache_dir, memory_entries=0, max_bytes=200)
+        for i in range(10):
+            cache.save_to_cache(f"{i:02d}key", "x" * 50)
+
+        stats = cache.stats()
+        self.assertLessEqual(stats['disk_bytes'], 200)
+        self.assertGreater(stats['evictions'], 0)
+
+    def test_ttl_expiration(self):
+        """Testa a expiração de entradas antigas"""
+        cache = CacheManager(self.cache_dir, ttl=60)
+        cache.save_to_cache('aa01', 'antiga')
+        cache._memory['aa01'] = ('antiga', 0)
+        cache._index['aa01'] = (cache._index['aa01'][0], 0)
+
+        self.assertIsNone(cache.get_from_cache('aa01'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_disk_deletes_run_outside_the_lock(self):
+        """Testa que remoções do disco (LRU e expiração) não seguram o lock do cache"""
+        cache = CacheManager(self.cache_dir, memory_entries=0, max_entries=1, ttl=60)
+        delete = cache.store.delete
+        locked = []
+
+        def checked_delete(key):
+            locked.append(cache._lock.locked())
+            return delete(key)
+
+        cache.store.delete = checked_delete
+        cache.save_to_cache('aa01', 'um')
+        cache.save_to_cache('bb02', 'dois')
+        cache._index['bb02'] = (cache._index['bb02'][0], 0)
+        self.assertIsNone(cache.get_from_cache('bb02'))
+
+        self.assertEqual(locked, [False, False])
+        self.assertIsNone(cache.store.get('aa01'))
+        self.assertIsNone(cache.store.get('bb02'))
+
+    def test_migrates_file_layouts(self):
+        """Testa a migração dos layouts antigos de um arquivo JSON por chave"""
+        with open(self.cache_dir / 'abcdef.json', 'w', encoding='utf-8') as f:
+            json.dump({'response': 'legada'}, f)
+        (self.cache_dir / 'cd').mkdir()
+        with open(self.cache_dir / 'cd' / 'cd0123.json', 'w', encoding='utf-8') as f:
+            json.dump({'response': 'particionada'}, f)
+
+        cache = CacheManager(self.cache_dir)
+        self.assertEqual(cache.get_from_cache('abcdef'), 'legada')
+        self.assertEqual(cache.get_from_cache('cd0123'), 'particionada')
+        self.assertFalse((self.cache_dir / 'abcdef.json').exists())
+        self.assertFalse((self.cache_dir / 'cd').exists())
+
+    def test_sees_entries_written_by_another_instance(self):
+        """Testa o compartilhamento do store entre processos (instâncias distintas)"""
+        first = CacheManager(self.cache_dir)
+        second = CacheManager(self.cache_dir, refresh_interval=0)
+
+        first.save_to_cache('aa01', 'de outro processo')
+
+        self.assertEqual(second.get_from_cache('aa01'), 'de outro processo')
+        self.assertEqual(second.stats()['disk_entries'], 1)
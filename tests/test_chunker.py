@@ -0,0 +1,79 @@
+# tests/test_chunker.py
+import unittest
+from model.chunker import PromptChunker, TokenCounter, split_segments
+
+class TestPromptChunker(unittest.TestCase):
+    """Testes para a divisão de prompts por tokens"""
+    
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.counter = TokenCounter()
+    
+    def test_split_segments_keeps_file_blocks_whole(self):
+        """Testa se blocos de arquivo não são separados do seu código"""
+        prompt = (
+            "Analise o código\n"
+            "Formato da resposta:\n[caminho/do/arquivo.ext]\nDescrição da mudança\n"
+            "Arquivo: app.py\nLinguagem: Python\n\n```python\nprint('a')\n```\n\n"
+            "[static/main.js]\n```\nconsole.log('b')\n```\n"
+            "Por favor, forneça sugestões\n"
+        )
+        
+        segments = split_segments(prompt)
+        files = [s for s in segments if s.kind == 'file']
+        
+        self.assertEqual([s.path for s in files], ['app.py', 'static/main.js'])
+        self.assertIn("[caminho/do/arquivo.ext]", segments[0].text)
+        self.assertIn("print('a')\n```", files[0].text)
+        self.assertEqual("".join(s.text for s in segments), prompt)
+    
+    def test_parts_respect_budget_and_file_boundaries(self):
+        """Testa se as partes cabem no limite sem cortar arquivos pequenos"""
+        files = "".join(
+            f"Arquivo: m{i}.py\nLinguagem: Python\n\n```python\n" + "x = 1\n" * 20 + "```\n\n"
+            for i in range(6)
+        )
+        chunker = PromptChunker(self.counter, max_tokens=150)
+        
+        instructions, groups = chunker.split_groups(f"Analise\n{files}", template_tokens=10)
+        parts = [chunker.join(group) for group in groups]
+        
+        self.assertEqual(instructions, "Analise")
+        self.assertGreater(len(parts), 1)
+        for part in parts:
+            self.assertLessEqual(self.counter.count(part), 150 - 10 - self.counter.count(instructions))
+            self.assertEqual(part.count("Arquivo:"), part.count("```") // 2)
+    
+    def test_oversized_file_is_split_with_fences(self):
+        """Testa a divisão de um arquivo maior que o limite"""
+        prompt = "Arquivo: big.py\n```python\n" + "".join(f"linha_{i} = {i}\n" for i in range(200)) + "```\n"
+        chunker = PromptChunker(self.counter, max_tokens=100)
+        
+        parts = [chunker.join(group) for group in chunker.group(split_segments(prompt), 100)]
+        
+        self.assertGreater(len(parts), 1)
+        for part in parts:
+            self.assertTrue(part.startswith("Arquivo: big.py\n```python\n"))
+            self.assertTrue(part.endswith("```\n"))
+            self.assertLessEqual(self.counter.count(part), 100)
+    
+    def test_content_defined_groups_are_stable_under_edits(self):
+        """Testa se editar um arquivo altera apenas a parte que o contém"""
+        def render(contents):
+            return "".join(
+                f"Arquivo: m{i}.py\n```python\n{content}```\n\n"
+                for i, content in enumerate(contents)
+            )
+        
+        contents = [f"valor_{i} = {i}\n" for i in range(40)]
+        chunker = PromptChunker(self.counter, max_tokens=10000)
+        before = chunker.group(split_segments(render(contents)), 10000, group_size=4)
+        
+        contents[17] = "valor_17 = 'editado'\n"
+        after = chunker.group(split_segments(render(contents)), 10000, group_size=4)
+        
+        digests_before = {tuple(s.digest for s in group) for group in before}
+        digests_after = {tuple(s.digest for s in group) for group in after}
+        self.assertGreater(len(before), 1)
+        self.assertLessEqual(len(digests_after - digests_before), 2)
+        self.assertEqual(sum(s.kind == 'file' for group in after for s in group), 40)
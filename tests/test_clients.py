@@ -0,0 +1,93 @@
+# tests/test_clients.py
+import unittest
+from unittest.mock import patch
+import os
+import tempfile
+import openai
+from benchmarks.stub_server import StubServer, StubConfig
+from model.clients import HTTPModelClient, ModelClient, OpenAISDKClient, create_client
+from model.transformer_model import TransformerModel
+
+MESSAGES = [{'role': 'user', 'content': 'Analise o projeto'}]
+
+class EchoClient(ModelClient):
+    """Backend local usado para testar a seleção por MODEL_CLIENT"""
+
+    def __init__(self, **settings):
+        self.settings = settings
+
+class TestHTTPModelClient(unittest.TestCase):
+    """Testes para o cliente HTTP com pool de conexões"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        config = StubConfig(latency='constant:0', tokens_per_second=0, completion_tokens=5, seed=1)
+        self.server = StubServer(config).start()
+        self.client = HTTPModelClient('test-key', api_base=self.server.api_base)
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.client.close()
+        self.server.stop()
+
+    def test_completion_reuses_connection(self):
+        """Testa respostas no formato do SDK com uma única conexão para várias chamadas"""
+        for _ in range(3):
+            response = self.client.create(MESSAGES, model='stub', max_tokens=10)
+            self.assertEqual(len(response.choices[0].message.content.split()), 5)
+            self.assertEqual(response.get('usage')['completion_tokens'], 5)
+
+        self.assertEqual(self.client.stats(), {'requests': 3, 'connections': 1})
+
+    def test_stream(self):
+        """Testa a leitura da resposta transmitida"""
+        tokens = [
+            chunk.choices[0].delta.get('content')
+            for chunk in self.client.create(MESSAGES, model='stub', stream=True)
+        ]
+
+        self.assertEqual(len("".join(token for token in tokens if token).split()), 5)
+
+    def test_rate_limit_error_keeps_headers(self):
+        """Testa a conversão do 429 na exceção do SDK, com o Retry-After"""
+        self.server.config.rate_limit_rate = 1.0
+        self.server.config.retry_after = 2
+
+        with self.assertRaises(openai.error.RateLimitError) as context:
+            self.client.create(MESSAGES, model='stub')
+
+        self.assertEqual(context.exception.headers['retry-after'], '2')
+        self.assertEqual(context.exception.http_status, 429)
+
+    def test_model_uses_pooled_client(self):
+        """Testa o TransformerModel chamando o servidor pelo backend padrão"""
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(os.environ, {
+            'OPENAI_API_KEY': 'test-key',
+            'OPENAI_API_BASE': self.server.api_base,
+            'CACHE_DIR': cache_dir
+        }):
+            os.environ.pop('MODEL_CLIENT', None)
+            model = TransformerModel()
+            try:
+                self.assertIsInstance(model.client, HTTPModelClient)
+                self.assertEqual(len(model.generate("Analise o projeto").split()), 5)
+            finally:
+                model.close()
+
+class TestCreateClient(unittest.TestCase):
+    """Testes para a seleção do backend"""
+
+    def test_backend_selection(self):
+        """Testa backends nomeados, indicados por caminho e desconhecidos"""
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key', 'MODEL_TIMEOUT': '5'}):
+            self.assertIsInstance(create_client('openai'), OpenAISDKClient)
+
+            echo = create_client(f"{__name__}:EchoClient")
+            self.assertIsInstance(echo, EchoClient)
+            self.assertEqual(echo.settings['timeout'], 5.0)
+
+            with self.assertRaises(ValueError):
+                create_client('inexistente')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_database.py
+import unittest
+import os
+import tempfile
+from flask import Flask
+from flask_migrate import upgrade
+from sqlalchemy import inspect, text
+from database import db, init_db
+from models.user import User
+from models.project import Project
+from models.analysis import Analysis
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+class TestMigrations(unittest.TestCase):
+    """Testes para as migrações de um banco já existente"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(self.temp_dir.name, 'app.db')
+        init_db(self.app)
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        with self.app.app_context():
+            db.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def _columns(self):
+        return {column['name'] for column in inspect(db.engine).get_columns('analysis')}
+
+    def test_commit_column_is_added_to_existing_table(self):
+        """Testa que a migração cria a coluna commit em uma tabela analysis antiga"""
+        with self.app.app_context():
+            db.create_all()
+            with db.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE analysis DROP COLUMN \"commit\""))
+
+            upgrade(directory=MIGRATIONS_DIR)
+            self.assertIn('commit', self._columns())
+
+            user = User(username='ana', email='ana@example.com', password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            project = Project(name='p', path='/tmp/p', user_id=user.id)
+            db.session.add(project)
+            db.session.flush()
+            db.session.add(Analysis(type='backend', project_id=project.id, commit='abc123'))
+            db.session.commit()
+            self.assertEqual(Analysis.query.one().commit, 'abc123')
+
+    def test_migration_accepts_tables_created_by_create_all(self):
+        """Testa que a migração não falha quando o create_all já criou a coluna"""
+        with self.app.app_context():
+            db.create_all()
+            upgrade(directory=MIGRATIONS_DIR)
+            upgrade(directory=MIGRATIONS_DIR)
+            self.assertIn('commit', self._columns())
+
+if __name__ == '__main__':
+    unittest.main()
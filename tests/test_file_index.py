@@ -0,0 +1,101 @@
+# tests/test_file_index.py
+import unittest
+from unittest.mock import patch
+import os
+import tempfile
+import time
+from indexing.file_index import FileIndex, index_path
+from indexing.scanner import ProjectScanner
+
+class TestFileIndex(unittest.TestCase):
+    """Testes para o índice persistente de arquivos"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = os.path.join(self.temp_dir.name, 'project')
+        self.index_dir = os.path.join(self.temp_dir.name, 'index')
+        for relative_path in ('app.py', 'api/routes.py', 'api/models.py', 'docs/readme.md'):
+            self._write(relative_path, f"# {relative_path}\n")
+        # Diretórios e arquivos "antigos", fora da janela de mtime ambíguo
+        old = time.time() - 60
+        for directory, _, names in os.walk(self.project_path):
+            for name in names:
+                os.utime(os.path.join(directory, name), (old, old))
+            os.utime(directory, (old, old))
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        for scanner in getattr(self, 'scanners', []):
+            for index in scanner._indexes.values():
+                index.close()
+        self.temp_dir.cleanup()
+
+    def _write(self, relative_path, content):
+        full_path = os.path.join(self.project_path, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(content)
+
+    def _scanner(self):
+        scanner = ProjectScanner(use_index=True, index_dir=self.index_dir)
+        self.scanners = getattr(self, 'scanners', []) + [scanner]
+        return scanner
+
+    def test_warm_scan_reuses_directory_listings(self):
+        """Testa que um novo processo reaproveita o índice e só lista o que mudou"""
+        cold = self._scanner().walk(self.project_path)
+        self.assertTrue(os.path.exists(index_path(self.index_dir, self.project_path)))
+
+        with patch('indexing.scanner.os.scandir', wraps=os.scandir) as scandir:
+            warm = self._scanner().walk(self.project_path)
+        self.assertEqual(scandir.call_count, 0)
+        self.assertEqual([f.relative_path for f in warm.files], [f.relative_path for f in cold.files])
+        self.assertEqual(warm.files[0].inode, cold.files[0].inode)
+
+        self._write('api/auth.py', "# auth\n")
+        os.remove(os.path.join(self.project_path, 'docs', 'readme.md'))
+        with patch('indexing.scanner.os.scandir', wraps=os.scandir) as scandir:
+            scan = self._scanner().walk(self.project_path)
+        listed = {os.path.relpath(call.args[0], self.project_path) for call in scandir.call_args_list}
+        self.assertEqual(listed, {'api', 'docs'})
+        self.assertEqual(sorted(f.relative_path.replace(os.sep, '/') for f in scan.files),
+                         ['api/auth.py', 'api/models.py', 'api/routes.py', 'app.py'])
+        # Diretórios alterados agora estão na janela de mtime ambíguo e saem do índice
+        self.assertEqual(sorted(scan.index.snapshot()), [''])
+
+    def test_only_changed_directories_are_rewritten(self):
+        """Testa que a listagem só é regravada para diretórios alterados"""
+        scan = self._scanner().walk(self.project_path)
+        before = scan.index.snapshot()
+
+        self._write('api/auth.py', "# auth\n")
+        os.utime(os.path.join(self.project_path, 'api'), (time.time() - 30, time.time() - 30))
+        with patch.object(FileIndex, 'update', autospec=True, side_effect=FileIndex.update) as update:
+            scan = self._scanner().walk(self.project_path)
+        self.assertEqual([path for path, _ in update.call_args.args[1]], ['api/'])
+
+        after = scan.index.snapshot()
+        self.assertIn(('auth.py', 'f'), after['api/'].entries)
+        self.assertEqual(after['docs/'], before['docs/'])
+
+    def test_schema_mismatch_rebuilds_index(self):
+        """Testa que um índice de outra versão é descartado"""
+        self._scanner().walk(self.project_path)
+        db_path = index_path(self.index_dir, self.project_path)
+        index = FileIndex(db_path, self.project_path)
+        index._conn.execute("UPDATE meta SET value = '2' WHERE key = 'schema_version'")
+        index._conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+        index.close()
+
+        index = FileIndex(db_path, self.project_path)
+        self.assertEqual(index.stats(), {'directories': 0})
+        self.assertIsNone(index._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'files'"
+        ).fetchone())
+        self._scanner().walk(self.project_path)
+        self.assertEqual(index.stats()['directories'], 3)
+        index.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_file_manager.py
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+import threading
+from indexing.blob_store import BlobStore
+from indexing.watcher import Change, InotifyWatcher
+from integration.integration_layer import FileManager
+
+class TestFileManager(unittest.TestCase):
+    """Testes para a invalidação do cache de arquivos"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = self.temp_dir.name
+        for relative_path in ('app.py', 'api/routes.py', 'docs/readme.md'):
+            self._write(relative_path, f"# {relative_path}\n")
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def _write(self, relative_path, content):
+        full_path = os.path.join(self.project_path, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(content)
+
+    def test_poll_mode_detects_changes(self):
+        """Testa que o modo padrão confere o mtime antes de usar o cache"""
+        manager = FileManager(watch_mode='poll')
+        self.assertEqual(manager.get_file_content(self.project_path, 'app.py'), "# app.py\n")
+
+        self._write('app.py', "print('versão nova')\n")
+        self.assertEqual(manager.get_file_content(self.project_path, 'app.py'), "print('versão nova')\n")
+
+    def test_identical_files_share_one_blob(self):
+        """Testa que arquivos iguais em projetos diferentes são guardados uma vez"""
+        fork = tempfile.TemporaryDirectory()
+        self.addCleanup(fork.cleanup)
+        for relative_path in ('app.py', 'api/routes.py', 'docs/readme.md'):
+            full_path = os.path.join(fork.name, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w') as f:
+                f.write(f"# {relative_path}\n")
+        store = BlobStore()
+        manager = FileManager(watch_mode='poll', blob_store=store)
+
+        self.assertEqual(manager.get_files_with_content(self.project_path),
+                         manager.get_files_with_content(fork.name))
+        self.assertEqual(store.stats()['blobs'], 3)
+        blob = store.digest("# app.py\n")
+        self.assertEqual(store.references(blob), 2)
+
+        self._write('app.py', "print('versão nova')\n")
+        manager.get_file_content(self.project_path, 'app.py')
+        self.assertEqual(store.references(blob), 1)
+
+    @unittest.skipUnless(InotifyWatcher.available(), "inotify indisponível")
+    def test_cache_changes_wait_for_invalidation(self):
+        """Testa que gravações no cache esperam uma invalidação em andamento"""
+        manager = FileManager(watch_mode='poll')
+        manager.get_file_content(self.project_path, 'app.py')
+        key = (os.path.abspath(self.project_path), 'api/routes.py')
+
+        with manager._lock:
+            writer = threading.Thread(target=manager._store, args=(key, {'blob': 'x', 'mtime': 0, 'size': 0}))
+            writer.start()
+            writer.join(0.1)
+            self.assertTrue(writer.is_alive())
+            self.assertNotIn(key, manager.file_cache)
+        writer.join()
+        self.assertIn(key, manager.file_cache)
+
+        # Eventos perdidos: a invalidação, feita sob a trava, esvazia o cache do projeto
+        with manager._lock:
+            manager._invalidate(os.path.abspath(self.project_path), Change(None, False))
+        self.assertEqual(manager.file_cache, {})
+
+    def test_inotify_mode_evicts_only_changed_entries(self):
+        """Testa que só os arquivos alterados são relidos e a lista acompanha o disco"""
+        manager = FileManager(watch_mode='inotify')
+        self.addCleanup(manager.close)
+        files = manager.get_files_with_content(self.project_path)
+        self.assertEqual(len(files), 3)
+
+        # Sem alterações, nenhum acesso ao disco
+        with patch('integration.integration_layer.os.stat') as stat, \
+                patch('integration.integration_layer.SCANNER.walk') as walk:
+            self.assertEqual(manager.get_files_with_content(self.project_path), files)
+        stat.assert_not_called()
+        walk.assert_not_called()
+
+        self._write('app.py', "print('versão nova')\n")
+        self._write('api/auth.py', "# auth\n")
+        shutil.rmtree(os.path.join(self.project_path, 'docs'))
+        with patch('builtins.open', wraps=open) as opened:
+            files = manager.get_files_with_content(self.project_path)
+        self.assertEqual(sorted(files), sorted(['app.py', os.path.join('api', 'auth.py'),
+                                                os.path.join('api', 'routes.py')]))
+        self.assertEqual(files['app.py'], "print('versão nova')\n")
+        read = {os.path.relpath(call.args[0], self.project_path) for call in opened.call_args_list
+                if str(call.args[0]).endswith(('.py', '.md'))}
+        self.assertEqual(read, {'app.py', os.path.join('api', 'auth.py')})
+
+        # Diretório criado depois do início da observação também é acompanhado
+        self._write('web/main.js', "// main\n")
+        manager.get_files_with_content(self.project_path)
+        self._write('web/main.js', "// alterado\n")
+        self.assertEqual(manager.get_file_content(self.project_path, os.path.join('web', 'main.js')),
+                         "// alterado\n")
+
+if __name__ == '__main__':
+    unittest.main()
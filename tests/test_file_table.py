@@ -0,0 +1,81 @@
+# tests/test_file_table.py
+import unittest
+import os
+import tempfile
+from indexing.file_table import FileRow
+from indexing.scanner import ProjectScanner
+
+def native(relative_path):
+    return relative_path.replace('/', os.sep)
+
+class TestFileTable(unittest.TestCase):
+    """Testes para a tabela colunar com os metadados dos arquivos"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = self.temp_dir.name
+        for relative_path in ('app.py', 'README.md', 'api/routes.py', 'api/schema.sql', 'web/index.js',
+                              'web/vendor/lib.py', 'tools/vendor', 'docs/guide.md'):
+            full_path = os.path.join(self.project_path, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w', encoding='utf-8') as f:
+                f.write('x')
+        self.table = ProjectScanner(use_index=False).walk(self.project_path).table
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def _paths(self, rows):
+        return [row['relative_path'] for row in rows]
+
+    def test_codes_are_shared_by_extension_and_directory(self):
+        """Testa que extensões e diretórios são guardados uma vez cada"""
+        self.assertEqual(len(self.table), 8)
+        self.assertEqual(sorted(self.table.extensions), ['', '.js', '.md', '.py', '.sql'])
+        self.assertEqual(sorted(self.table.directories),
+                         sorted(['', native('api/'), native('docs/'), native('tools/'), native('web/'),
+                                 native('web/vendor/')]))
+        self.assertEqual(self.table.extension.dtype.itemsize, 4)
+        self.assertEqual(int(self.table.size.sum()), 8)
+
+    def test_vectorised_filters(self):
+        """Testa os filtros por extensão, diretório, nome e componentes ignorados"""
+        python = self.table.extension_mask({'.py'})
+
+        self.assertEqual(self._paths(self.table.rows(python)),
+                         [native('api/routes.py'), 'app.py', native('web/vendor/lib.py')])
+        self.assertEqual(self._paths(self.table.rows(python & self.table.excluding({'vendor'}))),
+                         [native('api/routes.py'), 'app.py'])
+        self.assertNotIn(native('tools/vendor'), self._paths(self.table.rows(self.table.excluding({'vendor'}))))
+        self.assertEqual(self._paths(self.table.rows(self.table.directory_mask(lambda d: d.startswith('api')))),
+                         [native('api/routes.py'), native('api/schema.sql')])
+        self.assertEqual(self._paths(self.table.rows(self.table.named(['README.md']))), ['README.md'])
+        self.assertEqual(self._paths(self.table.rows(self.table.file_mask(lambda file: 'index' in file.name))),
+                         [native('web/index.js')])
+
+    def test_rows_behave_like_the_agent_dicts(self):
+        """Testa que as descrições funcionam como os dicionários dos agentes"""
+        languages = {'.py': 'Python', '.js': 'JavaScript'}
+        rows = self.table.rows(self.table.extension_mask(languages), 'language', languages, 'Unknown')
+        routes = rows[0]
+
+        self.assertIsInstance(routes, FileRow)
+        self.assertFalse(hasattr(routes, '__dict__'))
+        self.assertEqual(dict(routes), {
+            'path': os.path.join(self.project_path, native('api/routes.py')), 'name': 'routes.py',
+            'extension': '.py', 'relative_path': native('api/routes.py'), 'language': 'Python'
+        })
+        self.assertEqual(routes.get('type', 'Other'), 'Other')
+        self.assertEqual(dict(routes, relevance=1.5)['relevance'], 1.5)
+        self.assertIs(rows[0].fields, rows[1].fields)
+
+        docs = self.table.tagged('type', [(self.table.extension_mask({'.md'}), 'Documentation'),
+                                          (self.table.directory_mask(lambda d: 'docs' in d), 'Docs')])
+        self.assertEqual([(row['relative_path'], row['type']) for row in docs],
+                         [('README.md', 'Documentation'), (native('docs/guide.md'), 'Documentation'),
+                          (native('docs/guide.md'), 'Docs')])
+
+if __name__ == '__main__':
+    unittest.main()
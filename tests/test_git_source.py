@@ -0,0 +1,97 @@
+# tests/test_git_source.py
+import unittest
+from unittest.mock import MagicMock
+import os
+import shutil
+import subprocess
+import tempfile
+from agents.backend_agent import BackendAgent
+from indexing.git_source import changed_files, find_git_dir, head_commit, read_index
+from indexing.scanner import ProjectScanner
+from integration.integration_layer import IntegrationLayer
+
+@unittest.skipUnless(shutil.which('git'), "git indisponível")
+class TestGitSource(unittest.TestCase):
+    """Testes para a listagem pelo índice do Git e as alterações desde um commit"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = self.temp_dir.name
+        self._git('init', '-q')
+        for relative_path in ('app.py', 'api/routes.py', 'models/user.py', 'docs/guia de uso.md',
+                              '.gitignore', 'node_modules/lib/index.js'):
+            self._write(relative_path, f"# {relative_path}\n")
+        self._write('.gitignore', "*.log\n")
+        self._write('debug.log', "ignorado\n")
+        self._git('add', '-A')
+        self._git('add', '-f', 'node_modules/lib/index.js')
+        self._git('commit', '-q', '-m', 'inicial')
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def _git(self, *args):
+        return subprocess.run(
+            ['git', '-C', self.project_path, '-c', 'user.name=Teste', '-c', 'user.email=teste@example.com',
+             *args], check=True, stdout=subprocess.PIPE
+        ).stdout.decode()
+
+    def _write(self, relative_path, content):
+        full_path = os.path.join(self.project_path, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(content)
+
+    def test_index_matches_ls_files(self):
+        """Testa a leitura do índice nas versões 2 e 4"""
+        expected = self._git('ls-files', '-s', '-z').split('\0')
+        expected = sorted((line.split('\t')[1], line.split()[1]) for line in expected if line)
+        git_dir = find_git_dir(self.project_path)
+
+        for version in ('2', '4'):
+            self._git('update-index', '--index-version', version)
+            entries = read_index(git_dir)
+            self.assertEqual(sorted((entry.path, entry.sha) for entry in entries), expected)
+
+        self.assertEqual(head_commit(self.project_path), self._git('rev-parse', 'HEAD').strip())
+
+    def test_scanner_lists_tracked_files(self):
+        """Testa a varredura pelo índice, sem arquivos ignorados ou não rastreados"""
+        self._write('novo.py', "# não rastreado\n")
+        scan = ProjectScanner(source='git').walk(self.project_path)
+
+        self.assertEqual([file.relative_path.replace(os.sep, '/') for file in scan.files],
+                         ['.gitignore', 'api/routes.py', 'app.py', 'docs/guia de uso.md', 'models/user.py'])
+        self.assertEqual(scan.files[2].size, len("# app.py\n"))
+
+    def test_delta_analyses_only_changed_files(self):
+        """Testa as alterações desde o commit e a análise só desses arquivos"""
+        commit = head_commit(self.project_path)
+        self._write('api/routes.py', "# alterado\n")
+        self._write('api/auth.py', "# novo\n")
+        os.remove(os.path.join(self.project_path, 'models', 'user.py'))
+
+        changed = changed_files(self.project_path, commit)
+        self.assertEqual(changed, {os.path.join('api', 'routes.py'), os.path.join('api', 'auth.py'),
+                                   os.path.join('models', 'user.py')})
+        self.assertIsNone(changed_files(self.project_path, '0' * 40))
+
+        model = MagicMock()
+        model.generate.return_value = "ok"
+        backend = BackendAgent(model)
+        analyzer = MagicMock()
+        analyzer.analyze_request.return_value = {'agents_to_use': ['backend']}
+        layer = IntegrationLayer(code_analysis_agent=MagicMock(), project_improvement_agent=MagicMock(),
+                                 backend_agent=backend, request_analyzer_agent=analyzer)
+
+        layer.process_request("chat", self.project_path, "Revise as mudanças", changed_files=changed)
+        prompt = model.generate.call_args.args[0]
+        self.assertIn('auth.py', prompt)
+        self.assertNotIn('app.py', prompt)
+        self.assertEqual(layer.process_request("chat", self.project_path, "Revise", changed_files=set()),
+                         "Nenhum arquivo alterado desde a última análise.")
+
+if __name__ == '__main__':
+    unittest.main()
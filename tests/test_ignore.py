@@ -0,0 +1,40 @@
+# tests/test_ignore.py
+import unittest
+from indexing.ignore import IgnoreFile, IgnoreRules
+
+class TestIgnoreRules(unittest.TestCase):
+    """Testes para os padrões de exclusão no formato do .gitignore"""
+
+    def test_patterns(self):
+        """Testa padrões soltos, ancorados, de diretório e com **"""
+        rules = IgnoreFile('', [
+            '# comentário', '', '*.log', '/build', 'dist/', 'docs/**/*.tmp', '**/cache', 'file[0-9].txt'
+        ])
+
+        self.assertTrue(rules.match('app.log', False))
+        self.assertTrue(rules.match('src/deep/app.log', False))
+        self.assertTrue(rules.match('build', True))
+        self.assertIsNone(rules.match('src/build', True))
+        self.assertTrue(rules.match('web/dist', True))
+        self.assertIsNone(rules.match('web/dist', False))
+        self.assertTrue(rules.match('docs/a/b/x.tmp', False))
+        self.assertTrue(rules.match('docs/x.tmp', False))
+        self.assertTrue(rules.match('a/b/cache', True))
+        self.assertTrue(rules.match('file7.txt', False))
+        self.assertIsNone(rules.match('fileA.txt', False))
+        self.assertIsNone(rules.match('app.py', False))
+
+    def test_negation_and_nested_precedence(self):
+        """Testa a reinclusão com ! e a precedência do arquivo mais profundo"""
+        root = IgnoreFile('', ['*.json', '!package.json'])
+        nested = IgnoreFile('web', ['package.json', 'local/'])
+        rules = IgnoreRules().child(root).child(nested)
+
+        self.assertTrue(rules.ignored('data.json', False))
+        self.assertFalse(rules.ignored('package.json', False))
+        self.assertTrue(rules.ignored('web/package.json', False))
+        self.assertTrue(rules.ignored('web/src/local', True))
+        self.assertFalse(rules.ignored('api/local', True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# tests/test_import_graph.py
+import unittest
+from unittest.mock import MagicMock
+import os
+import tempfile
+from agents.backend_agent import BackendAgent
+from indexing.import_graph import ImportGraph, focus_files, mentioned_files
+from indexing.scanner import ProjectScanner
+from integration.integration_layer import IntegrationLayer
+
+def native(relative_path):
+    return relative_path.replace('/', os.sep)
+
+class TestImportGraph(unittest.TestCase):
+    """Testes para o grafo de imports entre os arquivos do projeto"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = self.temp_dir.name
+        self._write('app.py', "import logging\nprint('app')\n")
+        self._write('api/__init__.py', "from .routes import router\n")
+        self._write('api/routes.py', "from services import billing\nfrom ..models.user import User\n"
+                                     "from models.user import User\n")
+        self._write('services/__init__.py', "")
+        self._write('services/billing.py', "def charge():\n    from .taxes import rate\n")
+        self._write('services/taxes.py', "RATE = 0.1\n")
+        self._write('models/user.py', "class User:\n    pass\n")
+        self._write('src/core/config.py', "DEBUG = False\n")
+        self._write('web/main.ts', "import { api } from './lib/api.js';\nimport React from 'react';\n"
+                                   "const util = require('./util');\n")
+        self._write('web/lib/api.ts', "export * from '../shared';\n")
+        self._write('web/shared/index.ts', "export const x = 1;\n")
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def _write(self, relative_path, content):
+        full_path = os.path.join(self.project_path, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _graph(self):
+        graph = ImportGraph()
+        graph.update(ProjectScanner().walk(self.project_path).files)
+        return graph
+
+    def test_python_and_script_imports_are_resolved(self):
+        """Testa imports absolutos, relativos, de submódulos e de JS/TS"""
+        graph = self._graph()
+
+        self.assertEqual(graph.imports[native('api/routes.py')],
+                         {native('services/billing.py'), native('models/user.py')})
+        self.assertEqual(graph.imports[native('services/billing.py')], {native('services/taxes.py')})
+        self.assertEqual(graph.imports[native('api/__init__.py')], {native('api/routes.py')})
+        self.assertEqual(graph.imports[native('app.py')], set())
+        self.assertEqual(graph.imports[native('web/main.ts')], {native('web/lib/api.ts')})
+        self.assertEqual(graph.imports[native('web/lib/api.ts')], {native('web/shared/index.ts')})
+        self.assertEqual(graph.importers[native('models/user.py')], {native('api/routes.py')})
+
+    def test_neighbourhood_and_incremental_update(self):
+        """Testa a vizinhança por distância e a atualização só do que mudou"""
+        graph = self._graph()
+
+        self.assertEqual(graph.neighbourhood([native('services/billing.py')], hops=2), [
+            (native('services/billing.py'), 0),
+            (native('api/routes.py'), 1),
+            (native('services/taxes.py'), 1),
+            (native('api/__init__.py'), 2),
+            (native('models/user.py'), 2),
+        ])
+        self.assertEqual(graph.neighbourhood([native('services/billing.py')], hops=1, limit=2),
+                         [(native('services/billing.py'), 0), (native('api/routes.py'), 1)])
+
+        # Um arquivo novo passa a receber o import que antes não tinha destino
+        self._write('web/util.ts', "export default 1;\n")
+        self.assertEqual(graph.update(ProjectScanner().walk(self.project_path).files), 1)
+        self.assertIn(native('web/util.ts'), graph.imports[native('web/main.ts')])
+
+        # Sem o submódulo, "from .taxes import rate" aponta para o pacote
+        os.remove(os.path.join(self.project_path, 'services', 'taxes.py'))
+        self.assertEqual(graph.update(ProjectScanner().walk(self.project_path).files), 1)
+        self.assertEqual(graph.imports[native('services/billing.py')], {native('services/__init__.py')})
+
+    def test_requests_citing_files_get_focused_context(self):
+        """Testa os arquivos citados na mensagem e o prompt com a vizinhança deles"""
+        paths = [file.relative_path for file in ProjectScanner().walk(self.project_path).files]
+        self.assertEqual(sorted(mentioned_files(paths, "Revise api/routes.py, billing.py e core.config.")),
+                         sorted([native('api/routes.py'), native('services/billing.py'),
+                                 native('src/core/config.py')]))
+        self.assertEqual(mentioned_files(paths, "Revise o app e o main"), [])
+
+        model = MagicMock()
+        model.generate.return_value = "ok"
+        analyzer = MagicMock()
+        analyzer.analyze_request.return_value = {'agents_to_use': ['backend']}
+        layer = IntegrationLayer(code_analysis_agent=MagicMock(), project_improvement_agent=MagicMock(),
+                                 backend_agent=BackendAgent(model), request_analyzer_agent=analyzer)
+
+        layer.process_request("chat", self.project_path, "Como o services/billing.py calcula as taxas?")
+        prompt = model.generate.call_args.args[0]
+        self.assertIn('taxes.py', prompt)
+        self.assertIn('routes.py', prompt)
+        self.assertNotIn('app.py', prompt)
+
+    def test_files_outside_the_graph_and_project_wide_requests_are_not_focused(self):
+        """Testa que só arquivos ligados no grafo restringem o contexto, e não em pedidos gerais"""
+        self._write('README.md', "# Projeto\n")
+        self.assertEqual(focus_files(self.project_path, "Melhore o README.md"), None)
+        self.assertEqual(focus_files(self.project_path, "Revise o app.py"), None)
+        self.assertEqual(focus_files(self.project_path, "Revise o services/billing.py e o README.md"), None)
+        self.assertEqual(focus_files(self.project_path, "Revise todo o projeto começando por services/billing.py"),
+                         None)
+        self.assertIn(native('services/taxes.py'), focus_files(self.project_path, "Revise o services/billing.py"))
+
+        model = MagicMock()
+        model.generate.return_value = "ok"
+        analyzer = MagicMock()
+        analyzer.analyze_request.return_value = {'agents_to_use': ['backend']}
+        layer = IntegrationLayer(code_analysis_agent=MagicMock(), project_improvement_agent=MagicMock(),
+                                 backend_agent=BackendAgent(model), request_analyzer_agent=analyzer)
+
+        layer.process_request("chat", self.project_path, "Melhore o README.md")
+        self.assertIn('app.py', model.generate.call_args.args[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_metrics.py
+import unittest
+from unittest.mock import patch
+import os
+from flask import Flask
+from model.metrics import MetricsRegistry, REGISTRY, agent_context, current_agent
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Testes para o registro de métricas"""
+    
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.registry = MetricsRegistry()
+    
+    def test_counter_and_histogram_render(self):
+        """Testa a exportação no formato texto do Prometheus"""
+        calls = self.registry.counter('calls_total', 'Chamadas', ['agent'])
+        latency = self.registry.histogram('latency_seconds', 'Latência', ['agent'], buckets=(0.1, 1))
+        
+        calls.inc(agent='backend')
+        calls.inc(2, agent='backend')
+        latency.observe(0.05, agent='backend')
+        latency.observe(0.5, agent='backend')
+        latency.observe(5, agent='backend')
+        
+        text = self.registry.render()
+        
+        self.assertIn('# TYPE calls_total counter', text)
+        self.assertIn('calls_total{agent="backend"} 3', text)
+        self.assertIn('latency_seconds_bucket{agent="backend",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{agent="backend",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{agent="backend",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{agent="backend"} 3', text)
+        self.assertIn('latency_seconds_sum{agent="backend"} 5.55', text)
+    
+    def test_collector_and_label_validation(self):
+        """Testa coletores e a rejeição de rótulos inválidos"""
+        self.registry.register_collector(
+            'cache_hit_ratio', 'gauge', 'Acertos', lambda: [('cache_hit_ratio', {}, 0.5)]
+        )
+        self.assertIn('cache_hit_ratio 0.5', self.registry.render())
+        
+        calls = self.registry.counter('calls_total', 'Chamadas', ['agent'])
+        with self.assertRaises(ValueError):
+            calls.inc(outro='x')
+        with self.assertRaises(ValueError):
+            self.registry.histogram('calls_total', 'Chamadas', ['agent'])
+    
+    def test_agent_context(self):
+        """Testa a marcação do agente no contexto atual"""
+        self.assertEqual(current_agent(), 'unknown')
+        with agent_context('frontend'):
+            self.assertEqual(current_agent(), 'frontend')
+        self.assertEqual(current_agent(), 'unknown')
+    
+    def test_metrics_endpoint(self):
+        """Testa a rota /metrics e a proteção opcional por token"""
+        from web_app.api import api
+        app = Flask(__name__)
+        app.register_blueprint(api)
+        REGISTRY.counter('test_endpoint_total', 'Contador de teste').inc()
+        client = app.test_client()
+        
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response.content_type)
+        self.assertIn('test_endpoint_total 1', response.get_data(as_text=True))
+        
+        with patch.dict(os.environ, {'METRICS_TOKEN': 'segredo'}):
+            self.assertEqual(client.get('/metrics').status_code, 401)
+            authorized = client.get('/metrics', headers={'Authorization': 'Bearer segredo'})
+            self.assertEqual(authorized.status_code, 200)
@@ -0,0 +1,131 @@
+# tests/test_outline.py
+import unittest
+import os
+import tempfile
+from indexing.blob_store import BlobStore
+from indexing.outline import cached_outline, outline, render_mode
+from indexing.reader import read_files
+
+PYTHON_SOURCE = '''"""Módulo de exemplo
+
+Detalhes que não entram no resumo.
+"""
+import os
+from typing import List
+
+LIMIT = 10
+cache = {}
+
+class Store(Base):
+    """Guarda itens"""
+    name: str = 'store'
+
+    @property
+    def size(self) -> int:
+        return len(self.items)
+
+    async def load(self, ids: List[int], *, force=False) -> None:
+        for item in ids:
+            self.items.append(item)
+
+def helper(value):
+    def inner():
+        pass
+    return value
+'''
+
+SCRIPT_SOURCE = '''import React, { useState } from 'react';
+const fs = require('fs');
+
+/**
+ * Soma dois números.
+ * @param a primeiro
+ */
+export function add(a: number,
+                    b: number): number {
+  if (a) { return a + b; }
+  return a + b;
+}
+
+export const mul = (a, b) => a * b;
+const LIMIT = 10;
+const label = "class Fake { }";
+
+export default class Cart extends Base {
+  /** Carrega os itens */
+  async load(id: string): Promise<void> {
+    for (const item of this.items) {}
+  }
+}
+'''
+
+class TestOutline(unittest.TestCase):
+    """Testes para os resumos de estrutura dos arquivos"""
+
+    def test_python_outline(self):
+        """Testa imports, constantes, classes, assinaturas e docstrings"""
+        result = outline('store.py', PYTHON_SOURCE)
+
+        self.assertIn('"""Módulo de exemplo"""', result)
+        self.assertIn('from typing import List', result)
+        self.assertIn('LIMIT = 10', result)
+        self.assertNotIn('cache', result)
+        self.assertIn('class Store(Base):  # L11', result)
+        self.assertIn("    name: str = 'store'", result)
+        self.assertIn('    @property\n    def size(self) -> int: ...', result)
+        self.assertIn('    async def load(self, ids: List[int], *, force=False) -> None: ...', result)
+        self.assertIn('def helper(value): ...', result)
+        self.assertNotIn('inner', result)
+        self.assertNotIn('append', result)
+        self.assertNotIn('Detalhes', result)
+        self.assertIsNone(outline('broken.py', 'def broken(:\n'))
+        self.assertIsNone(outline('notes.md', '# Notas'))
+
+    def test_script_outline(self):
+        """Testa imports, funções, classes e métodos em JS/TS"""
+        result = outline('cart.ts', SCRIPT_SOURCE)
+        lines = result.splitlines()[1:]
+
+        self.assertEqual(lines, [
+            "import React, { useState } from 'react'",
+            "const fs = require('fs')",
+            "/** Soma dois números. */",
+            "export function add(a: number, b: number): number  // L8",
+            "export const mul = (a, b) =>  // L14",
+            "export default class Cart extends Base  // L18",
+            "    /** Carrega os itens */",
+            "    async load(id: string): Promise<void>  // L20",
+        ])
+
+    def test_outlines_are_cached_and_rendered_on_demand(self):
+        """Testa o cache pelo hash do conteúdo e o modo de renderização"""
+        store = BlobStore()
+        first = cached_outline('a/store.py', PYTHON_SOURCE, store)
+        second = cached_outline('b/copy.py', PYTHON_SOURCE, store)
+
+        self.assertEqual(first, second)
+        self.assertEqual(store.stats()['derived_misses'], 1)
+        self.assertEqual(store.stats()['derived_hits'], 1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for name, content in (('store.py', PYTHON_SOURCE), ('notes.md', '# Notas\n')):
+                paths.append(os.path.join(temp_dir, name))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+            full = read_files(paths)
+            with render_mode('outline'):
+                outlined = read_files(paths)
+
+        self.assertEqual(full[0].text, PYTHON_SOURCE)
+        self.assertFalse(full[0].outlined)
+        self.assertTrue(outlined[0].outlined)
+        self.assertLess(len(outlined[0].text), len(PYTHON_SOURCE))
+        self.assertEqual(outlined[1].text, '# Notas\n')
+        with self.assertRaises(ValueError):
+            with render_mode('summary'):
+                pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_packer.py
+import unittest
+from indexing.blob_store import BlobStore
+from model.chunker import TokenCounter
+from model.packer import PackItem, PromptPacker, head_tail
+
+def python_module(name, functions):
+    """Módulo Python com corpos longos, para que o resumo seja bem menor"""
+    parts = [f'"""Módulo {name}"""\n']
+    for index in range(functions):
+        body = ''.join(f"    total += value * {step}\n" for step in range(20))
+        parts.append(f"def {name}_{index}(value: int) -> int:\n    total = 0\n{body}    return total\n\n")
+    return ''.join(parts)
+
+class TestPromptPacker(unittest.TestCase):
+    """Testes para o empacotamento de arquivos no limite de tokens"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.store = BlobStore()
+        self.counter = TokenCounter()
+        self.packer = PromptPacker(self.counter, max_tokens=10000, head_tail_tokens=200, store=self.store)
+
+    def test_everything_full_when_it_fits(self):
+        """Testa que arquivos que cabem entram completos, e sem orçamento também"""
+        items = [PackItem('a.py', python_module('a', 1), 1.0, overhead=10), PackItem('b.md', '# B\n', overhead=10)]
+
+        packed = self.packer.pack(items, budget=5000)
+
+        self.assertEqual([result.mode for result in packed], ['full', 'full'])
+        self.assertEqual(packed[0].text, items[0].text)
+        self.assertEqual([result.mode for result in self.packer.pack(items, None)], ['full', 'full'])
+
+    def test_relevant_files_keep_the_most_detail(self):
+        """Testa a escolha das formas dentro do orçamento, pela relevância"""
+        items = [PackItem(f'{name}.py', python_module(name, 6), score, overhead=10)
+                 for name, score in (('auth', 12.0), ('billing', 3.0), ('report', 0.0), ('legacy', 0.0))]
+        full = self.counter.count(items[0].text) + 10
+        budget = full + 3 * (self.counter.count(items[1].text) // 4)
+
+        packed = self.packer.pack(items, budget)
+
+        self.assertLessEqual(sum(result.tokens for result in packed), budget)
+        self.assertEqual(packed[0].mode, 'full')
+        self.assertIn(packed[1].mode, ('outline', 'head_tail'))
+        self.assertIn('def billing_0', packed[1].text)
+        self.assertNotEqual(packed[3].mode, 'full')
+        self.assertEqual(self.packer.budget('x' * 100), 10000 - self.counter.count('x' * 100))
+
+    def test_head_tail_and_memoised_counts(self):
+        """Testa o recorte de início e fim e a contagem de tokens pelo hash"""
+        text = ''.join(f"linha {index}\n" for index in range(100))
+
+        sample = head_tail(text, 200)
+
+        self.assertTrue(sample.startswith('linha 0\n'))
+        self.assertTrue(sample.endswith('linha 99\n'))
+        self.assertIn('linhas omitidas', sample)
+        self.assertLess(len(sample), 260)
+        self.assertEqual(head_tail('curto\n', 200), 'curto\n')
+
+        self.assertEqual(self.packer.tokens(text), self.packer.tokens(text))
+        self.assertEqual(self.store.stats()['derived_misses'], 1)
+        self.assertEqual(self.store.stats()['derived_hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
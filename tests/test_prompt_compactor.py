@@ -0,0 +1,106 @@
+# tests/test_prompt_compactor.py
+import unittest
+import json
+from model.chunker import split_segments
+from model.prompt_compactor import PromptCompactor, language_for, remove_comments
+
+PYTHON_FILE = '''"""Módulo de exemplo"""
+import os  # sistema
+
+
+class Service:
+    """Serviço"""
+
+    def run(self):
+        """Executa"""
+        # comentário
+        return os.getcwd()
+
+    def noop(self):
+        """Só a docstring"""
+'''
+
+JS_FILE = '''// utilitários
+const url = "http://exemplo.com"; /* endereço */
+function soma(a, b) {
+    return a + b; // soma
+}
+'''
+
+class TestPromptCompactor(unittest.TestCase):
+    """Testes para a compactação de prompts"""
+
+    def build_prompt(self, files):
+        """Monta um prompt indentado como os templates dos agentes"""
+        content = "".join(
+            f"Arquivo: {path}\nLinguagem: X\n\n```\n{text}\n```\n\n" for path, text in files
+        )
+        return f"""
+        Analise o código com base na solicitação: revisar
+
+        Conteúdo do Código:
+        {content}
+
+        Por favor, forneça:
+        1. Análise    da estrutura
+        2. Sugestões
+
+
+
+        Formate a resposta em markdown.
+        """
+
+    def test_dedent_and_whitespace(self):
+        """Testa o template sem indentação e o código com indentação preservada"""
+        result = PromptCompactor().compact(self.build_prompt([('app.py', PYTHON_FILE)]))
+
+        self.assertTrue(result.text.startswith("Analise o código"))
+        self.assertIn("\nArquivo: app.py\n", result.text)
+        self.assertIn("\n1. Análise da estrutura\n", result.text)
+        self.assertNotIn("\n\n\n", result.text)
+        self.assertIn("    def run(self):\n", result.text)
+        self.assertIn("# comentário", result.text)
+        self.assertGreater(result.saved_tokens, 0)
+        self.assertEqual(result.saved_tokens, result.original_tokens - result.compacted_tokens)
+
+    def test_strip_comments_per_language(self):
+        """Testa a remoção de comentários e docstrings mantendo o código válido"""
+        compactor = PromptCompactor(strip_comments=True)
+        result = compactor.compact(self.build_prompt([('app.py', PYTHON_FILE), ('util.js', JS_FILE)]))
+        files = {s.path: s.text for s in split_segments(result.text) if s.kind == 'file'}
+
+        python = files['app.py']
+        self.assertNotIn("comentário", python)
+        self.assertNotIn('"""Executa"""', python)
+        self.assertNotIn("# sistema", python)
+        self.assertIn('"""Só a docstring"""', python)
+        compile("".join(python.splitlines(keepends=True)[3:-1]), 'app.py', 'exec')
+
+        javascript = files['util.js']
+        self.assertNotIn("utilitários", javascript)
+        self.assertNotIn("endereço", javascript)
+        self.assertIn('"http://exemplo.com"', javascript)
+        self.assertIn("return a + b;", javascript)
+        self.assertEqual(compactor.stats()['prompts'], 1)
+
+    def test_json_and_minified_assets(self):
+        """Testa JSON reescrito sem espaços e conteúdo minificado omitido"""
+        lock = json.dumps({'packages': {f"pkg{i}": {'version': '1.0.0'} for i in range(5)}}, indent=4)
+        minified = "var a=1;" * 400
+        result = PromptCompactor().compact(self.build_prompt([
+            ('package-lock.json', lock), ('dist/app.min.js', minified)
+        ]))
+
+        self.assertIn('{"packages":{"pkg0":{"version":"1.0.0"}', result.text)
+        self.assertIn("[conteúdo minificado omitido: 3200 caracteres]", result.text)
+
+    def test_language_detection(self):
+        """Testa a família de linguagem por caminho e por marcador do bloco"""
+        self.assertEqual(language_for('src/Dockerfile'), 'hash')
+        self.assertEqual(language_for('web/style.scss'), 'css')
+        self.assertEqual(language_for(None, 'python'), 'python')
+        self.assertEqual(language_for('LICENSE'), 'plain')
+        self.assertEqual(remove_comments("#!/bin/sh\n# nota\necho ok\n", 'hash'), "#!/bin/sh\necho ok\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# tests/test_rate_limiter.py
+import unittest
+import random
+from model.rate_limiter import RateLimiter, backoff_delay
+
+class FakeClock:
+    """Relógio controlado pelo teste; dormir apenas avança o tempo"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestRateLimiter(unittest.TestCase):
+    """Testes para a classe RateLimiter"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.clock = FakeClock()
+
+    def create_limiter(self, **kwargs):
+        return RateLimiter(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_requests_per_minute(self):
+        """Testa se a taxa de requisições respeita o limite após a rajada inicial"""
+        limiter = self.create_limiter(requests_per_minute=60, burst_seconds=5)
+
+        for _ in range(65):
+            limiter.acquire()
+
+        # 5 requisições de rajada e as 60 seguintes a uma por segundo
+        self.assertAlmostEqual(self.clock.now, 60.0, delta=1.0)
+        self.assertGreater(limiter.stats()['throttled'], 0)
+        self.assertAlmostEqual(limiter.stats()['throttle_seconds'], self.clock.now, delta=1.0)
+
+    def test_tokens_per_minute(self):
+        """Testa a espera pelo balde de tokens"""
+        limiter = self.create_limiter(tokens_per_minute=6000, burst_seconds=10)
+
+        self.assertEqual(limiter.acquire(1000), 0.0)
+        waited = limiter.acquire(1000)
+
+        # O balde de 1000 tokens enche a 100 tokens por segundo
+        self.assertAlmostEqual(waited, 10.0, delta=1.0)
+
+    def test_record_usage_refunds_overestimate(self):
+        """Testa a devolução de tokens reservados a mais"""
+        limiter = self.create_limiter(tokens_per_minute=6000, burst_seconds=10)
+
+        limiter.acquire(1000)
+        limiter.record_usage(1000, 100)
+
+        self.assertLess(limiter.acquire(900), 1.0)
+
+    def test_rate_limited_pauses_and_recovers(self):
+        """Testa a pausa pelo Retry-After, a redução e a recuperação do limite"""
+        limiter = self.create_limiter(requests_per_minute=600)
+
+        limiter.on_rate_limited(retry_after=2.0)
+        self.assertEqual(limiter.stats()['requests_per_minute'], 300)
+        self.assertGreaterEqual(limiter.acquire(), 2.0)
+
+        for _ in range(20):
+            limiter.on_success()
+        self.assertEqual(limiter.stats()['requests_per_minute'], 600)
+
+    def test_rate_limited_without_configured_limit(self):
+        """Testa a estimativa do teto pelo consumo recente quando não há limite"""
+        limiter = self.create_limiter()
+        for _ in range(100):
+            limiter.acquire()
+            self.clock.sleep(0.2)
+        self.assertIsNone(limiter.stats()['requests_per_minute'])
+
+        # 100 requisições em 20 segundos equivalem a 300 por minuto
+        limiter.on_rate_limited()
+        self.assertAlmostEqual(limiter.stats()['requests_per_minute'], 150)
+
+    def test_rate_limited_learns_provider_limits(self):
+        """Testa a adoção dos limites anunciados pelo provedor"""
+        limiter = self.create_limiter()
+        limiter.acquire()
+
+        limiter.on_rate_limited(requests_limit=200, tokens_limit=40000)
+
+        stats = limiter.stats()
+        self.assertEqual(stats['requests_per_minute'], 100)
+        self.assertEqual(stats['tokens_per_minute'], 20000)
+
+    def test_backoff_delay(self):
+        """Testa o crescimento exponencial com jitter e o teto do atraso"""
+        rng = random.Random(1)
+        for attempt in range(1, 10):
+            delay = backoff_delay(attempt, 1.0, cap=8.0, rng=rng)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(8.0, 2 ** (attempt - 1)))
+        self.assertEqual(backoff_delay(3, 0), 0.0)
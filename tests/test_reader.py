@@ -0,0 +1,63 @@
+# tests/test_reader.py
+import unittest
+import os
+import tempfile
+from indexing.reader import FileReader
+
+class TestFileReader(unittest.TestCase):
+    """Testes para o leitor de arquivos com limites de tamanho"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.reader = FileReader(max_file_bytes=100, max_total_bytes=250, workers=2, mmap_threshold=1000)
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.reader.close()
+        self.temp_dir.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_binary_content_is_skipped(self):
+        """Testa o descarte por extensão e pelos primeiros bytes"""
+        database = self._write('app.db', b'SQLite format 3\0')
+        blob = self._write('data.txt', b'\x89PNG\r\n\x1a\n\0\0\0')
+        text = self._write('app.py', 'print("olá")\n'.encode('utf-8'))
+
+        results = self.reader.read_many([database, blob, text])
+
+        self.assertEqual([result.skipped for result in results], ['binary', 'binary', None])
+        self.assertEqual(results[2].text, 'print("olá")\n')
+
+    def test_large_files_are_sampled(self):
+        """Testa a amostragem do início e do fim, também com mmap"""
+        lines = b''.join(b'linha %03d\n' % i for i in range(200))
+        for name in ('small.log', 'mapped.log'):
+            path = self._write(name, lines)
+            reader = self.reader if name == 'small.log' else FileReader(max_file_bytes=100, mmap_threshold=1)
+            result = reader.read(path)
+            reader.close()
+
+            self.assertTrue(result.truncated)
+            self.assertTrue(result.text.startswith('linha 000\n'))
+            self.assertTrue(result.text.endswith('linha 199\n'))
+            self.assertIn('bytes omitidos', result.text)
+            self.assertNotIn('linha 100', result.text)
+
+    def test_total_budget_in_order(self):
+        """Testa que o orçamento total é repartido na ordem dos arquivos"""
+        paths = [self._write(f'{i}.txt', b'x' * 90) for i in range(4)]
+
+        results = self.reader.read_many(paths)
+
+        self.assertEqual([len(result.text or '') for result in results[:2]], [90, 90])
+        self.assertTrue(results[2].truncated)
+        self.assertEqual(results[3].skipped, 'budget')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# tests/test_scanner.py
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import tempfile
+from agents.backend_agent import BackendAgent
+from agents.code_analysis_agent import CodeAnalysisAgent
+from agents.database_agent import DatabaseAgent
+from indexing.scanner import SCANNER, ProjectScanner, scan_project, shared_scan
+from integration.integration_layer import IntegrationLayer
+
+class TestProjectScanner(unittest.TestCase):
+    """Testes para a varredura compartilhada do projeto"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = self.temp_dir.name
+        for relative_path in ('app.py', 'api/routes.py', 'models/user.py', 'schema.sql',
+                              'node_modules/lib/index.js', '.git/config', 'web/index.js'):
+            full_path = os.path.join(self.project_path, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w') as f:
+                f.write(f"# {relative_path}\n")
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def test_walk_skips_ignored_directories(self):
+        """Testa a listagem ordenada sem descer em diretórios ignorados"""
+        scan = ProjectScanner().walk(self.project_path)
+
+        self.assertEqual([file.relative_path for file in scan.files], [
+            'api' + os.sep + 'routes.py', 'app.py', 'models' + os.sep + 'user.py',
+            'schema.sql', 'web' + os.sep + 'index.js'
+        ])
+        routes = scan.files[0]
+        self.assertEqual((routes.name, routes.extension, routes.size), ('routes.py', '.py', 16))
+        self.assertEqual(routes.parts, ('api', 'routes.py'))
+
+    def test_walk_honours_ignore_files(self):
+        """Testa a poda pelo .gitignore, por .gitignore aninhado e pelo arquivo do projeto"""
+        for relative_path, content in (('.gitignore', 'build/\n*.log\n'), ('web/.gitignore', 'generated/\n'),
+                                       ('.analyzerignore', 'models/\n'), ('build/out.py', ''),
+                                       ('debug.log', ''), ('web/generated/bundle.js', '')):
+            full_path = os.path.join(self.project_path, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w') as f:
+                f.write(content)
+
+        with patch('indexing.scanner.os.scandir', wraps=os.scandir) as scandir:
+            scan = ProjectScanner().walk(self.project_path)
+        listed = {os.path.relpath(call.args[0], self.project_path) for call in scandir.call_args_list}
+        paths = {file.relative_path.replace(os.sep, '/') for file in scan.files}
+
+        self.assertEqual(paths, {'.analyzerignore', '.gitignore', 'api/routes.py', 'app.py',
+                                 'schema.sql', 'web/.gitignore', 'web/index.js'})
+        self.assertFalse(listed & {'build', 'models', os.path.join('web', 'generated'), 'node_modules'})
+        self.assertEqual(len(ProjectScanner(use_gitignore=False, ignore_file=None).walk(self.project_path)), 11)
+
+    def test_views_are_built_once_per_scan(self):
+        """Testa a reutilização da varredura e das visões no mesmo contexto"""
+        build = MagicMock(return_value=['x'])
+        scan = SCANNER.walk(self.project_path)
+
+        with shared_scan(scan):
+            self.assertIs(scan_project(self.project_path), scan)
+            self.assertEqual(scan.view('teste', build), ['x'])
+            self.assertEqual(scan.view('teste', build), ['x'])
+        self.assertIsNot(scan_project(self.project_path), scan)
+        build.assert_called_once()
+
+    def test_request_walks_project_once(self):
+        """Testa que vários agentes de uma solicitação usam uma única varredura"""
+        model = MagicMock()
+        model.generate.return_value = "ok"
+        analyzer = MagicMock()
+        analyzer.analyze_request.return_value = {'agents_to_use': ['code_analysis', 'backend', 'database']}
+        layer = IntegrationLayer(
+            code_analysis_agent=CodeAnalysisAgent(model),
+            project_improvement_agent=MagicMock(),
+            backend_agent=BackendAgent(model),
+            database_agent=DatabaseAgent(model),
+            request_analyzer_agent=analyzer
+        )
+
+        with patch.object(SCANNER, 'walk', wraps=SCANNER.walk) as walk:
+            layer.process_request("chat", self.project_path, "Analise o projeto")
+
+        self.assertEqual(walk.call_count, 1)
+        self.assertEqual(model.generate.call_count, 3)
+        backend_files = BackendAgent(model).get_backend_files(self.project_path)
+        self.assertEqual(sorted(f['relative_path'] for f in backend_files),
+                         ['api' + os.sep + 'routes.py', 'app.py', 'web' + os.sep + 'index.js'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# tests/test_search.py
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import tempfile
+from agents.code_analysis_agent import CodeAnalysisAgent
+from indexing.reader import FileReader
+from indexing.scanner import ProjectScanner
+from indexing.search import SearchIndex, search_index, search_project, select_relevant, tokenize
+
+class TestSearch(unittest.TestCase):
+    """Testes para o índice invertido com ranqueamento BM25"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = self.temp_dir.name
+        self._write('auth/login.py', "def authenticate_user(password):\n    return check_password(password)\n")
+        self._write('models/user.py', "class UserProfile:\n    name = 'usuário'\n")
+        self._write('utils/dates.py', "def format_date(value):\n    return value.isoformat()\n")
+        self._write('README.md', "# Projeto\nDocumentação de autenticação e datas.\n")
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def _write(self, relative_path, content):
+        full_path = os.path.join(self.project_path, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_tokenize_identifiers_and_languages(self):
+        """Testa a divisão de identificadores, acentos, plural e palavras vazias"""
+        self.assertEqual(tokenize("getUserName"), ['getusername', 'get', 'user', 'name'])
+        self.assertEqual(tokenize("check_password"), ['checkpassword', 'check', 'password'])
+        self.assertEqual(tokenize("Melhore a autenticação dos usuários"), ['melhore', 'autenticacao', 'usuario'])
+        self.assertEqual(tokenize("the users of HTTPServer"), ['user', 'httpserver', 'http', 'server'])
+
+    def test_ranking_and_incremental_update(self):
+        """Testa o ranqueamento e a reindexação só do que mudou"""
+        scan = ProjectScanner().walk(self.project_path)
+        index = SearchIndex()
+        self.assertEqual(index.update(scan.files), 4)
+
+        results = index.search("Revise a verificação de password no login")
+        self.assertEqual(results[0][0], os.path.join('auth', 'login.py'))
+        self.assertEqual([path for path, _ in index.search("datas", k=1)], ['README.md'])
+        self.assertEqual(index.search("password", candidates=['README.md']), [])
+
+        self._write('utils/dates.py', "def parse_password(value):\n    return value\n")
+        os.remove(os.path.join(self.project_path, 'README.md'))
+        scan = ProjectScanner().walk(self.project_path)
+        self.assertEqual(index.update(scan.files), 2)
+        self.assertIn(os.path.join('utils', 'dates.py'), dict(index.search("password")))
+        self.assertEqual(index.search("datas"), [])
+
+    def test_only_candidates_are_read(self):
+        """Testa que a busca com candidatos não lê os outros arquivos do projeto"""
+        login = os.path.join('auth', 'login.py')
+        index = search_index(self.project_path)
+
+        with patch.object(index.reader, 'read_many', wraps=index.reader.read_many) as read_many:
+            results = search_project(self.project_path, "password", candidates=[login, 'README.md'])
+
+        self.assertEqual([path for path, _ in results], [login])
+        self.assertEqual(sorted(index.documents), ['README.md', login])
+        self.assertEqual(sorted(os.path.basename(path) for path in read_many.call_args.args[0]),
+                         ['README.md', 'login.py'])
+
+        os.remove(os.path.join(self.project_path, 'README.md'))
+        search_project(self.project_path, "password", candidates=[login])
+        self.assertEqual(list(index.documents), [login])
+
+        # Arquivos que não couberam no limite de leitura voltam na atualização seguinte
+        bounded = SearchIndex(FileReader(max_total_bytes=1))
+        files = ProjectScanner().walk(self.project_path).files
+        self.assertEqual(bounded.update(files), 3)
+        self.assertEqual(bounded.update(files), 2)
+
+    def test_select_relevant_keeps_repeated_rows(self):
+        """Testa que entradas repetidas de um arquivo (uma por categoria) não se fundem"""
+        login = os.path.join('auth', 'login.py')
+        files = [
+            {'relative_path': 'README.md', 'type': 'Documentation'},
+            {'relative_path': login, 'type': 'Security'},
+            {'relative_path': login, 'type': 'Auth'},
+            {'relative_path': os.path.join('utils', 'dates.py'), 'type': 'Utils'},
+        ]
+
+        selected = select_relevant(self.project_path, files, "password", k=3)
+
+        self.assertEqual([(f['relative_path'], f['type']) for f in selected],
+                         [(login, 'Security'), (login, 'Auth'), ('README.md', 'Documentation')])
+        self.assertEqual(selected[0]['relevance'], selected[1]['relevance'])
+        self.assertNotIn('relevance', selected[2])
+
+    def test_agents_send_top_k_files(self):
+        """Testa que o agente envia só os arquivos mais relevantes"""
+        model = MagicMock()
+        model.generate.return_value = "ok"
+
+        with patch('indexing.search.DEFAULT_TOP_K', 1):
+            CodeAnalysisAgent(model).analyze(self.project_path, "Formate a date com format_date")
+
+        prompt = model.generate.call_args.args[0]
+        self.assertIn("def format_date", prompt)
+        self.assertNotIn("def authenticate_user", prompt)
+        self.assertIn(os.path.join('auth', 'login.py'), prompt)  # ainda na visão geral
+        self.assertTrue(search_project(self.project_path, "UserProfile"))
+
+if __name__ == '__main__':
+    unittest.main()
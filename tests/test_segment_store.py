@@ -0,0 +1,167 @@
+# tests/test_segment_store.py
+import unittest
+import os
+import tempfile
+import multiprocessing
+from pathlib import Path
+from unittest.mock import patch
+from model.segment_store import SegmentStore
+
+def write_keys(directory, prefix, count):
+    """Grava chaves a partir de um processo filho"""
+    store = SegmentStore(directory, segment_bytes=4096, background=False)
+    for i in range(count):
+        store.put(f"{prefix}-{i}", f"valor {prefix} {i}".encode('utf-8') * 10)
+    store.close()
+
+class TestSegmentStore(unittest.TestCase):
+    """Testes para a classe SegmentStore"""
+
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.temp_dir.cleanup()
+
+    def create_store(self, **kwargs):
+        kwargs.setdefault('background', False)
+        return SegmentStore(self.directory, **kwargs)
+
+    def test_put_get_and_compression(self):
+        """Testa gravação, leitura e compressão de valores grandes"""
+        store = self.create_store()
+        value = ("resposta repetitiva " * 200).encode('utf-8')
+
+        size = store.put('chave', value)
+
+        self.assertEqual(store.get('chave'), value)
+        self.assertLess(size, len(value) // 4)
+        self.assertIsNone(store.get('ausente'))
+
+    def test_reopen_with_hints_and_tombstones(self):
+        """Testa a reconstrução do índice a partir de dicas e marcadores"""
+        store = self.create_store(segment_bytes=512)
+        for i in range(50):
+            store.put(f"k{i}", f"valor {i}".encode('utf-8'))
+        store.put('k1', b'novo')
+        store.delete('k2')
+        store.close()
+
+        self.assertTrue(list(self.directory.glob('*.hint')))
+
+        reopened = self.create_store(segment_bytes=512)
+        self.assertEqual(reopened.get('k0'), b'valor 0')
+        self.assertEqual(reopened.get('k1'), b'novo')
+        self.assertIsNone(reopened.get('k2'))
+        self.assertEqual(reopened.stats()['keys'], 49)
+
+    def test_truncated_record_is_discarded(self):
+        """Testa a recuperação após uma gravação interrompida no fim do segmento"""
+        store = self.create_store()
+        store.put('inteira', b'ok')
+        store.close()
+
+        segment = next(self.directory.glob('*.seg'))
+        with open(segment, 'ab') as f:
+            f.write(b'\x00\x01registro cortado')
+
+        reopened = self.create_store()
+        self.assertEqual(reopened.get('inteira'), b'ok')
+        reopened.put('seguinte', b'gravada')
+        self.assertEqual(self.create_store().get('seguinte'), b'gravada')
+        self.assertEqual(reopened.stats()['corrupt_records'], 1)
+
+    def test_compaction_reclaims_dead_records(self):
+        """Testa a remoção de registros mortos mantendo os vivos"""
+        store = self.create_store(segment_bytes=1024, compact_min_bytes=0, compact_ratio=0.9)
+        for round_ in range(5):
+            for i in range(20):
+                store.put(f"k{i}", f"valor {i} rodada {round_}".encode('utf-8'))
+
+        before = store.stats()
+        store.compact()
+        after = store.stats()
+
+        self.assertEqual(after['keys'], 20)
+        self.assertEqual(after['live_bytes'], after['total_bytes'])
+        self.assertLess(after['total_bytes'], before['total_bytes'])
+        self.assertEqual(store.get('k7'), b'valor 7 rodada 4')
+        self.assertEqual(self.create_store().get('k7'), b'valor 7 rodada 4')
+
+    def test_another_instance_sees_writes_and_compaction(self):
+        """Testa duas instâncias compartilhando o diretório"""
+        first = self.create_store(refresh_interval=0)
+        second = self.create_store(refresh_interval=0)
+
+        first.put('a', b'1')
+        self.assertEqual(second.get('a'), b'1')
+
+        first.put('a', b'2')
+        first.compact()
+        self.assertEqual(second.get('a'), b'2')
+        second.put('b', b'3')
+        self.assertEqual(first.get('b'), b'3')
+
+    def test_compaction_by_another_instance_keeps_dead_bytes_accurate(self):
+        """Testa que a compactação feita por outra instância não deixa bytes mortos fantasmas"""
+        first = self.create_store(compact_min_bytes=10 * 1024, compact_ratio=0.4, refresh_interval=0)
+        second = self.create_store(compact_min_bytes=10 * 1024, compact_ratio=0.4, refresh_interval=0)
+        value = os.urandom(2000)
+        for i in range(12):
+            first.put(f"chave-{i % 4}", value)
+        self.assertEqual(second.get('chave-0'), value)
+        first.compact()
+        compactions = first.stats()['compactions']
+
+        self.assertEqual(second.get('chave-0'), value)
+        stats = second.stats()
+        self.assertEqual(stats['total_bytes'], stats['live_bytes'])
+
+        for i in range(12):
+            (first if i % 2 else second).put(f"nova-{i}", value)
+            self.assertEqual(first.get(f"nova-{i}"), value)
+            self.assertEqual(second.get(f"nova-{i}"), value)
+        # Só há chaves novas: nenhuma instância tem o que compactar
+        self.assertEqual(first.stats()['compactions'], compactions)
+        self.assertEqual(second.stats()['compactions'], 0)
+        stats = second.stats()
+        self.assertEqual(stats['total_bytes'], stats['live_bytes'])
+
+    def test_lookups_do_not_relist_the_directory(self):
+        """Testa que leituras seguidas não listam o diretório a cada chamada"""
+        first = self.create_store()
+        second = self.create_store(refresh_interval=60)
+        first.put('a', b'1')
+
+        with patch.object(second, '_list_segments', wraps=second._list_segments) as listing:
+            for _ in range(10):
+                self.assertIsNone(second.get('a'))
+        self.assertEqual(listing.call_count, 0)
+
+        second.refresh_interval = 0
+        self.assertEqual(second.get('a'), b'1')
+        second.put('b', b'2')
+        second.refresh_interval = 60
+        self.assertEqual(second.get('b'), b'2')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requer fork")
+    def test_concurrent_processes(self):
+        """Testa gravações simultâneas de vários processos"""
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=write_keys, args=(str(self.directory), f"p{n}", 100))
+            for n in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        store = self.create_store()
+        self.assertEqual(store.stats()['keys'], 300)
+        self.assertEqual(store.get('p2-99'), "valor p2 99".encode('utf-8') * 10)
+        self.assertEqual(store.stats()['corrupt_records'], 0)
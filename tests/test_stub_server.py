@@ -0,0 +1,49 @@
+# tests/test_stub_server.py
+import unittest
+import json
+import urllib.request
+import urllib.error
+from benchmarks.stub_server import StubServer, StubConfig
+from benchmarks.load_benchmark import percentile
+
+class TestStubServer(unittest.TestCase):
+    """Testes para o servidor simulado da API"""
+    
+    def post(self, server, payload):
+        """Envia uma requisição de chat ao servidor simulado"""
+        request = urllib.request.Request(
+            f"{server.api_base}/chat/completions",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+    
+    def test_chat_completion(self):
+        """Testa uma resposta no formato da API"""
+        config = StubConfig(latency='constant:0', tokens_per_second=0, completion_tokens=5, seed=1)
+        with StubServer(config) as server:
+            body = self.post(server, {'model': 'stub', 'messages': [{'role': 'user', 'content': 'olá'}]})
+        
+        self.assertEqual(body['object'], 'chat.completion')
+        self.assertEqual(len(body['choices'][0]['message']['content'].split()), 5)
+        self.assertEqual(body['usage']['completion_tokens'], 5)
+    
+    def test_rate_limit_injection(self):
+        """Testa a injeção de erros 429"""
+        config = StubConfig(latency='constant:0', rate_limit_rate=1.0, retry_after=2)
+        with StubServer(config) as server:
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                self.post(server, {'messages': []})
+            stats = server.stats.as_dict()
+        
+        self.assertEqual(context.exception.code, 429)
+        self.assertEqual(context.exception.headers['Retry-After'], '2')
+        self.assertEqual(stats['rate_limited'], 1)
+    
+    def test_percentile(self):
+        """Testa o cálculo de percentis do benchmark"""
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertIsNone(percentile([], 50))
@@ -0,0 +1,279 @@
+# tests/test_transformer_model.py
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import time
+import tempfile
+import threading
+import openai
+from model.metrics import REGISTRY, agent_context
+from model.transformer_model import (
+    API_CALL_SECONDS, COMPLETION_TOKENS, GENERATE_SECONDS, PROMPT_TOKENS, PROMPT_TOKENS_SAVED,
+    OpenAIError, TransformerModel
+)
+
+def make_completion(text):
+    """Cria uma resposta no formato da API de chat"""
+    response = MagicMock()
+    response.choices[0].message.content = text
+    return response
+
+class TestTransformerModel(unittest.TestCase):
+    """Testes para a classe TransformerModel"""
+    
+    def setUp(self):
+        """Configuração para cada teste"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {
+            'OPENAI_API_KEY': 'test-key',
+            'MODEL_CLIENT': 'openai',
+            'CACHE_DIR': self.temp_dir.name,
+            'MAX_INPUT_TOKENS': '400',
+            'CHUNK_RETRY_DELAY': '0'
+        })
+        self.env.start()
+        self.model = TransformerModel()
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        self.model.close()
+        self.env.stop()
+        self.temp_dir.cleanup()
+    
+    def create_large_prompt(self):
+        """Cria um prompt com quatro arquivos que não cabem em uma chamada"""
+        files = "".join(
+            f"Arquivo: {name}.py\nLinguagem: Python\n\n```python\n" + f"# {name}\n" * 150 + "```\n\n"
+            for name in ('a', 'b', 'c', 'd')
+        )
+        return f"Analise o projeto\n\n{files}Responda em markdown."
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_map_reduce_dispatches_parts_concurrently_in_order(self, create_mock):
+        """Testa o map concorrente com combinação final na ordem original"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def fake_create(**kwargs):
+            content = kwargs['messages'][1]['content']
+            if content.startswith("Combine"):
+                return make_completion(content)
+            
+            name = content.split("Arquivo: ")[1][0]
+            with lock:
+                active.append(name)
+                peak.append(len(active))
+            # Partes iniciais demoram mais para forçar conclusão fora de ordem
+            time.sleep(0.05 if name == 'a' else 0.01)
+            with lock:
+                active.remove(name)
+            return make_completion(f"parcial-{name}")
+        
+        create_mock.side_effect = fake_create
+        
+        result = self.model.generate(self.create_large_prompt())
+        
+        # Quatro partes no map e uma chamada de combinação
+        self.assertEqual(create_mock.call_count, 5)
+        self.assertGreater(max(peak), 1)
+        positions = [result.index(f"parcial-{name}") for name in ('a', 'b', 'c', 'd')]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn("Analise o projeto", result)
+        
+        # Nenhuma chamada ultrapassa o limite de tokens de entrada
+        for call in create_mock.call_args_list:
+            content = call.kwargs['messages'][1]['content']
+            self.assertLessEqual(self.model.token_counter.count(content), self.model.chunker.budget)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_map_reduce_reuses_partials_of_unchanged_files(self, create_mock):
+        """Testa se após editar um arquivo apenas a sua parte volta ao modelo"""
+        def fake_create(**kwargs):
+            content = kwargs['messages'][1]['content']
+            if content.startswith("Combine"):
+                return make_completion("combinada")
+            return make_completion("parcial-" + content.split("Arquivo: ")[1][0])
+        
+        create_mock.side_effect = fake_create
+        prompt = self.create_large_prompt()
+        self.model.generate(prompt)
+        first_calls = create_mock.call_count
+        
+        create_mock.reset_mock()
+        self.model.generate(prompt.replace("# c\n", "# C\n", 1))
+        
+        map_calls = [
+            call for call in create_mock.call_args_list
+            if not call.kwargs['messages'][1]['content'].startswith("Combine")
+        ]
+        self.assertEqual(first_calls, 5)
+        self.assertEqual(len(map_calls), 1)
+        self.assertIn("Arquivo: c.py", map_calls[0].kwargs['messages'][1]['content'])
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_small_prompt_uses_single_call(self, create_mock):
+        """Testa que prompts dentro do limite não passam por map-reduce"""
+        create_mock.return_value = make_completion("resposta")
+        
+        self.assertEqual(self.model.generate("Analise o projeto"), "resposta")
+        self.assertEqual(create_mock.call_count, 1)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_prompt_is_compacted_before_sending(self, create_mock):
+        """Testa o envio do prompt compactado e a contagem de tokens economizados"""
+        create_mock.return_value = make_completion("resposta")
+        saved_before = PROMPT_TOKENS_SAVED.value(agent='compactacao')
+        
+        with agent_context('compactacao'):
+            self.model.generate("""
+            Analise o projeto
+
+
+
+            Responda em markdown.
+            """)
+        
+        sent = create_mock.call_args.kwargs['messages'][1]['content']
+        self.assertEqual(sent, "Analise o projeto\n\nResponda em markdown.")
+        self.assertGreater(PROMPT_TOKENS_SAVED.value(agent='compactacao'), saved_before)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_failed_chunk_is_retried(self, create_mock):
+        """Testa a repetição de um chunk que falhou"""
+        create_mock.side_effect = [Exception("timeout"), make_completion("ok")]
+        
+        self.assertEqual(self.model.generate("curto"), "ok")
+        self.assertEqual(create_mock.call_count, 2)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_chunk_failure_after_retries_raises(self, create_mock):
+        """Testa o erro quando um chunk esgota as tentativas"""
+        create_mock.side_effect = Exception("indisponível")
+        
+        with self.assertRaises(OpenAIError):
+            self.model.generate("curto")
+        self.assertEqual(create_mock.call_count, self.model.chunk_max_retries + 1)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_identical_concurrent_prompts_share_one_call(self, create_mock):
+        """Testa se prompts idênticos simultâneos geram uma única chamada"""
+        release = threading.Event()
+        
+        def fake_create(**kwargs):
+            release.wait(1)
+            return make_completion("compartilhada")
+        
+        create_mock.side_effect = fake_create
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.model.generate("mesmo prompt")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        # Aguardar até que todas as threads estejam agrupadas na mesma chamada
+        deadline = time.time() + 1
+        while self.model.in_flight.coalesced < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, ["compartilhada"] * 5)
+        self.assertEqual(create_mock.call_count, 1)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_generate_stream_yields_tokens_and_caches(self, create_mock):
+        """Testa a transmissão de tokens e o cache da resposta completa"""
+        def chunk(token):
+            item = MagicMock()
+            item.choices[0].delta = {'content': token}
+            return item
+        
+        create_mock.return_value = iter([chunk("Olá"), chunk(", "), chunk("mundo")])
+        
+        tokens = list(self.model.generate_stream("prompt transmitido"))
+        
+        self.assertEqual(tokens, ["Olá", ", ", "mundo"])
+        self.assertTrue(create_mock.call_args.kwargs['stream'])
+        
+        # A segunda chamada vem do cache, entregue de uma vez
+        self.assertEqual(list(self.model.generate_stream("prompt transmitido")), ["Olá, mundo"])
+        self.assertEqual(create_mock.call_count, 1)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_rate_limit_is_retried_after_retry_after(self, create_mock):
+        """Testa a nova tentativa após um 429, respeitando o Retry-After"""
+        create_mock.side_effect = [
+            openai.error.RateLimitError("Rate limit reached", headers={'Retry-After': '0.2'}),
+            make_completion("resposta após o limite")
+        ]
+        
+        started_at = time.monotonic()
+        result = self.model.generate("prompt limitado")
+        
+        self.assertEqual(result, "resposta após o limite")
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.2)
+        self.assertEqual(self.model.rate_limiter.stats()['rate_limited'], 1)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_generate_many_uses_cache_and_deduplicates(self, create_mock):
+        """Testa o lote: cache consultado, prompts repetidos enviados uma vez e ordem preservada"""
+        def fake_create(**kwargs):
+            content = kwargs['messages'][1]['content']
+            time.sleep(0.05 if content == "primeiro" else 0)
+            return make_completion(f"resposta para {content}")
+        
+        create_mock.side_effect = fake_create
+        self.model.cache_manager.save_to_cache(
+            self.model.cache_manager.get_cache_key("em cache"), "resposta do cache"
+        )
+        
+        results = self.model.generate_many(["primeiro", "em cache", "segundo", "primeiro"])
+        
+        self.assertEqual(results, [
+            "resposta para primeiro",
+            "resposta do cache",
+            "resposta para segundo",
+            "resposta para primeiro"
+        ])
+        self.assertEqual(create_mock.call_count, 2)
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_generate_many_return_exceptions(self, create_mock):
+        """Testa a falha de um prompt sem interromper o lote"""
+        def fake_create(**kwargs):
+            content = kwargs['messages'][1]['content']
+            if content == "falha":
+                raise Exception("indisponível")
+            return make_completion("ok")
+        
+        create_mock.side_effect = fake_create
+        
+        results = self.model.generate_many(["falha", "sucesso"], return_exceptions=True)
+        
+        self.assertIsInstance(results[0], OpenAIError)
+        self.assertEqual(results[1], "ok")
+        with self.assertRaises(OpenAIError):
+            self.model.generate_many(["falha", "sucesso"])
+    
+    @patch('model.transformer_model.openai.ChatCompletion.create')
+    def test_calls_are_recorded_per_agent(self, create_mock):
+        """Testa a telemetria de duração e tokens marcada com o agente"""
+        create_mock.return_value = openai.openai_object.OpenAIObject.construct_from({
+            'choices': [{'message': {'role': 'assistant', 'content': "resposta"}}],
+            'usage': {'prompt_tokens': 30, 'completion_tokens': 7, 'total_tokens': 37}
+        })
+        
+        with agent_context('telemetria'):
+            self.model.generate("prompt medido")
+            self.model.generate("prompt medido")
+        
+        self.assertEqual(GENERATE_SECONDS.count(agent='telemetria', outcome='miss'), 1)
+        self.assertEqual(GENERATE_SECONDS.count(agent='telemetria', outcome='hit'), 1)
+        self.assertEqual(API_CALL_SECONDS.count(agent='telemetria', status='ok'), 1)
+        self.assertEqual(PROMPT_TOKENS.sum(agent='telemetria'), 30)
+        self.assertEqual(COMPLETION_TOKENS.sum(agent='telemetria'), 7)
+        self.assertIn('model_cache_hit_ratio', REGISTRY.render())
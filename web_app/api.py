@@ -1,10 +1,16 @@
 # web_app/api.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_login import current_user, login_required
 from models.project import Project
 from models.analysis import Analysis
 from database import db
+from model.metrics import REGISTRY
+from indexing.git_source import changed_files, head_commit
+from indexing.outline import RENDER_MODES
 import os
+import json
+import queue
+import threading
 from pathlib import Path
 import logging
 
@@ -137,17 +143,26 @@ def analyze_project(project_id):
     data = request.json
     analysis_type = data.get('type', 'general')
     user_message = data.get('message', '')
+    render = data.get('render')
+    if render is not None and render not in RENDER_MODES:
+        return jsonify({'error': f'Modo de renderização inválido: {render}'}), 400
     
     try:
+        # Commit analisado e, no modo delta, os arquivos alterados desde a última análise
+        commit = head_commit(project.path)
+        delta = delta_files(project) if data.get('mode') == 'delta' else None
+        
         # Obter o agente apropriado
         integration_layer = current_app.config['INTEGRATION_LAYER']
-        result = integration_layer.process_request(analysis_type, project.path, user_message)
+        result = integration_layer.process_request(analysis_type, project.path, user_message,
+                                                   changed_files=delta, render=render)
         
         # Salvar a análise
         analysis = Analysis(
             type=analysis_type,
             content=result,
-            project_id=project.id
+            project_id=project.id,
+            commit=commit
         )
         db.session.add(analysis)
         db.session.commit()
@@ -156,13 +171,117 @@ def analyze_project(project_id):
             'id': analysis.id,
             'type': analysis.type,
             'content': analysis.content,
-            'created_at': analysis.created_at.isoformat()
+            'created_at': analysis.created_at.isoformat(),
+            'commit': analysis.commit
         })
     except Exception as e:
         db.session.rollback()
         logger.error(f"Erro ao analisar projeto: {str(e)}")
         return jsonify({'error': f'Erro ao analisar projeto: {str(e)}'}), 500
 
+@api.route('/api/projects/<int:project_id>/analyze/stream', methods=['POST'])
+@login_required
+def analyze_project_stream(project_id):
+    """Analisa um projeto enviando a resposta por Server-Sent Events
+
+    Emite eventos 'token' à medida que o modelo gera a resposta, seguidos de
+    um evento 'done' com a análise salva ou de um evento 'error'.
+    """
+    project = Project.query.get_or_404(project_id)
+    if project.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.json
+    analysis_type = data.get('type', 'general')
+    user_message = data.get('message', '')
+    render = data.get('render')
+    if render is not None and render not in RENDER_MODES:
+        return jsonify({'error': f'Modo de renderização inválido: {render}'}), 400
+    project_path = project.path
+    commit = head_commit(project_path)
+    delta = delta_files(project) if data.get('mode') == 'delta' else None
+    
+    integration_layer = current_app.config['INTEGRATION_LAYER']
+    events = queue.Queue()
+    
+    def run():
+        try:
+            result = integration_layer.process_request(
+                analysis_type, project_path, user_message,
+                on_token=lambda token: events.put(('token', token)),
+                changed_files=delta,
+                render=render
+            )
+            events.put(('result', result))
+        except Exception as e:
+            events.put(('error', str(e)))
+    
+    threading.Thread(target=run, daemon=True).start()
+    
+    def stream():
+        while True:
+            kind, payload = events.get()
+            
+            if kind == 'token':
+                yield sse_event('token', {'content': payload})
+                continue
+            
+            if kind == 'error':
+                logger.error(f"Erro ao analisar projeto: {payload}")
+                yield sse_event('error', {'error': f'Erro ao analisar projeto: {payload}'})
+                return
+            
+            # Salvar a análise quando a transmissão termina
+            try:
+                analysis = Analysis(
+                    type=analysis_type,
+                    content=payload,
+                    project_id=project_id,
+                    commit=commit
+                )
+                db.session.add(analysis)
+                db.session.commit()
+                
+                yield sse_event('done', {
+                    'id': analysis.id,
+                    'type': analysis.type,
+                    'content': analysis.content,
+                    'created_at': analysis.created_at.isoformat(),
+                    'commit': analysis.commit
+                })
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erro ao salvar análise: {str(e)}")
+                yield sse_event('error', {'error': f'Erro ao salvar análise: {str(e)}'})
+            return
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def delta_files(project):
+    """Arquivos alterados desde o commit da última análise do projeto
+
+    Retorna None (análise completa) se o projeto não é um checkout do Git ou
+    nenhuma análise anterior registrou o commit.
+    """
+    previous = Analysis.query.filter(
+        Analysis.project_id == project.id, Analysis.commit.isnot(None)
+    ).order_by(Analysis.created_at.desc()).first()
+    if previous is None:
+        logger.info(f"Sem análise anterior com commit para o projeto {project.id}; análise completa")
+        return None
+    changed = changed_files(project.path, previous.commit)
+    if changed is None:
+        logger.info(f"Não foi possível calcular as alterações desde {previous.commit[:12]}; análise completa")
+    return changed
+
+def sse_event(event: str, data: dict) -> str:
+    """Formata um evento Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @api.route('/api/analyses/<int:analysis_id>', methods=['GET'])
 @login_required
 def get_analysis(analysis_id):
@@ -178,6 +297,7 @@ def get_analysis(analysis_id):
         'type': analysis.type,
         'content': analysis.content,
         'created_at': analysis.created_at.isoformat(),
+        'commit': analysis.commit,
         'project_id': analysis.project_id
     })
 
@@ -196,4 +316,13 @@ def get_project_analyses(project_id):
         'type': a.type,
         'content': a.content,
         'created_at': a.created_at.isoformat()
-    } for a in analyses])
\ No newline at end of file
+    } for a in analyses])
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas do processo no formato texto do Prometheus"""
+    # Com METRICS_TOKEN definido, exigir o token no cabeçalho Authorization
+    token = os.getenv('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({'error': 'Unauthorized'}), 401
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -1,7 +1,7 @@
 # web_app/routes.py
 from flask import Blueprint, render_template, request, jsonify, current_app, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.urls import url_parse
+from urllib.parse import urlparse
 from models.user import User
 from models.project import Project
 from models.analysis import Analysis
@@ -34,7 +34,7 @@ def login():
         
         login_user(user, remember=True)
         next_page = request.args.get('next')
-        if not next_page or url_parse(next_page).netloc != '':
+        if not next_page or urlparse(next_page).netloc != '':
             next_page = url_for('routes.dashboard')
         return redirect(next_page)
     